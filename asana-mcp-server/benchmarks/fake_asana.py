@@ -0,0 +1,310 @@
+"""
+A local stand-in for the Asana REST API, for benchmarks.
+
+Serves the endpoints AsanaClient uses from generated in-memory data: offset pagination,
+opt_fields projection, /batch, typeahead, events, subtasks and dependencies. Latency and 429 responses can be
+injected, and every request is counted so a benchmark can report requests per tool call.
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+API_PREFIX = "/api/1.0"
+MAX_LIMIT = 100
+
+Response = Tuple[int, Dict[str, Any]]
+
+
+class FakeAsana:
+    """
+    In-memory Asana with workspaces x projects x tasks_per_project tasks.
+
+    latency/jitter: seconds added to every request. rate_limit_every: answer every Nth
+    request with 429 and Retry-After: retry_after.
+    """
+
+    def __init__(self, workspaces: int = 1, projects: int = 5, tasks_per_project: int = 500,
+                 latency: float = 0.0, jitter: float = 0.0, rate_limit_every: int = 0,
+                 retry_after: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.requests: Counter = Counter()
+        self._lock = threading.Lock()
+        self._total = 0
+        self._next_gid = 1_000_000
+        # (resource gid, event) in order; a sync token is an index into this log.
+        self.events: List[Tuple[str, Dict[str, Any]]] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+        rng = random.Random(seed)
+
+        self.me = {"gid": "1", "name": "Bench User", "email": "bench@example.com", "resource_type": "user"}
+        self.workspaces = [{"gid": f"9{w}", "name": f"Workspace {w}", "resource_type": "workspace"}
+                           for w in range(workspaces)]
+        self.me["workspaces"] = self.workspaces
+        self.projects: Dict[str, Dict[str, Any]] = {}
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.project_tasks: Dict[str, List[str]] = {}
+        self.subtasks: Dict[str, List[str]] = {}
+        self.dependencies: Dict[str, List[str]] = {}
+        words = ["launch", "review", "draft", "budget", "hiring", "roadmap", "bug", "design", "sync", "report"]
+        for workspace in self.workspaces:
+            for p in range(projects):
+                project = {"gid": f"{workspace['gid']}{p:03d}", "name": f"Project {p}", "resource_type": "project",
+                           "workspace": workspace}
+                self.projects[project["gid"]] = project
+                self.project_tasks[project["gid"]] = []
+                sections = [{"gid": f"{project['gid']}{s}", "name": name}
+                            for s, name in enumerate(["Backlog", "In progress", "Review", "Done"])]
+                for _ in range(tasks_per_project):
+                    gid = self._gid()
+                    self.tasks[gid] = {
+                        "gid": gid, "resource_type": "task",
+                        "name": " ".join(rng.sample(words, 3)) + f" {gid}",
+                        "notes": " ".join(rng.choice(words) for _ in range(40)),
+                        "completed": rng.random() < 0.3,
+                        "due_on": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                        "assignee": {"gid": self.me["gid"], "name": self.me["name"]} if rng.random() < 0.2 else None,
+                        "projects": [{"gid": project["gid"], "name": project["name"]}],
+                        "memberships": [{"project": {"gid": project["gid"], "name": project["name"]},
+                                         "section": rng.choice(sections)}],
+                        "workspace": {"gid": workspace["gid"], "name": workspace["name"]},
+                        "permalink_url": f"https://app.asana.com/0/{project['gid']}/{gid}",
+                        "modified_at": "2024-01-01T00:00:00.000Z",
+                        "num_subtasks": 0,
+                    }
+                    self.project_tasks[project["gid"]].append(gid)
+
+    def add_subtask_tree(self, parent: str, fanout: Tuple[int, ...]) -> List[str]:
+        """
+        Give parent fanout[0] subtasks, each of those fanout[1] subtasks, and so on.
+        Returns the gids of every task added.
+        """
+        if not fanout:
+            return []
+        added = []
+        for i in range(fanout[0]):
+            gid = self._gid()
+            self.tasks[gid] = {"gid": gid, "resource_type": "task", "name": f"{self.tasks[parent]['name']}.{i + 1}",
+                               "notes": "", "completed": False, "due_on": None, "assignee": None, "projects": [],
+                               "memberships": [], "workspace": self.tasks[parent]["workspace"],
+                               "parent": {"gid": parent, "name": self.tasks[parent]["name"]},
+                               "permalink_url": f"https://app.asana.com/0/0/{gid}",
+                               "modified_at": "2024-01-01T00:00:00.000Z", "num_subtasks": 0}
+            self.subtasks.setdefault(parent, []).append(gid)
+            added.append(gid)
+            added.extend(self.add_subtask_tree(gid, fanout[1:]))
+        self.tasks[parent]["num_subtasks"] = len(self.subtasks[parent])
+        return added
+
+    def add_dependency(self, task: str, depends_on: str) -> None:
+        self.dependencies.setdefault(task, []).append(depends_on)
+
+    def _gid(self) -> str:
+        self._next_gid += 1
+        return str(self._next_gid)
+
+    # --- server lifecycle -----------------------------------------------
+
+    def start(self) -> str:
+        """Serve on an ephemeral localhost port; returns the API base URL."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle on, the body waits for
+            # the client's delayed ACK and every request gains ~40 ms.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _serve(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, payload, headers = fake.request(self.command, self.path, body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (timed out or cancelled) before the response was ready.
+                    self.close_connection = True
+
+            do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}{API_PREFIX}"
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.requests.clear()
+
+    @property
+    def request_count(self) -> int:
+        return sum(self.requests.values())
+
+    # --- request handling -----------------------------------------------
+
+    def request(self, method: str, raw_path: str, body: Optional[Dict[str, Any]]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        url = urlsplit(raw_path)
+        path = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) else url.path
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        with self._lock:
+            self._total += 1
+            self.requests[f"{method} {re.sub(r'/[0-9]+', '/{gid}', path)}"] += 1
+            limited = self.rate_limit_every and self._total % self.rate_limit_every == 0
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.random() * self.jitter)
+        if limited:
+            return 429, {"errors": [{"message": "Rate limit enforced"}]}, {"Retry-After": f"{self.retry_after:g}"}
+        status, payload = self.dispatch(method, path, query, (body or {}).get("data"))
+        return status, payload, {}
+
+    def dispatch(self, method: str, path: str, query: Dict[str, str], data: Any) -> Response:
+        fields = query.get("opt_fields")
+        if method == "GET" and path == "/users/me":
+            return 200, {"data": project(self.me, fields)}
+        if method == "GET" and path == "/workspaces":
+            return self._page(self.workspaces, query, fields)
+        m = re.fullmatch(r"/workspaces/(\w+)/projects", path)
+        if method == "GET" and m:
+            projects = [p for p in self.projects.values() if p["workspace"]["gid"] == m.group(1)]
+            return self._page(projects, query, fields)
+        m = re.fullmatch(r"/workspaces/(\w+)/typeahead", path)
+        if method == "GET" and m:
+            words = query.get("query", "").lower().split()
+            hits = [t for t in self.tasks.values() if all(w in t["name"].lower() for w in words)]
+            return 200, {"data": [project(t, fields) for t in hits[:int(query.get("count", 20))]]}
+        if method == "GET" and path == "/tasks":
+            return self._page(self._list_tasks(query), query, fields)
+        if method == "POST" and path == "/tasks":
+            return self._create_task(data or {}, fields)
+        m = re.fullmatch(r"/tasks/(\w+)", path)
+        if m:
+            task = self.tasks.get(m.group(1))
+            if task is None:
+                return 404, {"errors": [{"message": "task: Unknown object"}]}
+            if method == "GET":
+                return 200, {"data": project(task, fields)}
+            if method == "PUT":
+                task.update({k: v for k, v in (data or {}).items() if k in ("name", "notes", "completed", "due_on")})
+                self._record_event(task, "changed")
+                return 200, {"data": project(task, fields)}
+        m = re.fullmatch(r"/tasks/(\w+)/(subtasks|dependencies)", path)
+        if method == "GET" and m:
+            if m.group(1) not in self.tasks:
+                return 404, {"errors": [{"message": "task: Unknown object"}]}
+            related = self.subtasks if m.group(2) == "subtasks" else self.dependencies
+            return self._page([self.tasks[g] for g in related.get(m.group(1), [])], query, fields)
+        m = re.fullmatch(r"/tasks/(\w+)/stories", path)
+        if method == "POST" and m:
+            return 201, {"data": {"gid": self._gid(), "text": (data or {}).get("text"), "resource_type": "story"}}
+        if method == "POST" and path == "/batch":
+            return 200, {"data": [self._batch_action(a) for a in (data or {}).get("actions", [])]}
+        if method == "GET" and path == "/events":
+            with self._lock:
+                head = f"sync-{len(self.events)}"
+                if not query.get("sync"):
+                    return 412, {"errors": [{"message": "Sync token invalid or too old"}], "sync": head}
+                since = int(query["sync"].partition("-")[2] or 0)
+                data = [e for resource, e in self.events[since:] if resource == query.get("resource")]
+            return 200, {"data": data, "sync": head, "has_more": False}
+        return 404, {"errors": [{"message": f"No route for {method} {path}"}]}
+
+    def _list_tasks(self, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        if "project" in query:
+            tasks = [self.tasks[g] for g in self.project_tasks.get(query["project"], [])]
+        else:
+            tasks = [t for t in self.tasks.values()
+                     if t["workspace"]["gid"] == query.get("workspace")
+                     and query.get("assignee") == "me" and (t["assignee"] or {}).get("gid") == self.me["gid"]]
+        if query.get("completed_since") == "now":
+            tasks = [t for t in tasks if not t["completed"]]
+        return tasks
+
+    def _record_event(self, task: Dict[str, Any], action: str) -> None:
+        """Log an event on the task and on each of its projects."""
+        event = {"action": action, "resource": {"gid": task["gid"], "resource_type": "task"}}
+        with self._lock:
+            for resource in [task["gid"]] + [p["gid"] for p in task["projects"]]:
+                self.events.append((resource, event))
+
+    def _page(self, records: List[Dict[str, Any]], query: Dict[str, str], fields: Optional[str]) -> Response:
+        if "limit" not in query:
+            return 200, {"data": [project(r, fields) for r in records]}
+        limit = int(query["limit"])
+        if not 1 <= limit <= MAX_LIMIT:
+            return 400, {"errors": [{"message": "limit: Must be between 1 and 100"}]}
+        start = int(query.get("offset") or 0)
+        end = start + limit
+        next_page = {"offset": str(end), "path": "", "uri": ""} if end < len(records) else None
+        return 200, {"data": [project(r, fields) for r in records[start:end]], "next_page": next_page}
+
+    def _create_task(self, data: Dict[str, Any], fields: Optional[str]) -> Response:
+        project_gids = data.get("projects") or []
+        projects = [self.projects[p] for p in project_gids if p in self.projects]
+        workspace = projects[0]["workspace"] if projects else next(
+            (w for w in self.workspaces if w["gid"] == data.get("workspace")), self.workspaces[0])
+        gid = self._gid()
+        task = {"gid": gid, "resource_type": "task", "name": data.get("name"), "notes": data.get("notes", ""),
+                "completed": False, "due_on": data.get("due_on"), "assignee": None,
+                "projects": [{"gid": p["gid"], "name": p["name"]} for p in projects],
+                "workspace": {"gid": workspace["gid"], "name": workspace["name"]},
+                "permalink_url": f"https://app.asana.com/0/0/{gid}", "modified_at": "2024-01-01T00:00:00.000Z",
+                "num_subtasks": 0}
+        with self._lock:
+            self.tasks[gid] = task
+            for p in projects:
+                self.project_tasks[p["gid"]].append(gid)
+        self._record_event(task, "added")
+        return 201, {"data": project(task, fields)}
+
+    def _batch_action(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        options = action.get("options") or {}
+        query = {"opt_fields": ",".join(options["fields"])} if options.get("fields") else {}
+        status, payload = self.dispatch(action["method"].upper(), action["relative_path"], query, action.get("data"))
+        return {"status_code": status, "headers": {}, "body": payload}
+
+
+def project(record: Dict[str, Any], opt_fields: Optional[str]) -> Dict[str, Any]:
+    """Apply Asana's opt_fields semantics: compact {gid, name, resource_type} unless fields are named."""
+    if not opt_fields:
+        return {k: record[k] for k in ("gid", "name", "resource_type") if k in record}
+    out: Dict[str, Any] = {"gid": record["gid"]} if "gid" in record else {}
+    nested: Dict[str, List[str]] = {}
+    for field in opt_fields.split(","):
+        top, _, sub = field.partition(".")
+        if sub:
+            nested.setdefault(top, []).append(sub)
+        elif top in record:
+            out[top] = record[top]
+    for top, subs in nested.items():
+        value = record.get(top)
+        if isinstance(value, dict):
+            out[top] = project(value, ",".join(subs))
+        elif isinstance(value, list):
+            out[top] = [project(v, ",".join(subs)) for v in value]
+        else:
+            out[top] = value
+    return out
@@ -0,0 +1,268 @@
+"""
+Benchmark AsanaClient and the MCP tool handlers against a local fake Asana.
+
+    python benchmarks/run.py
+    python benchmarks/run.py --tasks-per-project 2000 --latency 0.05 --concurrency 1,8,32
+    python benchmarks/run.py --save baseline.json
+    python benchmarks/run.py --compare baseline.json --tolerance 0.25
+
+For each scenario and concurrency level it reports p50/p99 latency per tool call,
+throughput, Asana requests per call, encoded response size and encode time, and peak
+Python memory (tracemalloc, measured in a separate pass so it doesn't skew latency).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcp import types  # noqa: E402
+
+import asana_mcp_server.server as server_module  # noqa: E402
+from asana_mcp_server.async_client import AsyncAsanaClient  # noqa: E402
+from asana_mcp_server.cache import TTLCache  # noqa: E402
+from asana_mcp_server.client import AsanaClient  # noqa: E402
+from asana_mcp_server.encoding import encode  # noqa: E402
+from asana_mcp_server.metrics import METRICS  # noqa: E402
+from asana_mcp_server.scheduler import RequestScheduler  # noqa: E402
+from fake_asana import FakeAsana  # noqa: E402
+
+
+# Tasks given a subtask hierarchy for the task_tree scenario: 5 + 20 + 60 subtasks each.
+EPICS = 10
+EPIC_FANOUT = (5, 4, 3)
+
+
+class Bench:
+    """An AsanaClient wired to the fake, plus the MCP call_tool handler using it."""
+
+    def __init__(self, fake: FakeAsana, base_url: str, cache: bool, max_workers: int):
+        self.fake = fake
+        scheduler = RequestScheduler(rate=0, max_in_flight=max_workers)
+        self.client = AsanaClient(access_token="bench", host=base_url, max_connections=max_workers,
+                                  scheduler=scheduler, cache=TTLCache(maxsize=512 if cache else 0))
+        self.async_client = AsyncAsanaClient(self.client, max_workers=max_workers)
+        # The handlers resolve their client through these module globals.
+        server_module.asana_client = self.client
+        server_module.async_client = self.async_client
+        self.server = server_module.create_server()
+        self.handler = self.server.request_handlers[types.CallToolRequest]
+        self.project_ids = list(fake.projects)
+        self.task_ids = [gid for gids in fake.project_tasks.values() for gid in gids]
+        self.epic_ids = [gid for gid in fake.subtasks if "parent" not in fake.tasks[gid]]
+        self.rng = random.Random(1)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> str:
+        request = types.CallToolRequest(method="tools/call",
+                                        params=types.CallToolRequestParams(name=name, arguments=arguments))
+        result = await self.handler(request)
+        text = result.root.content[0].text
+        if text.startswith("Error:"):
+            raise RuntimeError(f"{name} failed: {text}")
+        return text
+
+    def close(self) -> None:
+        self.async_client.shutdown()
+
+
+# --- scenarios: one "tool call" each --------------------------------------
+
+async def list_project(bench: Bench) -> str:
+    """get_project_tasks, following next_page through the whole project."""
+    project_id = bench.rng.choice(bench.project_ids)
+    arguments: Dict[str, Any] = {"project_id": project_id, "limit": 100}
+    while True:
+        text = await bench.call_tool("get_project_tasks", arguments)
+        next_page = json.loads(text)["next_page"]
+        if not next_page:
+            return text
+        arguments["next_page"] = next_page
+
+
+async def summarize_project(bench: Bench) -> str:
+    """summarize_project: the same pages as list_project, aggregated server-side."""
+    return await bench.call_tool("summarize_project", {"project_id": bench.rng.choice(bench.project_ids)})
+
+
+async def task_tree(bench: Bench) -> str:
+    """get_task_tree over an epic with EPIC_FANOUT subtasks per level."""
+    return await bench.call_tool("get_task_tree", {"task_id": bench.rng.choice(bench.epic_ids)})
+
+
+async def task_details(bench: Bench) -> str:
+    return await bench.call_tool("get_task_details", {"task_id": bench.rng.choice(bench.task_ids)})
+
+
+async def get_many_tasks(bench: Bench) -> str:
+    return await bench.call_tool("get_tasks", {"task_ids": bench.rng.sample(bench.task_ids, 20)})
+
+
+async def search(bench: Bench) -> str:
+    return await bench.call_tool("search_tasks", {"query": bench.rng.choice(["launch", "budget review", "bug"])})
+
+
+async def update(bench: Bench) -> str:
+    return await bench.call_tool("update_task", {"task_id": bench.rng.choice(bench.task_ids),
+                                                 "completed": bench.rng.random() < 0.5})
+
+
+SCENARIOS: Dict[str, Callable[[Bench], Awaitable[str]]] = {
+    "list_project": list_project,
+    "summarize_project": summarize_project,
+    "task_details": task_details,
+    "task_tree": task_tree,
+    "get_tasks": get_many_tasks,
+    "search_tasks": search,
+    "update_task": update,
+}
+
+
+# --- measurement ----------------------------------------------------------
+
+async def drive(bench: Bench, scenario: Callable[[Bench], Awaitable[str]], calls: int,
+                concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    outputs: List[str] = []
+    remaining = iter(range(calls))
+
+    async def worker() -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            outputs.append(await scenario(bench))
+            latencies.append(time.perf_counter() - start)
+
+    bench.fake.reset_counts()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    sample = outputs[-1]
+    encode_start = time.perf_counter()
+    encode(json.loads(sample))
+    encode_ms = (time.perf_counter() - encode_start) * 1000
+    latencies.sort()
+    return {
+        "calls": calls,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "calls_per_s": calls / elapsed,
+        "requests_per_call": bench.fake.request_count / calls,
+        "bytes_per_response": len(sample.encode("utf-8")),
+        "encode_ms": encode_ms,
+    }
+
+
+async def peak_memory(bench: Bench, scenario: Callable[[Bench], Awaitable[str]], calls: int,
+                      concurrency: int) -> float:
+    tracemalloc.start()
+    try:
+        await drive(bench, scenario, calls, concurrency)
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    fake = FakeAsana(workspaces=args.workspaces, projects=args.projects, tasks_per_project=args.tasks_per_project,
+                     latency=args.latency, jitter=args.jitter, rate_limit_every=args.rate_limit_every)
+    for epic in list(fake.tasks)[:EPICS]:
+        fake.add_subtask_tree(epic, EPIC_FANOUT)
+    base_url = fake.start()
+    results: Dict[str, Any] = {}
+    try:
+        for concurrency in args.concurrency:
+            bench = Bench(fake, base_url, cache=not args.no_cache, max_workers=max(concurrency, 4))
+            try:
+                for name in args.scenarios:
+                    scenario = SCENARIOS[name]
+                    calls = args.calls if name not in ("list_project", "summarize_project") else max(1, args.calls // 10)
+                    await drive(bench, scenario, min(calls, concurrency), concurrency)  # warm up
+                    result = await drive(bench, scenario, calls, concurrency)
+                    if not args.no_memory:
+                        result["peak_mb"] = await peak_memory(bench, scenario, max(1, calls // 4), concurrency)
+                    results[f"{name}@{concurrency}"] = result
+                    report_line(name, concurrency, result)
+            finally:
+                bench.close()
+    finally:
+        fake.stop()
+    results["_tool_metrics"] = METRICS.snapshot()["tools"]
+    return results
+
+
+def report_line(name: str, concurrency: int, r: Dict[str, Any]) -> None:
+    peak = f"{r['peak_mb']:8.1f}" if "peak_mb" in r else "       -"
+    print(f"{name:<14}{concurrency:>5}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['calls_per_s']:>10.1f}"
+          f"{r['requests_per_call']:>10.2f}{r['bytes_per_response']:>11}{r['encode_ms']:>10.2f}{peak}")
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Report p50/p99 latency and requests-per-call regressions beyond tolerance."""
+    regressions = []
+    for key, base in baseline.items():
+        current = results.get(key)
+        if key.startswith("_") or current is None:
+            continue
+        for metric in ("p50_ms", "p99_ms", "requests_per_call"):
+            if base[metric] and current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {base[metric]:.2f} -> {current[metric]:.2f}")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workspaces", type=int, default=1)
+    parser.add_argument("--projects", type=int, default=5)
+    parser.add_argument("--tasks-per-project", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every fake request")
+    parser.add_argument("--jitter", type=float, default=0.01, help="random extra latency, seconds")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 8, 32])
+    parser.add_argument("--calls", type=int, default=200, help="tool calls per scenario and concurrency level")
+    parser.add_argument("--scenarios", type=lambda v: v.split(","), default=list(SCENARIOS))
+    parser.add_argument("--no-cache", action="store_true", help="disable the task cache")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from --save; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    print(f"{'scenario':<14}{'conc':>5}{'p50 ms':>10}{'p99 ms':>10}{'calls/s':>10}"
+          f"{'req/call':>10}{'bytes':>11}{'enc ms':>10}{'peak MB':>8}")
+    results = asyncio.run(run(args))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Measure cold start of the stdio server.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 20
+
+Reports, as the median over --runs fresh interpreters:
+- import: time to import asana_mcp_server.server (and, for reference, the asana SDK alone)
+- initialize: from spawning `python -m asana_mcp_server` to the initialize response
+- tools/list: from spawning to the tools/list response
+No request reaches Asana; the token is a placeholder.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+INITIALIZE = {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+    "protocolVersion": "2025-03-26", "capabilities": {}, "clientInfo": {"name": "startup-bench", "version": "0"}}}
+INITIALIZED = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+LIST_TOOLS = {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}
+
+
+def child_env() -> Dict[str, str]:
+    env = dict(os.environ, ASANA_ACCESS_TOKEN="startup-bench")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC, env.get("PYTHONPATH")]))
+    for name in ("ASANA_MIRROR_PATH", "ASANA_SEARCH_INDEX_PATH"):
+        env.pop(name, None)  # background jobs would talk to Asana
+    return env
+
+
+def import_seconds(module: str) -> float:
+    script = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", script], env=child_env(), capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+
+def first_responses() -> Dict[str, float]:
+    """Spawn the stdio server and time its initialize and tools/list responses."""
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "asana_mcp_server"], env=child_env(), text=True,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        proc.stdin.write(json.dumps(INITIALIZE) + "\n")
+        proc.stdin.flush()
+        _read_response(proc, 1)
+        initialize = time.perf_counter() - started
+        proc.stdin.write(json.dumps(INITIALIZED) + "\n" + json.dumps(LIST_TOOLS) + "\n")
+        proc.stdin.flush()
+        tools = _read_response(proc, 2)["result"]["tools"]
+        if not tools:
+            raise RuntimeError("tools/list returned no tools")
+        return {"initialize": initialize, "tools_list": time.perf_counter() - started}
+    finally:
+        proc.stdin.close()
+        proc.terminate()
+        proc.wait()
+
+
+def _read_response(proc: subprocess.Popen, request_id: int) -> Dict:
+    for line in proc.stdout:
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+    raise RuntimeError(f"server exited before answering request {request_id}")
+
+
+def measure(runs: int) -> Dict[str, float]:
+    samples: Dict[str, List[float]] = {"import_server": [], "import_asana_sdk": [], "initialize": [], "tools_list": []}
+    for _ in range(runs):
+        samples["import_server"].append(import_seconds("asana_mcp_server.server"))
+        samples["import_asana_sdk"].append(import_seconds("asana"))
+        for name, seconds in first_responses().items():
+            samples[name].append(seconds)
+    return {name: statistics.median(values) * 1000 for name, values in samples.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+    results = measure(args.runs)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for name, ms in results.items():
+            print(f"{name:<18}{ms:>9.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
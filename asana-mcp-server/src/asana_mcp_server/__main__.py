@@ -1,8 +1,25 @@
+import argparse
 import asyncio
+import os
 from .server import serve
 
 def main():
-    asyncio.run(serve())
+    parser = argparse.ArgumentParser(prog="asana-mcp-server", description="MCP server for Asana")
+    parser.add_argument("--transport", choices=["stdio", "http"],
+                        default=os.environ.get("ASANA_MCP_TRANSPORT", "stdio"),
+                        help="stdio (one client per process) or http (streamable HTTP, many sessions)")
+    parser.add_argument("--host", default=os.environ.get("ASANA_MCP_HOST"), help="HTTP bind address")
+    parser.add_argument("--port", type=int, default=os.environ.get("ASANA_MCP_PORT"), help="HTTP port")
+    parser.add_argument("--allow-server-token", action="store_true", default=None,
+                        help="HTTP: run requests without a bearer token as ASANA_ACCESS_TOKEN "
+                             "(also ASANA_HTTP_ALLOW_SERVER_TOKEN=1)")
+    args = parser.parse_args()
+
+    if args.transport == "http":
+        from .http_app import DEFAULT_HOST, DEFAULT_PORT, serve_http
+        serve_http(args.host or DEFAULT_HOST, args.port or DEFAULT_PORT, args.allow_server_token)
+    else:
+        asyncio.run(serve())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,215 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .client import (
+    BATCH_SIZE,
+    DEFAULT_PAGE_SIZE,
+    TASK_FIELDS,
+    AsanaClient,
+    create_task_action,
+    get_task_action,
+    task_fields,
+    update_task_action,
+)
+from .deadline import CallAborted
+from .search_index import DEFAULT_SEARCH_LIMIT
+from .summary import DEFAULT_DUE_SOON_DAYS
+from .task_tree import (
+    DEFAULT_TREE_CONCURRENCY,
+    DEFAULT_TREE_DEPTH,
+    DEFAULT_TREE_MAX_NODES,
+    TREE_TASK_FIELDS,
+    TaskTree,
+)
+
+# Same default as ThreadPoolExecutor: calls are I/O bound, so oversubscribe the CPUs.
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+def default_max_workers() -> int:
+    """Read the worker pool size from ASANA_MAX_WORKERS, falling back to the default."""
+    value = os.environ.get("ASANA_MAX_WORKERS")
+    if not value:
+        return DEFAULT_MAX_WORKERS
+    workers = int(value)
+    if workers < 1:
+        raise ValueError("ASANA_MAX_WORKERS must be a positive integer")
+    return workers
+
+
+class AsyncAsanaClient:
+    """
+    Async facade over AsanaClient.
+
+    The generated asana SDK is blocking, so every call is dispatched to a bounded
+    thread pool. Concurrent tool calls overlap their network waits instead of
+    freezing the event loop that serves the MCP session.
+    """
+
+    def __init__(self, client: AsanaClient, max_workers: Optional[int] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.client = client
+        self.max_workers = max_workers or default_max_workers()
+        # Clients for several tokens can share one worker pool; only an owned pool is shut down.
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="asana")
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking callable on the worker pool and await its result.
+        It runs in a copy of the caller's context, so the call's Deadline goes with it.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, functools.partial(context.run, func, *args, **kwargs))
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        return self._executor
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._owns_executor:
+            self._executor.shutdown(wait=wait)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        # In-memory only, no need to hop to the worker pool.
+        return self.client.cache_stats()
+
+    async def get_me(self, refresh: bool = False) -> Dict[str, Any]:
+        return await self.run(self.client.get_me, refresh=refresh)
+
+    async def get_workspaces(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        return await self.run(self.client.get_workspaces, refresh=refresh)
+
+    async def default_workspace_id(self) -> str:
+        return await self.run(self.client.default_workspace_id)
+
+    async def get_my_tasks(self, workspace_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        return await self.run(self.client.get_my_tasks, workspace_id=workspace_id, limit=limit)
+
+    async def get_my_tasks_page(self, workspace_id: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                                offset: Optional[str] = None, opt_fields: Optional[str] = None) -> Dict[str, Any]:
+        return await self.run(self.client.get_my_tasks_page, workspace_id=workspace_id, limit=limit, offset=offset,
+                              opt_fields=opt_fields)
+
+    async def search_tasks(self, query: str, workspace_id: Optional[str] = None,
+                           completed: Optional[bool] = None, due_after: Optional[str] = None,
+                           due_before: Optional[str] = None, project_id: Optional[str] = None,
+                           limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        return await self.run(self.client.search_tasks, query, workspace_id=workspace_id, completed=completed,
+                              due_after=due_after, due_before=due_before, project_id=project_id, limit=limit)
+
+    async def create_task(self, name: str, project_id: Optional[str] = None,
+                          workspace_id: Optional[str] = None,
+                          due_on: Optional[str] = None,
+                          notes: Optional[str] = None) -> Dict[str, Any]:
+        return await self.run(self.client.create_task, name, project_id=project_id,
+                              workspace_id=workspace_id, due_on=due_on, notes=notes)
+
+    async def update_task(self, task_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.run(self.client.update_task, task_id, data)
+
+    async def get_task(self, task_id: str, opt_fields: Optional[str] = None) -> Dict[str, Any]:
+        return await self.run(self.client.get_task, task_id, opt_fields=opt_fields)
+
+    async def get_project_tasks(self, project_id: str, opt_fields: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self.run(self.client.get_project_tasks, project_id, opt_fields=opt_fields)
+
+    async def get_project_tasks_page(self, project_id: str, limit: int = DEFAULT_PAGE_SIZE,
+                                     offset: Optional[str] = None, opt_fields: Optional[str] = None) -> Dict[str, Any]:
+        return await self.run(self.client.get_project_tasks_page, project_id, limit=limit, offset=offset,
+                              opt_fields=opt_fields)
+
+    async def get_subtasks(self, task_id: str, opt_fields: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self.run(self.client.get_subtasks, task_id, opt_fields=opt_fields)
+
+    async def get_dependencies(self, task_id: str, opt_fields: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self.run(self.client.get_dependencies, task_id, opt_fields=opt_fields)
+
+    async def get_task_tree(self, task_id: str, max_depth: int = DEFAULT_TREE_DEPTH,
+                            max_nodes: int = DEFAULT_TREE_MAX_NODES, include_dependencies: bool = False,
+                            opt_fields: Optional[str] = None,
+                            max_concurrency: int = DEFAULT_TREE_CONCURRENCY) -> Dict[str, Any]:
+        """A task with its subtasks (and dependencies) down to max_depth, fetched a level at a time."""
+        tree = TaskTree(
+            lambda t, f: self.get_task(t, opt_fields=f),
+            lambda t, f: self.get_subtasks(t, opt_fields=f),
+            (lambda t, f: self.get_dependencies(t, opt_fields=f)) if include_dependencies else None,
+            max_depth=max_depth, max_nodes=max_nodes, max_concurrency=min(max_concurrency, self.max_workers),
+        )
+        return await tree.build(task_id, task_fields(opt_fields, TREE_TASK_FIELDS))
+
+    async def summarize_project(self, project_id: str, due_soon_days: int = DEFAULT_DUE_SOON_DAYS) -> Dict[str, Any]:
+        return await self.run(self.client.summarize_project, project_id, due_soon_days=due_soon_days)
+
+    async def add_comment(self, task_id: str, text: str) -> Dict[str, Any]:
+        return await self.run(self.client.add_comment, task_id, text)
+
+    async def mark_task_complete(self, task_id: str) -> Dict[str, Any]:
+        return await self.run(self.client.mark_task_complete, task_id)
+
+    async def mark_task_incomplete(self, task_id: str) -> Dict[str, Any]:
+        return await self.run(self.client.mark_task_incomplete, task_id)
+
+    async def fetch_events(self, resource: str, sync: Optional[str]) -> Dict[str, Any]:
+        return await self.run(self.client.fetch_events, resource, sync)
+
+    async def batch(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run any number of actions through /batch, BATCH_SIZE per request, with the
+        chunks in flight concurrently. A chunk that fails as a whole (network error,
+        rate limit, ...) reports that failure for each of its actions.
+        """
+        chunks = [actions[i:i + BATCH_SIZE] for i in range(0, len(actions), BATCH_SIZE)]
+        responses = await asyncio.gather(*(self.run(self.client.batch, c) for c in chunks),
+                                         return_exceptions=True)
+        outcomes: List[Dict[str, Any]] = []
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, CallAborted):
+                raise response
+            if isinstance(response, BaseException):
+                outcomes.extend({"ok": False, "error": str(response)} for _ in chunk)
+            else:
+                outcomes.extend(response)
+        return outcomes
+
+    async def get_tasks(self, task_ids: List[str], opt_fields: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Fetch many tasks at once; cached tasks are answered locally, the rest via /batch."""
+        fields = task_fields(opt_fields, TASK_FIELDS)
+        results: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for task_id in dict.fromkeys(task_ids):
+            task = self.client.cache.get(("task", task_id, fields))
+            if task is None:
+                missing.append(task_id)
+            else:
+                results[task_id] = {"ok": True, "data": task}
+        outcomes = await self.batch([get_task_action(t, fields) for t in missing])
+        results.update(zip(missing, outcomes))
+        return [dict(results[t], task_id=t) for t in task_ids]
+
+    async def bulk_update_tasks(self, updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply [{"task_id": ..., <fields>}, ...] updates through /batch."""
+        actions = []
+        for update in updates:
+            data = {k: v for k, v in update.items() if k != "task_id"}
+            actions.append(update_task_action(update["task_id"], data))
+        outcomes = await self.batch(actions)
+        return [dict(o, task_id=u["task_id"]) for u, o in zip(updates, outcomes)]
+
+    async def bulk_create_tasks(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create [{"name": ..., "notes"/"due_on"/"project_id"/"workspace_id": ...}, ...] through /batch."""
+        actions = []
+        for task in tasks:
+            data = await self.run(self.client.new_task_data, task["name"],
+                                  project_id=task.get("project_id"),
+                                  workspace_id=task.get("workspace_id"),
+                                  due_on=task.get("due_on"),
+                                  notes=task.get("notes"))
+            actions.append(create_task_action(data))
+        outcomes = await self.batch(actions)
+        return [dict(o, name=t["name"]) for t, o in zip(tasks, outcomes)]
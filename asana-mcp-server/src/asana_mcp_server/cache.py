@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache with a per-entry TTL and LRU eviction.
+
+    Entries older than ``ttl`` seconds are treated as misses; once ``maxsize``
+    entries are stored the least recently used one is evicted. A ``maxsize`` of
+    0 disables caching entirely.
+
+    Each key being loaded has a generation that invalidate() and update() bump, so a
+    load that was already running when its key was invalidated doesn't store its
+    (possibly stale) result afterwards.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> [generation, loads in progress], for keys with a load running.
+        self._loading: Dict[Hashable, List[int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling loader and storing its result on a miss.
+        The result is not stored if the key was invalidated or updated while loader ran.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            loading = self._loading.setdefault(key, [0, 0])
+            loading[1] += 1
+            generation = loading[0]
+        try:
+            value = loader()
+        except BaseException:
+            with self._lock:
+                self._finish_load(key, loading)
+            raise
+        with self._lock:
+            self._finish_load(key, loading)
+            if loading[0] == generation and self.maxsize > 0:
+                self._store(key, value)
+        return value
+
+    def _finish_load(self, key: Hashable, loading: List[int]) -> None:
+        loading[1] -= 1
+        if loading[1] == 0:
+            del self._loading[key]
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches predicate. Returns the number removed."""
+        with self._lock:
+            self._bump_loading(predicate)
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                del self._data[k]
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def update(self, predicate: Callable[[Hashable], bool], patch: Callable[[Any], Optional[Any]]) -> None:
+        """
+        Patch matching entries in place without resetting their TTL.
+        If patch returns None the entry can't be patched safely and is dropped instead.
+        """
+        with self._lock:
+            self._bump_loading(predicate)
+            for key in [k for k in self._data if predicate(k)]:
+                value, expires_at = self._data[key]
+                patched = patch(value)
+                if patched is None:
+                    del self._data[key]
+                    self.invalidations += 1
+                else:
+                    self._data[key] = (patched, expires_at)
+
+    def _bump_loading(self, predicate: Callable[[Hashable], bool]) -> None:
+        # Loads running for these keys started before this change; don't let them store.
+        for key, loading in self._loading.items():
+            if predicate(key):
+                loading[0] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bump_loading(lambda key: True)
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -1,30 +1,317 @@
+import itertools
+import json
 import os
-import asana
-from typing import Optional, List, Dict, Any
+import threading
+import time
+from functools import cached_property
+from typing import Optional, List, Dict, Any, Callable, Iterator, Union
+from .cache import TTLCache
+from .deadline import request_timeout
+from .scheduler import DEFAULT_MAX_IN_FLIGHT, DEFAULT_RATE, RequestScheduler
+from .mirror import (
+    DEFAULT_MAX_STALENESS,
+    MIRROR_CURSOR_PREFIX,
+    MIRROR_TASK_FIELDS,
+    TaskMirror,
+    my_tasks_scope,
+    project_scope,
+    mirror_covers,
+    select_fields,
+)
+from .search_index import DEFAULT_SEARCH_LIMIT, SearchIndex
+from .summary import DEFAULT_DUE_SOON_DAYS, SUMMARY_TASK_FIELDS, ProjectSummary
+
+# How long the resolved user/workspaces are reused before asking Asana again.
+DEFAULT_IDENTITY_TTL = 300.0
+DEFAULT_CACHE_TTL = 60.0
+DEFAULT_CACHE_MAXSIZE = 512
+
+TASK_FIELDS = "gid,name,notes,completed,due_on,projects.name,permalink_url,assignee.name"
+PROJECT_TASK_FIELDS = "gid,name,completed,due_on,assignee.name"
+MY_TASK_FIELDS = "gid,name,due_on,completed,projects.name"
+CREATED_TASK_FIELDS = "gid,name,permalink_url"
+UPDATED_TASK_FIELDS = "gid,name,completed"
+
+# Asana accepts at most 10 actions per /batch request.
+BATCH_SIZE = 10
+
+# Asana returns at most 100 records per page.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def task_fields(opt_fields: Union[str, List[str], None], default: str) -> str:
+    """
+    Normalize a caller's field projection ("name,due_on" or ["name", "due_on"]) to an
+    opt_fields string, always including gid. Falls back to default when none is given.
+    """
+    if not opt_fields:
+        return default
+    if isinstance(opt_fields, str):
+        opt_fields = opt_fields.split(",")
+    fields = [f.strip() for f in opt_fields if f.strip()]
+    return ",".join(dict.fromkeys(["gid"] + fields))
+
+
+def get_task_action(task_id: str, opt_fields: str = TASK_FIELDS) -> Dict[str, Any]:
+    return {"method": "get", "relative_path": f"/tasks/{task_id}",
+            "options": {"fields": opt_fields.split(",")}}
+
+
+def update_task_action(task_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    return {"method": "put", "relative_path": f"/tasks/{task_id}", "data": data,
+            "options": {"fields": UPDATED_TASK_FIELDS.split(",")}}
+
+
+def create_task_action(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {"method": "post", "relative_path": "/tasks", "data": data,
+            "options": {"fields": CREATED_TASK_FIELDS.split(",")}}
+
+
+def _batch_outcome(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize one /batch response entry to {"ok", "data"} or {"ok", "status", "error"}."""
+    status = result.get("status_code", 0)
+    body = result.get("body") or {}
+    if 200 <= status < 300:
+        return {"ok": True, "data": body.get("data")}
+    errors = body.get("errors") or [{}]
+    return {"ok": False, "status": status, "error": errors[0].get("message", f"HTTP {status}")}
+
+
+def _opts_key(opts: Dict[str, Any]) -> tuple:
+    """Hashable form of request options, used to coalesce identical in-flight reads."""
+    return tuple(sorted((k, str(v)) for k, v in opts.items()))
+
+
+def _matches_filters(task: Dict[str, Any], completed: Optional[bool], due_after: Optional[str],
+                     due_before: Optional[str], project_id: Optional[str]) -> bool:
+    """Apply search_tasks filters to a typeahead result."""
+    if completed is not None and bool(task.get('completed')) != completed:
+        return False
+    due_on = task.get('due_on')
+    if (due_after or due_before) and not due_on:
+        return False
+    if due_after and due_on < due_after:
+        return False
+    if due_before and due_on > due_before:
+        return False
+    if project_id and not any(p.get('gid') == project_id for p in task.get('projects') or []):
+        return False
+    return True
+
+
+def _new_task_record(gid: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild a searchable record for a task we just created from its request data."""
+    return {
+        "gid": gid,
+        "name": data.get("name"),
+        "notes": data.get("notes"),
+        "completed": False,
+        "due_on": data.get("due_on"),
+        "projects": [{"gid": p} for p in data.get("projects", [])],
+        "workspace": {"gid": data["workspace"]} if data.get("workspace") else None,
+    }
+
+
+def _patch_fields(record: Dict[str, Any], data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Apply a write's scalar fields to a cached record.
+    Returns None when a written field is a nested object in the record (e.g. assignee),
+    since the write payload (a gid) doesn't have the same shape as the cached value.
+    """
+    patched = dict(record)
+    for field, value in data.items():
+        if field not in record:
+            continue
+        if isinstance(record[field], (dict, list)):
+            return None
+        patched[field] = value
+    return patched
+
+def _within_deadline(request: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap ApiClient.request so every HTTP request (including each page a PageIterator
+    fetches) first checks the current call's deadline and gets its remaining time as
+    the urllib3 timeout.
+    """
+    def request_within_deadline(*args: Any, _request_timeout: Any = None, **kwargs: Any) -> Any:
+        return request(*args, _request_timeout=_request_timeout or request_timeout(), **kwargs)
+    return request_within_deadline
+
+
+def _sdk():
+    """Import the generated asana SDK on first use."""
+    import asana
+    return asana
+
 
 class AsanaClient:
-    def __init__(self, access_token: Optional[str] = None):
+    def __init__(self, access_token: Optional[str] = None, max_connections: Optional[int] = None,
+                 identity_ttl: Optional[float] = None, cache: Optional[TTLCache] = None,
+                 scheduler: Optional[RequestScheduler] = None,
+                 mirror: Optional[TaskMirror] = None, mirror_max_staleness: Optional[float] = None,
+                 search_index: Optional[SearchIndex] = None, rest_client: Optional[Any] = None,
+                 host: Optional[str] = None):
         self.access_token = access_token or os.environ.get("ASANA_ACCESS_TOKEN")
         if not self.access_token:
             raise ValueError("ASANA_ACCESS_TOKEN environment variable is required")
 
-        self.configuration = asana.Configuration()
-        self.configuration.access_token = self.access_token
-        self.api_client = asana.ApiClient(self.configuration)
+        if identity_ttl is None:
+            identity_ttl = float(os.environ.get("ASANA_IDENTITY_TTL", DEFAULT_IDENTITY_TTL))
+        self.identity_ttl = identity_ttl
+        self._identity_cache: Dict[str, Any] = {}
+        self._identity_lock = threading.Lock()
+
+        # Read-through cache for tasks and project task lists, keyed by (kind, gid, opt_fields).
+        self.cache = cache if cache is not None else TTLCache(
+            maxsize=int(os.environ.get("ASANA_CACHE_MAXSIZE", DEFAULT_CACHE_MAXSIZE)),
+            ttl=float(os.environ.get("ASANA_CACHE_TTL", DEFAULT_CACHE_TTL)),
+        )
+
+        # Optional local SQLite mirror (kept fresh by MirrorSync); reads fall back to Asana when stale.
+        self.mirror = mirror
+        if mirror_max_staleness is None:
+            mirror_max_staleness = float(os.environ.get("ASANA_MIRROR_MAX_STALENESS", DEFAULT_MAX_STALENESS))
+        self.mirror_max_staleness = mirror_max_staleness
+
+        # Optional local full-text index answering search_tasks (kept fresh by SearchIndexer).
+        self.search_index = search_index
+
+        # The generated SDK takes a noticeable share of startup to import and ApiClient starts a
+        # thread pool, so both wait until the first Asana call (see api_client below); a stdio
+        # server can answer initialize and tools/list without them.
+        self.host = host or os.environ.get("ASANA_API_URL")
+        self.max_connections = max_connections
+        self._rest_client = rest_client
+        self._api_client = None
+        self._sdk_lock = threading.Lock()
+
+        self.scheduler = scheduler if scheduler is not None else RequestScheduler(
+            rate=float(os.environ.get("ASANA_RATE_LIMIT", DEFAULT_RATE)),
+            max_in_flight=int(os.environ.get("ASANA_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT)),
+        )
+
+
+    @property
+    def api_client(self):
+        """The asana.ApiClient shared by every API object, created on first use."""
+        if self._api_client is None:
+            with self._sdk_lock:
+                if self._api_client is None:
+                    self._api_client = self._new_api_client()
+        return self._api_client
+
+    def _new_api_client(self):
+        asana = _sdk()
+        from urllib3.util.retry import Retry
+
+        configuration = asana.Configuration()
+        configuration.access_token = self.access_token
+        # ASANA_API_URL points the client at another Asana-compatible server (e.g. the benchmark fake).
+        if self.host:
+            configuration.host = self.host.rstrip("/")
+        if self.max_connections:
+            # Keep one keep-alive connection per worker so parallel calls don't discard sockets.
+            configuration.connection_pool_maxsize = max(
+                configuration.connection_pool_maxsize or 0, self.max_connections)
+        # Status-code retries (429/5xx) are handled by the scheduler so they honor Retry-After,
+        # count against the rate budget and never replay non-idempotent writes.
+        # urllib3 only retries failed connections; it must hand 429s back rather than acting on
+        # their Retry-After header itself (and raising MaxRetryError once status=0 is spent).
+        configuration.retry_strategy = Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.5,
+                                             respect_retry_after_header=False, raise_on_status=False)
+        api_client = asana.ApiClient(configuration)
+        # ApiClient starts a ThreadPool (one thread per CPU) for async_req calls, which this client
+        # never makes; with a client per user those idle threads would add up.
+        pool = api_client.__dict__.pop("pool", None)
+        if pool is not None:
+            pool.close()
+        api_client.request = _within_deadline(api_client.request)
+        if self._rest_client is not None:
+            # Share another client's urllib3 pool (asana.rest.RESTClientObject). The token is
+            # sent per request from this client's configuration, so clients for different users
+            # can reuse the same keep-alive connections.
+            api_client.rest_client = self._rest_client
+        return api_client
+
+    # API objects are built on first use; most tool calls need only one or two of them.
+
+    @cached_property
+    def users_api(self):
+        return _sdk().UsersApi(self.api_client)
 
-        self.users_api = asana.UsersApi(self.api_client)
-        self.tasks_api = asana.TasksApi(self.api_client)
-        self.projects_api = asana.ProjectsApi(self.api_client)
-        self.workspaces_api = asana.WorkspacesApi(self.api_client)
-        self.stories_api = asana.StoriesApi(self.api_client)
+    @cached_property
+    def tasks_api(self):
+        return _sdk().TasksApi(self.api_client)
 
-    def get_me(self) -> Dict[str, Any]:
+    @cached_property
+    def projects_api(self):
+        return _sdk().ProjectsApi(self.api_client)
+
+    @cached_property
+    def workspaces_api(self):
+        return _sdk().WorkspacesApi(self.api_client)
+
+    @cached_property
+    def stories_api(self):
+        return _sdk().StoriesApi(self.api_client)
+
+    @cached_property
+    def batch_api(self):
+        return _sdk().BatchAPIApi(self.api_client)
+
+    @cached_property
+    def events_api(self):
+        return _sdk().EventsApi(self.api_client)
+
+    @cached_property
+    def typeahead_api(self):
+        return _sdk().TypeaheadApi(self.api_client)
+
+    def _cached_identity(self, key: str, loader: Callable[[], Any], refresh: bool = False) -> Any:
+        """
+        Return a memoized identity lookup, reloading it once identity_ttl has passed.
+        The lock is held while loading so concurrent cold callers share one request.
+        """
+        with self._identity_lock:
+            entry = self._identity_cache.get(key)
+            now = time.monotonic()
+            if entry and not refresh and entry[1] > now:
+                return entry[0]
+            value = loader()
+            self._identity_cache[key] = (value, now + self.identity_ttl)
+            return value
+
+    def invalidate_identity_cache(self) -> None:
+        """Forget the cached user and workspaces (e.g. after joining a new workspace)."""
+        with self._identity_lock:
+            self._identity_cache.clear()
+
+    def get_me(self, refresh: bool = False) -> Dict[str, Any]:
         """Get the current user's information."""
-        return self.users_api.get_user("me", opts={'opt_fields': "gid,name,email,workspaces"})
+        return self._cached_identity(
+            "me",
+            lambda: self.scheduler.run(
+                ("users.me",), self.users_api.get_user, "me", opts={'opt_fields': "gid,name,email,workspaces"},
+                endpoint="users_api.get_user"),
+            refresh,
+        )
 
-    def get_workspaces(self) -> List[Dict[str, Any]]:
+    def get_workspaces(self, refresh: bool = False) -> List[Dict[str, Any]]:
         """Get a list of workspaces accessible to the user."""
-        return list(self.workspaces_api.get_workspaces(opts={'opt_fields': "gid,name"}))
+        return self._cached_identity(
+            "workspaces",
+            lambda: list(self._iter_pages(("workspaces",), "workspaces_api.get_workspaces",
+                                          self.workspaces_api.get_workspaces, opts={'opt_fields': "gid,name"})),
+            refresh,
+        )
+
+    def default_workspace_id(self) -> str:
+        """Return the user's first workspace, used when a tool call omits workspace_id."""
+        me = self.get_me()
+        if me.get('workspaces'):
+            return me['workspaces'][0]['gid']
+        raise ValueError("No workspace found for user")
 
     def get_my_tasks(self, workspace_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
         """Get tasks assigned to the current user."""
@@ -32,102 +319,406 @@ class AsanaClient:
         # Actually get_tasks usually requires workspace or project or assignee.
         # For "my tasks", we usually filter by assignee='me' and workspace.
 
+        opts = self._my_tasks_opts(workspace_id)
+        scope = my_tasks_scope(opts['workspace'])
+        if self.mirror and self.mirror.is_fresh(scope, self.mirror_max_staleness):
+            tasks, _ = self.mirror.scope_tasks(scope, limit, incomplete_only=True)
+            return [select_fields(t, MY_TASK_FIELDS) for t in tasks]
+        # Stop after `limit` tasks instead of walking every page.
+        return list(itertools.islice(self.iter_tasks(opts, min(limit, MAX_PAGE_SIZE)), limit))
+
+    def get_my_tasks_page(self, workspace_id: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                          offset: Optional[str] = None, opt_fields: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of the current user's tasks. See get_tasks_page."""
+        opts = self._my_tasks_opts(workspace_id, opt_fields)
+        page = self._mirror_page(my_tasks_scope(opts['workspace']), limit, offset, opts['opt_fields'],
+                                 incomplete_only=True)
+        if page is not None:
+            return page
+        return self.get_tasks_page(opts, limit, offset)
+
+    def _my_tasks_opts(self, workspace_id: Optional[str], opt_fields: Optional[str] = None) -> Dict[str, Any]:
         if not workspace_id:
             # Try to get the first workspace from 'me'
-            me = self.get_me()
-            if me.get('workspaces'):
-                workspace_id = me['workspaces'][0]['gid']
-            else:
-                raise ValueError("No workspace found for user")
+            workspace_id = self.default_workspace_id()
 
-        opts = {
+        return {
             'workspace': workspace_id,
             'assignee': 'me',
             'completed_since': 'now', # Only incomplete tasks by default? Or maybe 'now' means recently completed?
             # actually 'completed_since'='now' returns incomplete tasks.
             # If we want all, we might not set this. Let's return incomplete tasks by default.
-            'limit': limit,
-            'opt_fields': "gid,name,due_on,completed,projects.name"
+            'opt_fields': task_fields(opt_fields, MY_TASK_FIELDS)
         }
-        return list(self.tasks_api.get_tasks(opts))
 
-    def search_tasks(self, query: str, workspace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    def get_tasks_page(self, opts: Dict[str, Any], limit: int = DEFAULT_PAGE_SIZE,
+                       offset: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fetch a single page of GET /tasks.
+        Returns {"data": [...], "next_page": <offset token or None>}; pass next_page back
+        as offset to continue. Only this page is requested and held in memory.
+        """
+        opts = dict(opts, limit=max(1, min(limit, MAX_PAGE_SIZE)))
+        if offset:
+            opts['offset'] = offset
+        response = self.scheduler.run(("tasks.page", _opts_key(opts)), self.tasks_api.get_tasks, opts,
+                                      full_payload=True, endpoint="tasks_api.get_tasks")
+        next_page = response.get('next_page')
+        return {"data": response['data'], "next_page": next_page['offset'] if next_page else None}
+
+    def _iter_pages(self, key: tuple, endpoint: str, method: Callable[..., Any], *args: Any,
+                    opts: Dict[str, Any], page_size: int = MAX_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield every item of a paginated SDK listing (method(*args, opts)).
+        Each page is its own scheduled request, so it is retried, rate limited and measured
+        on its own rather than the whole listing counting as one call.
+        """
+        offset = None
+        while True:
+            page_opts = dict(opts, limit=page_size)
+            if offset:
+                page_opts['offset'] = offset
+            response = self.scheduler.run(key + (offset,), method, *args, page_opts,
+                                          full_payload=True, endpoint=endpoint)
+            yield from response['data']
+            next_page = response.get('next_page')
+            offset = next_page['offset'] if next_page else None
+            if not offset:
+                return
+
+    def iter_tasks(self, opts: Dict[str, Any], page_size: int = MAX_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """Lazily yield every task matching opts, fetching one page at a time."""
+        offset = None
+        while True:
+            page = self.get_tasks_page(opts, page_size, offset)
+            yield from page["data"]
+            offset = page["next_page"]
+            if not offset:
+                return
+
+    def iter_project_tasks(self, project_id: str, opt_fields: str = PROJECT_TASK_FIELDS,
+                           page_size: int = MAX_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the tasks of a project without materializing the whole list."""
+        return self.iter_tasks({'project': project_id, 'opt_fields': opt_fields}, page_size)
+
+    def summarize_project(self, project_id: str, due_soon_days: int = DEFAULT_DUE_SOON_DAYS) -> Dict[str, Any]:
+        """
+        Count a project's tasks by completion, due date, assignee and section.
+        Pages are streamed through the aggregates with minimal fields, so only one page is
+        held in memory however large the project is.
+        """
+        summary = ProjectSummary(project_id, due_soon_days=due_soon_days)
+        return summary.add_all(self.iter_project_tasks(project_id, opt_fields=SUMMARY_TASK_FIELDS)).result()
+
+    def search_tasks(self, query: str, workspace_id: Optional[str] = None,
+                     completed: Optional[bool] = None, due_after: Optional[str] = None,
+                     due_before: Optional[str] = None, project_id: Optional[str] = None,
+                     limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict[str, Any]]:
         """
         Search for tasks.
-        Using typeahead for simple text search or regular search?
-        The standard search API is powerful but complex.
-        Let's use typeahead for 'resource' like search, but maybe full search for tools.
-        Actually, let's use the 'get_tasks' with text filter if available, or typeahead.
+        Answered from the local full-text index (names, notes, project names; ranked,
+        prefix matching) once the whole workspace has been indexed, or the search is limited
+        to a project that has been. Otherwise falls back to
+        Asana's typeahead, which only matches names, and applies the filters to its results.
         """
         if not workspace_id:
-             me = self.get_me()
-             if me.get('workspaces'):
-                 workspace_id = me['workspaces'][0]['gid']
-             else:
-                 raise ValueError("No workspace found for user")
+            workspace_id = self.default_workspace_id()
+
+        if self.search_index and self.search_index.covers(workspace_id, project_id):
+            return self.search_index.search(query, workspace_id, completed=completed, due_after=due_after,
+                                            due_before=due_before, project_id=project_id, limit=limit)
 
         # Using Typeahead for simple text search
-        typeahead_api = asana.TypeaheadApi(self.api_client)
         opts = {
             'resource_type': 'task',
             'query': query,
+            'count': min(limit, MAX_PAGE_SIZE),
             'opt_fields': "gid,name,completed,due_on,projects.name"
         }
-        return list(typeahead_api.typeahead_for_workspace(workspace_id, 'task', opts))
+        tasks = self.scheduler.run(
+            ("typeahead", workspace_id, query, opts['count']),
+            lambda: list(self.typeahead_api.typeahead_for_workspace(workspace_id, 'task', dict(opts))),
+            endpoint="typeahead_api.typeahead_for_workspace")
+        return [t for t in tasks if _matches_filters(t, completed, due_after, due_before, project_id)]
+
+    def iter_workspace_projects(self, workspace_id: str) -> List[Dict[str, Any]]:
+        """List the active projects of a workspace."""
+        opts = {'archived': False, 'opt_fields': "gid,name"}
+        return list(self._iter_pages(("projects", workspace_id), "projects_api.get_projects_for_workspace",
+                                     self.projects_api.get_projects_for_workspace, workspace_id, opts=opts))
 
     def create_task(self, name: str, project_id: Optional[str] = None,
                     workspace_id: Optional[str] = None,
                     due_on: Optional[str] = None,
                     notes: Optional[str] = None) -> Dict[str, Any]:
         """Create a new task."""
+        body = {"data": self.new_task_data(name, project_id, workspace_id, due_on, notes)}
+        # With a mirror, ask for the full record so the new task can be stored right away.
+        fields = MIRROR_TASK_FIELDS if self.mirror else CREATED_TASK_FIELDS
+        task = self.scheduler.run(None, self.tasks_api.create_task, body, opts={'opt_fields': fields},
+                                  idempotent=False, endpoint="tasks_api.create_task")
+        if project_id:
+            self.invalidate_project(str(project_id))
+        if self.mirror:
+            self.mirror.upsert_task(task, self.mirror_scopes(task))
+            task = select_fields(task, CREATED_TASK_FIELDS)
+        if self.search_index:
+            self.search_index.add_tasks([_new_task_record(task["gid"], body["data"])])
+        return task
+
+    def new_task_data(self, name: str, project_id: Optional[str] = None,
+                      workspace_id: Optional[str] = None,
+                      due_on: Optional[str] = None,
+                      notes: Optional[str] = None) -> Dict[str, Any]:
+        """Build the request data for a new task, defaulting to the user's first workspace."""
         data = {"name": name}
         if notes:
             data["notes"] = notes
         if due_on:
             data["due_on"] = due_on
 
-        body = {"data": data}
-
         if project_id:
-            body["data"]["projects"] = [str(project_id)]
+            data["projects"] = [str(project_id)]
 
         if workspace_id and not project_id:
-            body["data"]["workspace"] = str(workspace_id)
+            data["workspace"] = str(workspace_id)
         elif not workspace_id and not project_id:
              # Default to first workspace
-             me = self.get_me()
-             if me.get('workspaces'):
-                 body["data"]["workspace"] = me['workspaces'][0]['gid']
+             data["workspace"] = self.default_workspace_id()
 
         # If project_id is set, workspace is inferred from project, so we don't strictly need it unless project is not in default workspace?
         # Asana API usually handles project -> workspace inference.
-
-        return self.tasks_api.create_task(body, opts={'opt_fields': "gid,name,permalink_url"})
+        return data
 
     def update_task(self, task_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update an existing task."""
         body = {"data": data}
-        return self.tasks_api.update_task(body, task_id, opts={'opt_fields': "gid,name,completed"})
+        fields = MIRROR_TASK_FIELDS if self.mirror else UPDATED_TASK_FIELDS
+        task = self.scheduler.run(None, self.tasks_api.update_task, body, task_id,
+                                  opts={'opt_fields': fields}, endpoint="tasks_api.update_task")
+        self._apply_task_update(task_id, data)
+        if self.mirror:
+            self.mirror.upsert_task(task, self.mirror_scopes(task))
+            task = select_fields(task, UPDATED_TASK_FIELDS)
+        if self.search_index:
+            self.search_index.patch_task(task_id, data)
+        return task
 
-    def get_task(self, task_id: str) -> Dict[str, Any]:
-        """Get full details of a task."""
-        return self.tasks_api.get_task(task_id, opts={'opt_fields': "gid,name,notes,completed,due_on,projects.name,permalink_url,assignee.name"})
+    def get_task(self, task_id: str, opt_fields: Optional[str] = None) -> Dict[str, Any]:
+        """Get full details of a task, or only the fields in opt_fields."""
+        fields = task_fields(opt_fields, TASK_FIELDS)
+        if self.mirror and mirror_covers(fields):
+            task = self.mirror.get_task(task_id, self.mirror_max_staleness)
+            if task is not None:
+                return select_fields(task, fields)
+        return self.cache.get_or_load(
+            ("task", task_id, fields),
+            lambda: self.scheduler.run(("task", task_id, fields), self.tasks_api.get_task, task_id,
+                                       opts={'opt_fields': fields}, endpoint="tasks_api.get_task"),
+        )
 
-    def get_project_tasks(self, project_id: str) -> List[Dict[str, Any]]:
-        """Get tasks in a project."""
+    def get_project_tasks(self, project_id: str, opt_fields: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get all tasks in a project.
+        This loads every page; prefer get_project_tasks_page or iter_project_tasks for large projects.
+        """
+        fields = task_fields(opt_fields, PROJECT_TASK_FIELDS)
+        if self.mirror and mirror_covers(fields) \
+                and self.mirror.is_fresh(project_scope(project_id), self.mirror_max_staleness):
+            tasks, _ = self.mirror.scope_tasks(project_scope(project_id))
+            return [select_fields(t, fields) for t in tasks]
         opts = {
             'project': project_id,
-            'opt_fields': "gid,name,completed,due_on,assignee.name"
+            'opt_fields': fields
         }
-        return list(self.tasks_api.get_tasks(opts))
+        return self.cache.get_or_load(("project_tasks", project_id, fields), lambda: list(self.iter_tasks(opts)))
+
+    def get_subtasks(self, task_id: str, opt_fields: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the direct subtasks of a task."""
+        fields = task_fields(opt_fields, PROJECT_TASK_FIELDS)
+        opts = {'opt_fields': fields}
+        return self.cache.get_or_load(
+            ("task_children", task_id, "subtasks", fields),
+            lambda: list(self._iter_pages(("subtasks", task_id, fields), "tasks_api.get_subtasks_for_task",
+                                          self.tasks_api.get_subtasks_for_task, task_id, opts=opts)),
+        )
+
+    def get_dependencies(self, task_id: str, opt_fields: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the tasks a task depends on."""
+        fields = task_fields(opt_fields, PROJECT_TASK_FIELDS)
+        opts = {'opt_fields': fields}
+        return self.cache.get_or_load(
+            ("task_children", task_id, "dependencies", fields),
+            lambda: list(self._iter_pages(("dependencies", task_id, fields), "tasks_api.get_dependencies_for_task",
+                                          self.tasks_api.get_dependencies_for_task, task_id, opts=opts)),
+        )
+
+    def get_project_tasks_page(self, project_id: str, limit: int = DEFAULT_PAGE_SIZE,
+                               offset: Optional[str] = None, opt_fields: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of a project's tasks. See get_tasks_page."""
+        fields = task_fields(opt_fields, PROJECT_TASK_FIELDS)
+        page = self._mirror_page(project_scope(project_id), limit, offset, fields)
+        if page is not None:
+            return page
+        opts = {
+            'project': project_id,
+            'opt_fields': fields
+        }
+        return self.cache.get_or_load(
+            ("project_tasks", project_id, fields, limit, offset),
+            lambda: self.get_tasks_page(opts, limit, offset),
+        )
 
     def add_comment(self, task_id: str, text: str) -> Dict[str, Any]:
         """Add a comment to a task."""
         body = {"data": {"text": text}}
-        return self.stories_api.create_story_for_task(body, task_id, opts={'opt_fields': "gid,text"})
+        story = self.scheduler.run(None, self.stories_api.create_story_for_task, body, task_id,
+                                   opts={'opt_fields': "gid,text"}, idempotent=False,
+                                   endpoint="stories_api.create_story_for_task")
+        # A new story bumps modified_at and the comment count, so don't serve the old record.
+        self.invalidate_task(task_id)
+        return story
 
     def mark_task_complete(self, task_id: str) -> Dict[str, Any]:
         return self.update_task(task_id, {"completed": True})
 
     def mark_task_incomplete(self, task_id: str) -> Dict[str, Any]:
         return self.update_task(task_id, {"completed": False})
+
+    def batch(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run up to BATCH_SIZE actions in a single /batch request.
+        Returns one normalized outcome per action, in order; cached entries touched by
+        successful reads and writes are refreshed like their single-call counterparts.
+        """
+        if len(actions) > BATCH_SIZE:
+            raise ValueError(f"A batch request accepts at most {BATCH_SIZE} actions")
+        read_only = all(a["method"] == "get" for a in actions)
+        sent = [self._with_mirror_fields(a) for a in actions] if self.mirror else actions
+        response = self.scheduler.run(None, self.batch_api.create_batch_request, {"data": {"actions": sent}}, {},
+                                      full_payload=True, idempotent=read_only,
+                                      endpoint="batch_api.create_batch_request")
+        outcomes = [_batch_outcome(r) for r in response["data"]]
+        for action, sent_action, outcome in zip(actions, sent, outcomes):
+            if outcome["ok"]:
+                self._apply_batch_action(sent_action, outcome["data"])
+                if sent_action is not action:
+                    outcome["data"] = select_fields(outcome["data"], ",".join(action["options"]["fields"]))
+        return outcomes
+
+    def _with_mirror_fields(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        # Like create_task: ask for the full record of new tasks so they can be mirrored right away.
+        if action["method"] == "post" and action["relative_path"] == "/tasks":
+            return dict(action, options=dict(action.get("options", {}), fields=MIRROR_TASK_FIELDS.split(",")))
+        return action
+
+    def _apply_batch_action(self, action: Dict[str, Any], data: Dict[str, Any]) -> None:
+        path = action["relative_path"]
+        if action["method"] == "get" and path.startswith("/tasks/"):
+            self.cache.set(("task", path[len("/tasks/"):], ",".join(action["options"]["fields"])), data)
+        elif action["method"] == "put" and path.startswith("/tasks/"):
+            self._apply_task_update(path[len("/tasks/"):], action["data"])
+            if self.mirror:
+                self.mirror.patch_task(path[len("/tasks/"):], action["data"])
+            if self.search_index:
+                self.search_index.patch_task(path[len("/tasks/"):], action["data"])
+        elif action["method"] == "post" and path == "/tasks":
+            for project_id in action["data"].get("projects", []):
+                self.invalidate_project(project_id)
+            if self.mirror:
+                self.mirror.upsert_task(data, self.mirror_scopes(data))
+            if self.search_index:
+                self.search_index.add_tasks([_new_task_record(data["gid"], action["data"])])
+
+    def fetch_events(self, resource: str, sync: Optional[str]) -> Dict[str, Any]:
+        """
+        Read one batch of events for a project or task since a sync token.
+        Returns {"data", "sync", "has_more"}; when the token is missing or too old Asana
+        answers 412 with a fresh token, reported as {"expired": True, "sync": <token>}.
+        """
+        opts = {'sync': sync} if sync else {}
+        try:
+            response = self.scheduler.run(None, self.events_api.get_events, resource, opts,
+                                          full_payload=True, endpoint="events_api.get_events")
+        except Exception as e:
+            if getattr(e, "status", None) != 412:
+                raise
+            body = json.loads(e.body.decode("utf-8") if isinstance(e.body, bytes) else e.body)
+            return {"expired": True, "sync": body["sync"], "data": [], "has_more": False}
+        return {"data": response.get("data") or [], "sync": response.get("sync"),
+                "has_more": response.get("has_more", False)}
+
+    def mirror_scopes(self, task: Dict[str, Any]) -> List[str]:
+        """The mirror scopes a task record belongs to: its projects, and "my tasks" if assigned to us."""
+        scopes = [project_scope(p['gid']) for p in task.get('projects') or []]
+        assignee = task.get('assignee') or {}
+        workspace = task.get('workspace') or {}
+        if assignee.get('gid') and workspace.get('gid') and assignee['gid'] == self.get_me().get('gid'):
+            scopes.append(my_tasks_scope(workspace['gid']))
+        return scopes
+
+    def _mirror_page(self, scope: str, limit: int, offset: Optional[str], opt_fields: str,
+                     incomplete_only: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Serve a listing page from the mirror when the scope is fresh, or None to go live.
+        Mirror cursors are continued from the mirror even if it turned stale meanwhile,
+        so one pagination run never mixes the two sources.
+        """
+        if self.mirror is None:
+            return None
+        if offset and offset.startswith(MIRROR_CURSOR_PREFIX):
+            if not mirror_covers(opt_fields):
+                raise ValueError("This cursor can't be continued with fields the mirror doesn't store")
+            start = int(offset[len(MIRROR_CURSOR_PREFIX):])
+        elif not offset and mirror_covers(opt_fields) and self.mirror.is_fresh(scope, self.mirror_max_staleness):
+            start = 0
+        else:
+            return None
+        tasks, next_offset = self.mirror.scope_tasks(scope, max(1, min(limit, MAX_PAGE_SIZE)), start,
+                                                     incomplete_only=incomplete_only)
+        return {
+            "data": [select_fields(t, opt_fields) for t in tasks],
+            "next_page": f"{MIRROR_CURSOR_PREFIX}{next_offset}" if next_offset is not None else None,
+        }
+
+    def scheduler_stats(self) -> Dict[str, Any]:
+        """Request, retry, rate-limit and coalescing counters of the request scheduler."""
+        return self.scheduler.stats()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters of the task cache, for sizing ASANA_CACHE_MAXSIZE/TTL."""
+        return self.cache.stats()
+
+    def invalidate_task(self, task_id: str) -> None:
+        self.cache.invalidate(lambda key: key[0] in ("task", "task_children") and key[1] == task_id)
+
+    def invalidate_project(self, project_id: str) -> None:
+        self.cache.invalidate(lambda key: key[0] == "project_tasks" and key[1] == project_id)
+
+    def _apply_task_update(self, task_id: str, data: Dict[str, Any]) -> None:
+        """Patch cached copies of a task (and project lists containing it) after our own write."""
+        self.cache.update(
+            lambda key: key[0] == "task" and key[1] == task_id,
+            lambda task: _patch_fields(task, data),
+        )
+
+        def patch_entry(value: Any) -> Optional[Any]:
+            # Project entries are either full lists or {"data": [...], "next_page": ...} pages.
+            if isinstance(value, dict):
+                tasks = patch_list(value["data"])
+                return None if tasks is None else dict(value, data=tasks)
+            return patch_list(value)
+
+        def patch_list(tasks: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+            if not any(t.get('gid') == task_id for t in tasks):
+                return tasks
+            patched = []
+            for t in tasks:
+                if t.get('gid') == task_id:
+                    t = _patch_fields(t, data)
+                    if t is None:
+                        return None
+                patched.append(t)
+            return patched
+
+        self.cache.update(lambda key: key[0] in ("project_tasks", "task_children"), patch_entry)
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# A few hundred users per process; each client holds its own task cache and rate-limit budget.
+DEFAULT_POOL_SIZE = 256
+# Drop a user's client (and its cache) after this long without a call.
+DEFAULT_IDLE_TTL = 1800.0
+
+
+class ClientPool:
+    """
+    Clients built on demand per key (an access token), with LRU and idle eviction.
+
+    Each key gets its own client, so caches and rate-limit budgets never mix between users.
+    At most ``maxsize`` clients are kept; the least recently used one is evicted when a new
+    key arrives, and clients unused for ``idle_ttl`` seconds are evicted on the next lookup.
+    ``on_evict`` is called with each evicted client (outside the lock); a client that is
+    still serving a call finishes it and is then garbage-collected.
+    """
+
+    def __init__(self, factory: Callable[[Hashable], Any], maxsize: int = DEFAULT_POOL_SIZE,
+                 idle_ttl: float = DEFAULT_IDLE_TTL, on_evict: Optional[Callable[[Any], Any]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.factory = factory
+        self.maxsize = maxsize
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        self._clock = clock
+        self._clients: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the client for key, building it with factory on first use."""
+        now = self._clock()
+        with self._lock:
+            evicted = self._expire(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                self._clients[key] = (entry[0], now)
+                self._clients.move_to_end(key)
+                self.hits += 1
+                client = entry[0]
+            else:
+                self.misses += 1
+                client = None
+        if client is None:
+            # Built outside the lock; if two calls race for a new key, the first one stored wins.
+            built = self.factory(key)
+            with self._lock:
+                entry = self._clients.get(key)
+                if entry is None:
+                    self._clients[key] = (built, now)
+                    while len(self._clients) > self.maxsize:
+                        evicted.append(self._clients.popitem(last=False)[1][0])
+                        self.evictions += 1
+                    client = built
+                else:
+                    evicted.append(built)
+                    client = entry[0]
+        self._closed(evicted)
+        return client
+
+    def evict_idle(self) -> int:
+        """Evict clients idle for longer than idle_ttl. Returns the number evicted."""
+        with self._lock:
+            evicted = self._expire(self._clock())
+        self._closed(evicted)
+        return len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            evicted = [client for client, _ in self._clients.values()]
+            self._clients.clear()
+        self._closed(evicted)
+
+    def _expire(self, now: float) -> List[Any]:
+        # Entries are kept in last-use order, so idle clients are at the front.
+        evicted = []
+        while self._clients:
+            key, (client, last_used) = next(iter(self._clients.items()))
+            if now - last_used < self.idle_ttl:
+                break
+            del self._clients[key]
+            evicted.append(client)
+            self.expirations += 1
+        return evicted
+
+    def _closed(self, clients: List[Any]) -> None:
+        if self.on_evict:
+            for client in clients:
+                self.on_evict(client)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._clients
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._clients),
+            "maxsize": self.maxsize,
+            "idle_ttl": self.idle_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def pool_settings_from_env() -> Dict[str, Any]:
+    """Read ASANA_CLIENT_POOL_SIZE and ASANA_CLIENT_IDLE_TTL as ClientPool keyword arguments."""
+    return {
+        "maxsize": int(os.environ.get("ASANA_CLIENT_POOL_SIZE", DEFAULT_POOL_SIZE)),
+        "idle_ttl": float(os.environ.get("ASANA_CLIENT_IDLE_TTL", DEFAULT_IDLE_TTL)),
+    }
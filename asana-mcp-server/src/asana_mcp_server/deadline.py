@@ -0,0 +1,144 @@
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+# Seconds a tool call may take before it is abandoned; 0 or less means no limit.
+DEFAULT_TOOL_TIMEOUT = 60.0
+# summarize_project reads every page of a project, so it gets longer by default.
+DEFAULT_TOOL_TIMEOUTS = {"summarize_project": 300.0}
+
+# How often a blocked thread looks up from a lock or event to notice a cancellation.
+POLL_INTERVAL = 0.05
+
+
+class CallAborted(Exception):
+    """The tool call a request belongs to is over; don't start (or retry) any more work for it."""
+
+
+class DeadlineExceeded(CallAborted):
+    def __init__(self, timeout: Optional[float]):
+        self.timeout = timeout
+        super().__init__(f"Timed out after {timeout:g} seconds" if timeout else "Timed out")
+
+
+class CallCancelled(CallAborted):
+    def __init__(self):
+        super().__init__("Cancelled by the client")
+
+
+class Deadline:
+    """
+    The time budget of one tool call, and a flag to cancel it.
+
+    Set with deadline_scope() around a call; AsyncAsanaClient carries it into the worker
+    threads, where the scheduler and the HTTP layer check it between steps, bound their
+    waits by it and pass the remaining time to urllib3 as the request timeout.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self._clock = clock
+        self.expires_at = None if self.timeout is None else clock() + self.timeout
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None without a time limit."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self._clock())
+
+    def check(self) -> None:
+        """Raise CallCancelled or DeadlineExceeded if the call is over."""
+        if self._cancelled.is_set():
+            raise CallCancelled()
+        if self.remaining() == 0:
+            raise DeadlineExceeded(self.timeout)
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Sleep, waking up on cancellation. A sleep that would outlast the deadline (a long
+        Retry-After, say) fails straight away instead of waiting to fail.
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is not None and seconds >= remaining:
+            raise DeadlineExceeded(self.timeout)
+        if self._cancelled.wait(seconds):
+            raise CallCancelled()
+
+    def wait(self, acquire: Callable[[float], bool]) -> None:
+        """Block on acquire(timeout) (a lock, semaphore or event) until it succeeds or the call is over."""
+        while True:
+            self.check()
+            remaining = self.remaining()
+            if acquire(POLL_INTERVAL if remaining is None else min(POLL_INTERVAL, remaining)):
+                return
+
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("asana_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextlib.contextmanager
+def deadline_scope(deadline: Deadline) -> Iterator[Deadline]:
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def request_timeout() -> Optional[Tuple[float, float]]:
+    """
+    The (connect, read) timeout for the next HTTP request of the current call, or None.
+    Raises instead if the call is already over, so no request is sent for it.
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return None
+    deadline.check()
+    remaining = deadline.remaining()
+    return None if remaining is None else (remaining, remaining)
+
+
+class ToolTimeouts:
+    """Per-tool time limits: overrides by tool name, else the default (None = no limit)."""
+
+    def __init__(self, default: Optional[float] = DEFAULT_TOOL_TIMEOUT,
+                 overrides: Optional[Dict[str, float]] = None):
+        self.default = default if default and default > 0 else None
+        self.overrides = dict(DEFAULT_TOOL_TIMEOUTS if overrides is None else overrides)
+
+    def for_tool(self, name: str) -> Optional[float]:
+        timeout = self.overrides.get(name, self.default)
+        return timeout if timeout and timeout > 0 else None
+
+
+def tool_timeouts_from_env() -> ToolTimeouts:
+    """
+    Read ASANA_TOOL_TIMEOUT (seconds for every tool, 0 = no limit) and ASANA_TOOL_TIMEOUTS
+    ("summarize_project=600,get_task_tree=20"), which overrides it per tool.
+    """
+    default = float(os.environ.get("ASANA_TOOL_TIMEOUT", DEFAULT_TOOL_TIMEOUT))
+    overrides = dict(DEFAULT_TOOL_TIMEOUTS)
+    for item in os.environ.get("ASANA_TOOL_TIMEOUTS", "").split(","):
+        if not item.strip():
+            continue
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"ASANA_TOOL_TIMEOUTS entries look like tool=seconds, got {item!r}")
+        overrides[name.strip()] = float(value)
+    return ToolTimeouts(default, overrides)
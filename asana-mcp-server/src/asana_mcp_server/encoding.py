@@ -0,0 +1,90 @@
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # optional: pip install asana-mcp-server[fast]
+    orjson = None
+
+# "json" is compact JSON; "pretty" is the indented JSON this server used to emit.
+# "ndjson" and "table" only change how lists (and pages of lists) are written.
+FORMATS = ("json", "pretty", "ndjson", "table")
+DEFAULT_FORMAT = "json"
+
+
+def default_format() -> str:
+    """Read the output format from ASANA_OUTPUT_FORMAT, falling back to compact JSON."""
+    return check_format(os.environ.get("ASANA_OUTPUT_FORMAT") or DEFAULT_FORMAT)
+
+
+def check_format(fmt: str) -> str:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def dumps(value: Any) -> str:
+    """Compact JSON, non-ASCII text kept as UTF-8 rather than \\u escapes."""
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def encode(value: Any, fmt: Optional[str] = None) -> str:
+    """
+    Serialize a tool or resource result.
+    Lists of records, and pages ({"data": [...], "next_page": ...}), can be written as one
+    JSON object per line (ndjson) or as a tab-separated table with a header row; anything
+    else is written as compact JSON in those formats.
+    """
+    fmt = check_format(fmt) if fmt else default_format()
+    if fmt == "pretty":
+        return json.dumps(value, indent=2, ensure_ascii=False)
+    if fmt == "json":
+        return dumps(value)
+
+    rows, rest = _split_rows(value)
+    if rows is None:
+        return dumps(value)
+    if fmt == "ndjson":
+        lines = [dumps(row) for row in rows]
+        if rest:
+            lines.append(dumps(rest))
+        return "\n".join(lines)
+    lines = _table(rows)
+    lines.extend(f"{key}: {'' if v is None else v}" for key, v in rest.items())
+    return "\n".join(lines)
+
+
+def _split_rows(value: Any):
+    """Return (records, extra top-level fields) for list-shaped values, or (None, None)."""
+    if isinstance(value, list) and all(isinstance(v, dict) for v in value):
+        return value, {}
+    if isinstance(value, dict) and isinstance(value.get("data"), list) \
+            and all(isinstance(v, dict) for v in value["data"]):
+        return value["data"], {k: v for k, v in value.items() if k != "data"}
+    return None, None
+
+
+def _table(rows: List[Dict[str, Any]]) -> List[str]:
+    columns: Dict[str, None] = {}
+    for row in rows:
+        columns.update(dict.fromkeys(row))
+    lines = ["\t".join(columns)]
+    for row in rows:
+        lines.append("\t".join(_cell(row.get(c)) for c in columns))
+    return lines
+
+
+def _cell(value: Any) -> str:
+    """Flatten a field to one table cell; related objects are shown by name (or gid)."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, dict):
+        return _cell(value.get("name") or value.get("gid"))
+    if isinstance(value, list):
+        return ", ".join(_cell(v) for v in value)
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
@@ -0,0 +1,108 @@
+import contextlib
+import hmac
+import logging
+import os
+from typing import AsyncIterator, Optional
+
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+from starlette.types import Receive, Scope, Send
+
+from .metrics import METRICS, configure_from_env
+from .server import bearer_token, create_server, start_background_jobs, stop_background_jobs
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_PATH = "/mcp"
+
+logger = logging.getLogger(__name__)
+
+
+def allow_server_token_from_env() -> bool:
+    """ASANA_HTTP_ALLOW_SERVER_TOKEN=1 lets requests without a token run as ASANA_ACCESS_TOKEN."""
+    return os.environ.get("ASANA_HTTP_ALLOW_SERVER_TOKEN", "").lower() in ("1", "true", "yes")
+
+
+class MCPEndpoint:
+    """
+    ASGI endpoint handing requests to the streamable HTTP session manager.
+
+    Each request must carry the caller's Asana token as ``Authorization: Bearer <token>``.
+    Requests without one would run as the server's own ASANA_ACCESS_TOKEN (with its mirror
+    and search index), so they are only accepted when allow_server_token is set.
+    """
+
+    def __init__(self, manager: StreamableHTTPSessionManager, allow_server_token: bool = False):
+        self.manager = manager
+        self.allow_server_token = allow_server_token
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        if not bearer_token(headers.get("authorization")) \
+                and not (self.allow_server_token and os.environ.get("ASANA_ACCESS_TOKEN")):
+            response = JSONResponse({"error": "Send your Asana token as 'Authorization: Bearer <token>'"},
+                                    status_code=401, headers={"WWW-Authenticate": "Bearer"})
+            await response(scope, receive, send)
+            return
+        await self.manager.handle_request(scope, receive, send)
+
+
+def metrics_endpoint(token: str):
+    """
+    GET /metrics for a Prometheus scraper sending ``Authorization: Bearer <token>``.
+    The counters cover every session of the process, so Asana tokens are not accepted.
+    """
+    async def metrics(request: Request) -> PlainTextResponse:
+        sent = bearer_token(request.headers.get("authorization")) or ""
+        if not hmac.compare_digest(sent.encode(), token.encode()):
+            return PlainTextResponse("Unauthorized", status_code=401, headers={"WWW-Authenticate": "Bearer"})
+        return PlainTextResponse(METRICS.prometheus(), media_type="text/plain; version=0.0.4")
+
+    return metrics
+
+
+def create_http_app(path: str = DEFAULT_PATH, json_response: bool = False,
+                    allow_server_token: Optional[bool] = None,
+                    metrics_token: Optional[str] = None) -> Starlette:
+    """
+    Build the ASGI app serving every MCP session of this process.
+    Sessions share one MCP server, worker pool and Asana connection pool; caches and
+    rate limits are kept per token. GET /metrics serves Prometheus text only when
+    metrics_token (default ASANA_METRICS_TOKEN) is set (see metrics_endpoint).
+    allow_server_token defaults to ASANA_HTTP_ALLOW_SERVER_TOKEN (see MCPEndpoint).
+    """
+    if allow_server_token is None:
+        allow_server_token = allow_server_token_from_env()
+    if metrics_token is None:
+        metrics_token = os.environ.get("ASANA_METRICS_TOKEN")
+    configure_from_env(METRICS)
+    manager = StreamableHTTPSessionManager(app=create_server(), json_response=json_response)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        async with manager.run():
+            background_jobs = start_background_jobs()
+            try:
+                yield
+            finally:
+                stop_background_jobs(background_jobs)
+
+    routes = [Route(path, endpoint=MCPEndpoint(manager, allow_server_token))]
+    if metrics_token:
+        routes.append(Route("/metrics", endpoint=metrics_endpoint(metrics_token)))
+    return Starlette(routes=routes, lifespan=lifespan)
+
+
+def serve_http(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+               allow_server_token: Optional[bool] = None) -> None:
+    import uvicorn
+
+    if allow_server_token is None:
+        allow_server_token = allow_server_token_from_env()
+    if allow_server_token and host not in ("127.0.0.1", "localhost", "::1"):
+        logger.warning("Requests without a token run as ASANA_ACCESS_TOKEN, and %s is reachable "
+                       "from other hosts", host)
+    uvicorn.run(create_http_app(allow_server_token=allow_server_token), host=host, port=port)
@@ -0,0 +1,279 @@
+import bisect
+import contextlib
+import cProfile
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds. Asana calls usually take 100ms-1s; tool calls may span several of them.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Bytes of encoded tool/resource output.
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+TOOL = "tool"
+RESOURCE = "resource"
+ENDPOINT = "endpoint"
+
+# A slow-call hook receives {"kind", "name", "seconds", "error", "bytes", "profile"}.
+SlowCallHook = Callable[[Dict[str, Any]], None]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style (not thread-safe on its own)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by interpolating inside the bucket that contains it."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        out = []
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            out.append(("+Inf" if bound == float("inf") else f"{bound:g}", total))
+        return out
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"count": self.count, "sum": self.sum,
+                "p50": self.quantile(0.5), "p90": self.quantile(0.9), "p99": self.quantile(0.99)}
+
+
+class _Series:
+    def __init__(self, sized: bool):
+        self.calls = 0
+        self.errors: Dict[str, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS) if sized else None
+        self.retries = 0
+        self.rate_limited = 0
+
+
+def error_label(error: BaseException) -> str:
+    """HTTP status for Asana API errors, otherwise the exception type."""
+    status = getattr(error, "status", None)
+    return str(status) if isinstance(status, int) else type(error).__name__
+
+
+class Metrics:
+    """
+    Process-wide call metrics.
+
+    - MCP tool calls and resource reads: call/error counts, latency and encoded size
+    - Asana endpoints (one observation per HTTP attempt made by the scheduler): call/error
+      counts, latency, retries and 429s
+    Calls slower than slow_threshold are passed to the registered slow-call hooks; when a
+    profiler factory is set, every call is profiled and the profile is handed to the hooks.
+    """
+
+    def __init__(self):
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+        self._hooks: List[SlowCallHook] = []
+        self.slow_threshold = float("inf")
+        self.profiler: Optional[Callable[[], Any]] = None
+
+    def _get(self, kind: str, name: str) -> _Series:
+        series = self._series.get((kind, name))
+        if series is None:
+            series = self._series[(kind, name)] = _Series(sized=kind != ENDPOINT)
+        return series
+
+    # --- recording ------------------------------------------------------
+
+    def observe(self, kind: str, name: str, seconds: float, error: Optional[str] = None,
+                nbytes: Optional[int] = None) -> None:
+        with self._lock:
+            series = self._get(kind, name)
+            series.calls += 1
+            series.latency.observe(seconds)
+            if error:
+                series.errors[error] = series.errors.get(error, 0) + 1
+            if nbytes is not None and series.size is not None:
+                series.size.observe(nbytes)
+
+    def record_retry(self, endpoint: str, rate_limited: bool) -> None:
+        with self._lock:
+            series = self._get(ENDPOINT, endpoint)
+            series.retries += 1
+            if rate_limited:
+                series.rate_limited += 1
+
+    @contextlib.contextmanager
+    def measure(self, kind: str, name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Time the enclosed block. Exceptions are recorded and re-raised; a block that handles
+        its own failure can set call["error"], and call["bytes"] records the response size.
+        """
+        call: Dict[str, Any] = {"kind": kind, "name": name, "error": None, "bytes": None}
+        profile = self.profiler() if self.profiler else None
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError:
+                # Another call on this thread (e.g. an overlapping coroutine) is being profiled.
+                profile = None
+        start = time.perf_counter()
+        try:
+            yield call
+        except BaseException as e:
+            call["error"] = error_label(e)
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+            self.observe(kind, name, seconds, call["error"], call["bytes"])
+            if seconds >= self.slow_threshold:
+                call.update(seconds=seconds, profile=profile)
+                self._slow_call(call)
+
+    # --- slow-call hooks ------------------------------------------------
+
+    def add_slow_call_hook(self, hook: SlowCallHook, threshold: float) -> None:
+        """Call hook for every call taking at least threshold seconds (the lowest threshold wins)."""
+        with self._lock:
+            self._hooks.append(hook)
+            self.slow_threshold = min(self.slow_threshold, threshold)
+
+    def remove_slow_call_hooks(self) -> None:
+        with self._lock:
+            self._hooks = []
+            self.slow_threshold = float("inf")
+            self.profiler = None
+
+    def _slow_call(self, call: Dict[str, Any]) -> None:
+        for hook in list(self._hooks):
+            try:
+                hook(call)
+            except Exception:
+                logger.exception("Slow-call hook failed")
+
+    # --- reporting ------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly view: {"tools": {...}, "resources": {...}, "endpoints": {...}}."""
+        out: Dict[str, Dict[str, Any]] = {"tools": {}, "resources": {}, "endpoints": {}}
+        groups = {TOOL: "tools", RESOURCE: "resources", ENDPOINT: "endpoints"}
+        with self._lock:
+            for (kind, name), s in sorted(self._series.items()):
+                entry: Dict[str, Any] = {"calls": s.calls, "errors": dict(s.errors),
+                                         "latency_seconds": s.latency.snapshot()}
+                if s.size is not None:
+                    entry["response_bytes"] = s.size.snapshot()
+                if kind == ENDPOINT:
+                    entry.update(retries=s.retries, rate_limited=s.rate_limited)
+                out[groups[kind]][name] = entry
+        return out
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            items = sorted(self._series.items())
+            for prefix, label, kinds in (("asana_mcp", "name", (TOOL, RESOURCE)), ("asana_api", "endpoint", (ENDPOINT,))):
+                selected = [(k, n, s) for (k, n), s in items if k in kinds]
+                if not selected:
+                    continue
+
+                def labels(kind: str, name: str, **extra: str) -> str:
+                    pairs = ({"kind": kind} if prefix == "asana_mcp" else {})
+                    pairs[label] = name
+                    pairs.update(extra)
+                    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs.items()) + "}"
+
+                lines += [f"# HELP {prefix}_calls_total Calls made.", f"# TYPE {prefix}_calls_total counter"]
+                lines += [f"{prefix}_calls_total{labels(k, n)} {s.calls}" for k, n, s in selected]
+                lines += [f"# HELP {prefix}_errors_total Failed calls by error.", f"# TYPE {prefix}_errors_total counter"]
+                lines += [f"{prefix}_errors_total{labels(k, n, error=e)} {c}"
+                          for k, n, s in selected for e, c in sorted(s.errors.items())]
+                lines += _histogram_lines(f"{prefix}_duration_seconds", "Call latency.",
+                                          [(labels, k, n, s.latency) for k, n, s in selected])
+                if prefix == "asana_mcp":
+                    lines += _histogram_lines(f"{prefix}_response_bytes", "Encoded response size.",
+                                              [(labels, k, n, s.size) for k, n, s in selected])
+                else:
+                    lines += [f"# HELP {prefix}_retries_total Retried requests.", f"# TYPE {prefix}_retries_total counter"]
+                    lines += [f"{prefix}_retries_total{labels(k, n)} {s.retries}" for k, n, s in selected]
+                    lines += [f"# HELP {prefix}_rate_limited_total 429 responses.",
+                              f"# TYPE {prefix}_rate_limited_total counter"]
+                    lines += [f"{prefix}_rate_limited_total{labels(k, n)} {s.rate_limited}" for k, n, s in selected]
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+def _histogram_lines(metric: str, help_text: str, entries) -> List[str]:
+    lines = [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+    for labels, kind, name, hist in entries:
+        for le, count in hist.cumulative():
+            lines.append(f"{metric}_bucket{labels(kind, name, le=le)} {count}")
+        lines.append(f"{metric}_sum{labels(kind, name)} {hist.sum:g}")
+        lines.append(f"{metric}_count{labels(kind, name)} {hist.count}")
+    return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def profile_slow_calls(metrics: "Metrics", threshold: float, directory: Optional[str] = None) -> None:
+    """
+    Profile every call with cProfile and keep the profiles of calls slower than threshold:
+    dumped to <directory>/<kind>-<name>-<timestamp>.prof, or logged as a summary.
+    Profiles only cover the thread the call ran on.
+    """
+    def dump(call: Dict[str, Any]) -> None:
+        profile = call.get("profile")
+        if profile is None:
+            return
+        if directory:
+            safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", call["name"])
+            path = os.path.join(directory, f"{call['kind']}-{safe}-{time.time():.3f}.prof")
+            profile.dump_stats(path)
+            logger.warning("Slow %s %s took %.3fs; profile written to %s", call["kind"], call["name"],
+                           call["seconds"], path)
+        else:
+            logger.warning("Slow %s %s took %.3fs", call["kind"], call["name"], call["seconds"])
+
+    metrics.profiler = cProfile.Profile
+    metrics.add_slow_call_hook(dump, threshold)
+
+
+def configure_from_env(metrics: "Metrics") -> None:
+    """Enable profile_slow_calls when ASANA_PROFILE_SLOW_CALLS (seconds) is set."""
+    threshold = os.environ.get("ASANA_PROFILE_SLOW_CALLS")
+    if threshold:
+        profile_slow_calls(metrics, float(threshold), os.environ.get("ASANA_PROFILE_DIR"))
+
+
+# Shared by every client and server in the process.
+METRICS = Metrics()
@@ -0,0 +1,352 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Superset of the fields every task read serves, so the mirror can answer all of them.
+MIRROR_TASK_FIELDS = (
+    "gid,name,notes,completed,due_on,projects.name,permalink_url,"
+    "assignee.name,workspace.name,modified_at"
+)
+
+DEFAULT_SYNC_INTERVAL = 30.0
+DEFAULT_MAX_STALENESS = 120.0
+# Even with incremental sync, re-list "my tasks" scopes now and then: modified_since
+# can't report tasks that were reassigned away from us.
+DEFAULT_FULL_RESYNC_INTERVAL = 3600.0
+
+MIRROR_CURSOR_PREFIX = "m:"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    gid TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS task_scopes (
+    task_gid TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (scope, task_gid)
+);
+CREATE INDEX IF NOT EXISTS task_scopes_by_task ON task_scopes (task_gid);
+CREATE TABLE IF NOT EXISTS scopes (
+    scope TEXT PRIMARY KEY,
+    sync_token TEXT,
+    synced_at REAL,
+    seeded_at REAL
+);
+"""
+
+
+def project_scope(project_id: str) -> str:
+    return f"project:{project_id}"
+
+
+def my_tasks_scope(workspace_id: str) -> str:
+    return f"my_tasks:{workspace_id}"
+
+
+def mirror_covers(opt_fields: str) -> bool:
+    """True when every requested field is stored in the mirror."""
+    return set(opt_fields.split(",")) <= set(MIRROR_TASK_FIELDS.split(","))
+
+
+def select_fields(record: Dict[str, Any], opt_fields: str) -> Dict[str, Any]:
+    """Trim a mirrored record to the top-level fields a live request with opt_fields would return."""
+    keys = {"gid"} | {f.split(".")[0] for f in opt_fields.split(",")}
+    return {k: v for k, v in record.items() if k in keys}
+
+
+class TaskMirror:
+    """
+    Local SQLite copy of Asana tasks, grouped into sync scopes.
+
+    A scope is a mirrored project (``project:<gid>``) or the current user's tasks in a
+    workspace (``my_tasks:<gid>``). Reads only trust a task while at least one of its
+    scopes has been synced within the caller's freshness bound.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- scopes ---------------------------------------------------------
+
+    def register_scope(self, scope: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO scopes (scope) VALUES (?)", (scope,))
+
+    def scopes(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT scope FROM scopes ORDER BY scope")]
+
+    def scope_state(self, scope: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sync_token, synced_at, seeded_at FROM scopes WHERE scope = ?", (scope,)).fetchone()
+        if row is None:
+            return None
+        return {"sync_token": row[0], "synced_at": row[1], "seeded_at": row[2]}
+
+    def mark_synced(self, scope: str, sync_token: Optional[str] = None, seeded: bool = False,
+                    at: Optional[float] = None) -> None:
+        """
+        at is when the sync started (default now); a scope synced by listing fetches the
+        changes since then next time, so it must not be later than the listing.
+        """
+        now = at if at is not None else time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE scopes SET sync_token = COALESCE(?, sync_token), synced_at = ?,"
+                " seeded_at = CASE WHEN ? THEN ? ELSE seeded_at END WHERE scope = ?",
+                (sync_token, now, seeded, now, scope))
+
+    def is_fresh(self, scope: str, max_staleness: float) -> bool:
+        state = self.scope_state(scope)
+        return bool(state and state["synced_at"] and time.time() - state["synced_at"] <= max_staleness)
+
+    # --- tasks ----------------------------------------------------------
+
+    def upsert_task(self, task: Dict[str, Any], scopes: Iterable[str]) -> None:
+        """
+        Store a task record and replace its scope membership with the registered ones in scopes.
+        A task outside every registered scope is removed instead.
+        """
+        self.upsert_tasks([(task, list(scopes))])
+
+    def upsert_tasks(self, records: Iterable[Tuple[Dict[str, Any], List[str]]]) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            registered = {row[0] for row in self._conn.execute("SELECT scope FROM scopes")}
+            for task, scopes in records:
+                gid = task["gid"]
+                wanted = [s for s in scopes if s in registered]
+                if not wanted:
+                    # Not part of anything we mirror (any more): don't keep an orphan copy.
+                    self._delete(gid)
+                    continue
+                self._conn.execute(
+                    "INSERT INTO tasks (gid, data, completed, updated_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT(gid) DO UPDATE SET data = excluded.data,"
+                    " completed = excluded.completed, updated_at = excluded.updated_at",
+                    (gid, json.dumps(task), int(bool(task.get("completed"))), now))
+                self._conn.execute(
+                    "DELETE FROM task_scopes WHERE task_gid = ? AND scope NOT IN (%s)"
+                    % ",".join("?" * len(wanted)), (gid, *wanted))
+                for scope in wanted:
+                    # Keep the existing position so re-synced tasks don't jump to the end.
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO task_scopes (task_gid, scope, position)"
+                        " SELECT ?, ?, COALESCE(MAX(position), -1) + 1 FROM task_scopes WHERE scope = ?",
+                        (gid, scope, scope))
+
+    def patch_task(self, gid: str, data: Dict[str, Any]) -> bool:
+        """
+        Apply a write's scalar fields to a stored task.
+        Returns False (and drops the task) when a field can't be patched locally,
+        so reads fall back to Asana until the next sync brings it back.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT data FROM tasks WHERE gid = ?", (gid,)).fetchone()
+            if row is None:
+                return True
+            record = json.loads(row[0])
+            for field, value in data.items():
+                if isinstance(record.get(field), (dict, list)) or field not in record:
+                    self._delete(gid)
+                    return False
+                record[field] = value
+            self._conn.execute(
+                "UPDATE tasks SET data = ?, completed = ?, updated_at = ? WHERE gid = ?",
+                (json.dumps(record), int(bool(record.get("completed"))), time.time(), gid))
+            return True
+
+    def delete_task(self, gid: str) -> None:
+        with self._lock, self._conn:
+            self._delete(gid)
+
+    def _delete(self, gid: str) -> None:
+        self._conn.execute("DELETE FROM tasks WHERE gid = ?", (gid,))
+        self._conn.execute("DELETE FROM task_scopes WHERE task_gid = ?", (gid,))
+
+    def clear_scope(self, scope: str) -> None:
+        """Forget a scope's membership before a full re-seed; reads go live until it completes."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE scopes SET synced_at = NULL WHERE scope = ?", (scope,))
+            self._conn.execute("DELETE FROM task_scopes WHERE scope = ?", (scope,))
+            self._conn.execute(
+                "DELETE FROM tasks WHERE gid NOT IN (SELECT task_gid FROM task_scopes)")
+
+    def get_task(self, gid: str, max_staleness: float) -> Optional[Dict[str, Any]]:
+        """Return a stored task if one of its scopes is fresh enough, else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT t.data FROM tasks t WHERE t.gid = ? AND EXISTS ("
+                " SELECT 1 FROM task_scopes ts JOIN scopes s ON s.scope = ts.scope"
+                " WHERE ts.task_gid = t.gid AND s.synced_at >= ?)",
+                (gid, time.time() - max_staleness)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def scope_tasks(self, scope: str, limit: Optional[int] = None, offset: int = 0,
+                    incomplete_only: bool = False) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Return one page of a scope's tasks in listing order, plus the next offset (or None).
+        limit=None returns the rest of the scope.
+        """
+        sql = ("SELECT t.data FROM task_scopes ts JOIN tasks t ON t.gid = ts.task_gid"
+               " WHERE ts.scope = ?")
+        if incomplete_only:
+            sql += " AND t.completed = 0"
+        sql += " ORDER BY ts.position LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(sql, (scope, -1 if limit is None else limit + 1, offset)).fetchall()
+        if limit is None or len(rows) <= limit:
+            return [json.loads(r[0]) for r in rows], None
+        return [json.loads(r[0]) for r in rows[:limit]], offset + limit
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+
+class MirrorSync:
+    """
+    Keeps a TaskMirror up to date.
+
+    Projects are seeded with a paginated listing, then followed through the Events API:
+    each sync reads the events since the stored sync token and re-fetches only the
+    tasks they mention (via /batch). "My tasks" scopes have no event stream, so they
+    are followed with modified_since queries and periodically re-listed in full.
+    """
+
+    def __init__(self, client: Any, mirror: TaskMirror,
+                 projects: Iterable[str] = (), workspaces: Iterable[str] = (),
+                 full_resync_interval: float = DEFAULT_FULL_RESYNC_INTERVAL):
+        self.client = client
+        self.mirror = mirror
+        self.projects = list(projects)
+        self.workspaces = list(workspaces)
+        self.full_resync_interval = full_resync_interval
+        for project_id in self.projects:
+            mirror.register_scope(project_scope(project_id))
+        for workspace_id in self.workspaces:
+            mirror.register_scope(my_tasks_scope(workspace_id))
+
+    def sync_once(self) -> None:
+        """Bring every scope up to date; a failing scope is logged and retried next round."""
+        for project_id in self.projects:
+            try:
+                self.sync_project(project_id)
+            except Exception:
+                logger.exception("Mirror sync failed for project %s", project_id)
+        for workspace_id in self.workspaces:
+            try:
+                self.sync_my_tasks(workspace_id)
+            except Exception:
+                logger.exception("Mirror sync failed for my tasks in workspace %s", workspace_id)
+
+    # --- projects -------------------------------------------------------
+
+    def seed_project(self, project_id: str) -> None:
+        scope = project_scope(project_id)
+        # Take the sync token first so changes made while listing are replayed afterwards.
+        token = self.client.fetch_events(project_id, None)["sync"]
+        self.mirror.clear_scope(scope)
+        self._store(self.client.iter_tasks({'project': project_id, 'opt_fields': MIRROR_TASK_FIELDS}))
+        self.mirror.mark_synced(scope, token, seeded=True)
+
+    def sync_project(self, project_id: str) -> None:
+        scope = project_scope(project_id)
+        state = self.mirror.scope_state(scope)
+        if not state or not state["sync_token"]:
+            self.seed_project(project_id)
+            return
+
+        token = state["sync_token"]
+        changed: Dict[str, None] = {}
+        while True:
+            response = self.client.fetch_events(project_id, token)
+            if response.get("expired"):
+                # The sync token is too old to replay; start over.
+                self.seed_project(project_id)
+                return
+            token = response["sync"]
+            for event in response["data"]:
+                self._collect_event(event, changed)
+            if not response.get("has_more"):
+                break
+
+        self._refetch(list(changed))
+        self.mirror.mark_synced(scope, token)
+
+    def _collect_event(self, event: Dict[str, Any], changed: Dict[str, None]) -> None:
+        resource = event.get("resource") or {}
+        parent = event.get("parent") or {}
+        if resource.get("resource_type") == "task":
+            if event.get("action") == "deleted":
+                changed.pop(resource["gid"], None)
+                self.mirror.delete_task(resource["gid"])
+            else:
+                changed[resource["gid"]] = None
+        elif parent.get("resource_type") == "task":
+            # e.g. a story or attachment added to a task
+            changed[parent["gid"]] = None
+
+    def _refetch(self, task_ids: List[str]) -> None:
+        from .client import BATCH_SIZE  # avoid an import cycle
+        for i in range(0, len(task_ids), BATCH_SIZE):
+            chunk = task_ids[i:i + BATCH_SIZE]
+            actions = [{"method": "get", "relative_path": f"/tasks/{gid}",
+                        "options": {"fields": MIRROR_TASK_FIELDS.split(",")}} for gid in chunk]
+            records = []
+            for gid, outcome in zip(chunk, self.client.batch(actions)):
+                if outcome["ok"]:
+                    records.append(outcome["data"])
+                elif outcome.get("status") in (403, 404):
+                    self.mirror.delete_task(gid)
+            self._store(records)
+
+    # --- my tasks -------------------------------------------------------
+
+    def sync_my_tasks(self, workspace_id: str) -> None:
+        scope = my_tasks_scope(workspace_id)
+        state = self.mirror.scope_state(scope)
+        opts = {'workspace': workspace_id, 'assignee': 'me', 'completed_since': 'now',
+                'opt_fields': MIRROR_TASK_FIELDS}
+        started = time.time()
+        if not state or not state["seeded_at"] or started - state["seeded_at"] > self.full_resync_interval:
+            self.mirror.clear_scope(scope)
+            self._store(self.client.iter_tasks(opts))
+            self.mirror.mark_synced(scope, seeded=True, at=started)
+            return
+
+        since = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(state["synced_at"]))
+        opts = dict(opts, modified_since=since)
+        del opts['completed_since']
+        self._store(self.client.iter_tasks(opts))
+        self.mirror.mark_synced(scope, at=started)
+
+    def _store(self, tasks: Iterable[Dict[str, Any]], chunk_size: int = 500) -> None:
+        records = []
+        for task in tasks:
+            records.append((task, self.client.mirror_scopes(task)))
+            if len(records) >= chunk_size:
+                self.mirror.upsert_tasks(records)
+                records = []
+        if records:
+            self.mirror.upsert_tasks(records)
@@ -0,0 +1,151 @@
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import jsonschema
+from jsonschema.exceptions import best_match
+from mcp.types import ListToolsResult, ResourceTemplate, Tool
+
+# handler(client, arguments) -> the value to encode as the tool's result.
+ToolHandler = Callable[[Any, Dict[str, Any]], Awaitable[Any]]
+# handler(client, query, **uri_params) -> the resource text.
+ResourceHandler = Callable[..., Awaitable[str]]
+
+TEMPLATE_VARIABLE = re.compile(r"\{(\w+)\}")
+
+
+class ToolRegistry:
+    """
+    Tools declared once, each with its handler.
+
+    The tools/list result is built once and reused until another tool is added. Every input
+    schema is checked and compiled into a validator when it is registered, so a call costs
+    a dict lookup plus validation against the compiled schema, however many tools there are.
+    """
+
+    def __init__(self, common_properties: Optional[Dict[str, Any]] = None):
+        # Properties every tool accepts (e.g. the output format).
+        self.common_properties = common_properties or {}
+        self._tools: Dict[str, Tool] = {}
+        self._handlers: Dict[str, ToolHandler] = {}
+        self._validators: Dict[str, Any] = {}
+        self._listing: Optional[ListToolsResult] = None
+
+    def tool(self, tool: Tool) -> Callable[[ToolHandler], ToolHandler]:
+        """Decorator registering the function as the handler of tool."""
+        def register(handler: ToolHandler) -> ToolHandler:
+            self.add(tool, handler)
+            return handler
+        return register
+
+    def add(self, tool: Tool, handler: ToolHandler) -> None:
+        if tool.name in self._tools:
+            raise ValueError(f"Tool already registered: {tool.name}")
+        tool.inputSchema.setdefault("properties", {}).update(self.common_properties)
+        validator_class = jsonschema.validators.validator_for(tool.inputSchema)
+        validator_class.check_schema(tool.inputSchema)
+        self._validators[tool.name] = validator_class(tool.inputSchema)
+        self._tools[tool.name] = tool
+        self._handlers[tool.name] = handler
+        self._listing = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def definitions(self) -> List[Tool]:
+        return self.listing().tools
+
+    def listing(self) -> ListToolsResult:
+        if self._listing is None:
+            self._listing = ListToolsResult(tools=list(self._tools.values()))
+        return self._listing
+
+    def handler(self, name: str) -> Optional[ToolHandler]:
+        return self._handlers.get(name)
+
+    def validate(self, name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """The validation error message for arguments, or None when they are valid."""
+        validator = self._validators[name]
+        errors = validator.iter_errors(arguments)
+        first = next(errors, None)
+        if first is None:
+            return None
+        # Report the same error jsonschema.validate would.
+        return best_match([first, *errors]).message
+
+
+class _Route:
+    def __init__(self, template: str, handler: ResourceHandler, name: Optional[str], description: Optional[str]):
+        self.template = template
+        self.handler = handler
+        self.name = name
+        self.description = description
+        pattern = ""
+        position = 0
+        for m in TEMPLATE_VARIABLE.finditer(template):
+            pattern += re.escape(template[position:m.start()]) + f"(?P<{m.group(1)}>[^/]+)"
+            position = m.end()
+        self.pattern = re.compile(pattern + re.escape(template[position:]))
+        self.literal = position == 0
+
+
+class ResourceRouter:
+    """
+    Resource URI templates ("asana://tasks/{task_id}") mapped to their handlers.
+
+    A variable matches one path segment, and the query string is not part of the match.
+    Literal URIs are found with a dict lookup. Templates are grouped by the literal text
+    before their first variable, so a lookup only tries the templates that could match.
+    Named templates are also listed for resources/templates/list.
+    """
+
+    def __init__(self):
+        self._literal: Dict[str, _Route] = {}
+        self._by_prefix: Dict[str, List[_Route]] = {}
+        self._templates: Optional[List[ResourceTemplate]] = None
+
+    def route(self, template: str, name: Optional[str] = None,
+              description: Optional[str] = None) -> Callable[[ResourceHandler], ResourceHandler]:
+        """Decorator registering the function as the handler of template."""
+        def register(handler: ResourceHandler) -> ResourceHandler:
+            self.add(template, handler, name, description)
+            return handler
+        return register
+
+    def add(self, template: str, handler: ResourceHandler, name: Optional[str] = None,
+            description: Optional[str] = None) -> None:
+        if "{" in _prefix(template):
+            raise ValueError(f"URI template must start with a literal path segment: {template}")
+        route = _Route(template, handler, name, description)
+        if route.literal:
+            self._literal[template] = route
+        else:
+            self._by_prefix.setdefault(_prefix(template), []).append(route)
+        self._templates = None
+
+    def match(self, uri: str) -> Optional[Tuple[str, ResourceHandler, Dict[str, str]]]:
+        """(template, handler, variables) for uri, or None if no template matches."""
+        path = uri.partition("?")[0]
+        route = self._literal.get(path)
+        if route is not None:
+            return route.template, route.handler, {}
+        for route in self._by_prefix.get(_prefix(path), ()):
+            m = route.pattern.fullmatch(path)
+            if m:
+                return route.template, route.handler, m.groupdict()
+        return None
+
+    def resource_templates(self) -> List[ResourceTemplate]:
+        """The named templates with variables, built once."""
+        if self._templates is None:
+            self._templates = [
+                ResourceTemplate(uriTemplate=r.template, name=r.name, description=r.description,
+                                 mimeType="application/json")
+                for routes in self._by_prefix.values() for r in routes if r.name
+            ]
+        return self._templates
+
+
+def _prefix(uri: str) -> str:
+    """Scheme and first path segment: "asana://tasks/123" -> "asana://tasks/"."""
+    scheme, sep, rest = uri.partition("://")
+    return scheme + sep + rest.partition("/")[0] + "/"
@@ -0,0 +1,248 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .deadline import CallAborted, CallCancelled, DeadlineExceeded, current_deadline
+from .metrics import ENDPOINT, METRICS, Metrics
+
+# Asana's standard limit for paid workspaces is 1500 requests/minute per token.
+DEFAULT_RATE = 25.0
+# Asana allows 50 concurrent reads but only 15 concurrent writes per token.
+DEFAULT_MAX_IN_FLIGHT = 15
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RateLimitedError(Exception):
+    """Raised when Asana keeps answering 429 after all retries."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Asana rate limit exceeded; retry after {retry_after:g} seconds")
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Read the Retry-After header (in seconds) from an asana ApiException, if present."""
+    headers = getattr(error, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("Retry-After")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Blocking token bucket: ``rate`` tokens per second, holding at most ``burst``."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, sleep: Optional[Callable[[float], None]] = None) -> float:
+        """
+        Take one token, sleeping until one is available. Returns the time spent waiting.
+        sleep replaces the bucket's own, e.g. to give up when a call's deadline passes.
+        """
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            (sleep or self._sleep)(delay)
+            waited += delay
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class RequestScheduler:
+    """
+    Gatekeeper for every request an AsanaClient sends.
+
+    - a token bucket keeps the request rate under the per-token limit
+    - a semaphore bounds the number of requests in flight
+    - 429 and 5xx responses are retried with exponential backoff, honoring Retry-After;
+      a 429 pauses all callers, not just the one that hit it
+    - identical concurrent reads (same ``key``) share a single request
+    - every attempt is timed per endpoint in ``metrics``
+    - a call's Deadline (see deadline.py) is checked before each attempt and bounds every
+      wait; once it is cancelled or expires, no further attempt is made
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: Optional[float] = None,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 metrics: Optional[Metrics] = None):
+        self.bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+        self.metrics = metrics if metrics is not None else METRICS
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._clock = clock
+        self._sleep = sleep
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.server_errors = 0
+        self.coalesced = 0
+        self.in_flight = 0
+
+    def run(self, key: Optional[Hashable], func: Callable[..., Any], *args: Any,
+            idempotent: bool = True, endpoint: Optional[str] = None, **kwargs: Any) -> Any:
+        """
+        Call func(*args, **kwargs) under the scheduler.
+        Pass a key for reads that may be coalesced with identical concurrent calls, or None.
+        Non-idempotent calls are only retried on 429, which Asana rejects before doing any work.
+        endpoint names the call in metrics (e.g. "tasks_api.get_tasks"); defaults to func's name.
+        """
+        endpoint = endpoint or getattr(func, "__qualname__", None) or "unknown"
+        if key is None:
+            return self._execute(func, args, kwargs, idempotent, endpoint)
+
+        deadline = current_deadline()
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                else:
+                    self.coalesced += 1
+            if leader:
+                break
+            if deadline is None:
+                flight.done.wait()
+            else:
+                deadline.wait(flight.done.wait)
+            if isinstance(flight.error, CallAborted):
+                # The leader's call was cancelled or timed out, not this one's: run it again.
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._execute(func, args, kwargs, idempotent, endpoint)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _execute(self, func: Callable[..., Any], args: tuple, kwargs: Dict[str, Any], idempotent: bool,
+                 endpoint: str) -> Any:
+        deadline = current_deadline()
+        sleep = deadline.sleep if deadline else self._sleep
+        attempt = 0
+        while True:
+            self._wait_for_pause(sleep)
+            self.bucket.acquire(sleep)
+            if deadline is None:
+                self._slots.acquire()
+            else:
+                deadline.wait(lambda timeout: self._slots.acquire(timeout=timeout))
+            try:
+                with self._lock:
+                    self.requests += 1
+                    self.in_flight += 1
+                try:
+                    with self.metrics.measure(ENDPOINT, endpoint):
+                        return func(*args, **kwargs)
+                except CallAborted:
+                    raise
+                except Exception as e:
+                    if deadline is not None and deadline.cancelled:
+                        raise CallCancelled() from e
+                    if deadline is not None and deadline.remaining() == 0:
+                        # urllib3 gave up on the request because the call ran out of time.
+                        raise DeadlineExceeded(deadline.timeout) from e
+                    status = getattr(e, "status", None)
+                    if status not in RETRYABLE_STATUSES or (status != 429 and not idempotent):
+                        raise
+                    delay = self._retry_delay(e, status, attempt)
+                    if attempt >= self.max_retries:
+                        if status == 429:
+                            raise RateLimitedError(delay) from e
+                        raise
+                finally:
+                    with self._lock:
+                        self.in_flight -= 1
+            finally:
+                self._slots.release()
+            # Back off outside the semaphore so the slot is free for other callers.
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            self.metrics.record_retry(endpoint, rate_limited=status == 429)
+            sleep(delay)
+
+    def _retry_delay(self, error: BaseException, status: int, attempt: int) -> float:
+        backoff = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay = backoff * (0.5 + random.random() / 2)
+        with self._lock:
+            if status == 429:
+                self.rate_limited += 1
+                retry_after = retry_after_seconds(error)
+                if retry_after is not None:
+                    delay = retry_after
+                self._paused_until = max(self._paused_until, self._clock() + delay)
+            else:
+                self.server_errors += 1
+        return delay
+
+    def _wait_for_pause(self, sleep: Callable[[float], None]) -> None:
+        while True:
+            with self._lock:
+                remaining = self._paused_until - self._clock()
+            if remaining <= 0:
+                return
+            sleep(remaining)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate": self.bucket.rate,
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "server_errors": self.server_errors,
+                "coalesced": self.coalesced,
+            }
@@ -0,0 +1,397 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fields needed to index a task and to answer a search without another request.
+SEARCH_TASK_FIELDS = "gid,name,notes,completed,due_on,projects.name,workspace"
+# Fields returned for each hit (same shape as the live typeahead results).
+RESULT_FIELDS = ("gid", "name", "completed", "due_on", "projects")
+
+DEFAULT_REFRESH_INTERVAL = 300.0
+# modified_since can't report deleted or moved tasks, so re-list everything now and then.
+DEFAULT_FULL_REBUILD_INTERVAL = 6 * 3600.0
+DEFAULT_SEARCH_LIMIT = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    gid TEXT NOT NULL UNIQUE,
+    workspace_gid TEXT,
+    completed INTEGER NOT NULL DEFAULT 0,
+    due_on TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS doc_projects (
+    doc_id INTEGER NOT NULL,
+    project_gid TEXT NOT NULL,
+    PRIMARY KEY (project_gid, doc_id)
+);
+CREATE INDEX IF NOT EXISTS doc_projects_by_doc ON doc_projects (doc_id);
+CREATE TABLE IF NOT EXISTS projects (
+    gid TEXT PRIMARY KEY,
+    name TEXT,
+    workspace_gid TEXT,
+    indexed_at REAL,
+    rebuilt_at REAL
+);
+-- indexed_at: when a refresh last indexed every project of the workspace (searches are
+-- answered locally from then on). personal_*: the listing of the user's own tasks with no project.
+CREATE TABLE IF NOT EXISTS workspaces (
+    gid TEXT PRIMARY KEY,
+    indexed_at REAL,
+    personal_indexed_at REAL,
+    personal_rebuilt_at REAL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+    name, notes, projects,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+
+def match_expression(query: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word must match, as a prefix.
+    Words are quoted so FTS5 operators in user input are matched literally.
+    """
+    terms = [t.replace('"', '""') for t in query.split()]
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 index over task names, notes and project names.
+
+    Results are ranked with bm25 (name matches weigh most, then project names, then
+    notes) and can be filtered by completion, due date range and project.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- writing --------------------------------------------------------
+
+    def add_tasks(self, tasks: Iterable[Dict[str, Any]], workspace_id: Optional[str] = None,
+                  chunk_size: int = 500) -> int:
+        """Index (or re-index) task records fetched with SEARCH_TASK_FIELDS. Returns the count."""
+        count = 0
+        chunk: List[Dict[str, Any]] = []
+        # Write in chunks: tasks is usually a lazy page iterator, and searches shouldn't
+        # wait on the network while a project is being listed.
+        for task in tasks:
+            chunk.append(task)
+            if len(chunk) >= chunk_size:
+                count += self._put_many(chunk, workspace_id)
+                chunk = []
+        return count + self._put_many(chunk, workspace_id)
+
+    def _put_many(self, tasks: List[Dict[str, Any]], workspace_id: Optional[str]) -> int:
+        with self._lock, self._conn:
+            for task in tasks:
+                self._put(task, workspace_id)
+        return len(tasks)
+
+    def _put(self, task: Dict[str, Any], workspace_id: Optional[str]) -> None:
+        workspace_id = (task.get("workspace") or {}).get("gid") or workspace_id
+        projects = task.get("projects") or []
+        if not workspace_id and projects:
+            row = self._conn.execute("SELECT workspace_gid FROM projects WHERE gid = ?",
+                                     (projects[0]["gid"],)).fetchone()
+            workspace_id = row[0] if row else None
+        for p in projects:
+            if p.get("name"):
+                self._conn.execute(
+                    "INSERT INTO projects (gid, name, workspace_gid) VALUES (?, ?, ?)"
+                    " ON CONFLICT(gid) DO UPDATE SET name = excluded.name,"
+                    " workspace_gid = COALESCE(excluded.workspace_gid, workspace_gid)",
+                    (p["gid"], p["name"], workspace_id))
+        # Project names may be missing (e.g. right after create_task); use the ones we know.
+        names = []
+        for p in projects:
+            name = p.get("name")
+            if not name:
+                row = self._conn.execute("SELECT name FROM projects WHERE gid = ?", (p["gid"],)).fetchone()
+                name = row[0] if row else None
+            if name:
+                names.append(name)
+
+        data = {k: task.get(k) for k in RESULT_FIELDS}
+        row = self._conn.execute("SELECT id FROM docs WHERE gid = ?", (task["gid"],)).fetchone()
+        if row:
+            doc_id = row[0]
+            self._conn.execute(
+                "UPDATE docs SET workspace_gid = ?, completed = ?, due_on = ?, data = ? WHERE id = ?",
+                (workspace_id, int(bool(task.get("completed"))), task.get("due_on"), json.dumps(data), doc_id))
+            self._conn.execute("DELETE FROM task_fts WHERE rowid = ?", (doc_id,))
+            self._conn.execute("DELETE FROM doc_projects WHERE doc_id = ?", (doc_id,))
+        else:
+            doc_id = self._conn.execute(
+                "INSERT INTO docs (gid, workspace_gid, completed, due_on, data) VALUES (?, ?, ?, ?, ?)",
+                (task["gid"], workspace_id, int(bool(task.get("completed"))), task.get("due_on"),
+                 json.dumps(data))).lastrowid
+        self._conn.execute(
+            "INSERT INTO task_fts (rowid, name, notes, projects) VALUES (?, ?, ?, ?)",
+            (doc_id, task.get("name") or "", task.get("notes") or "", " ".join(names)))
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO doc_projects (doc_id, project_gid) VALUES (?, ?)",
+            [(doc_id, p["gid"]) for p in projects])
+
+    def patch_task(self, gid: str, data: Dict[str, Any]) -> None:
+        """Apply an update's name/notes/completed/due_on to an indexed task."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT d.data, f.notes, d.workspace_gid FROM docs d JOIN task_fts f ON f.rowid = d.id"
+                " WHERE d.gid = ?", (gid,)).fetchone()
+            if row is None:
+                return
+            task = json.loads(row[0])
+            task["notes"] = row[1]
+            task.update({k: v for k, v in data.items() if k in ("name", "notes", "completed", "due_on")})
+            self._put(task, row[2])
+
+    def remove_task(self, gid: str) -> None:
+        with self._lock, self._conn:
+            self._remove(gid)
+
+    def _remove(self, gid: str) -> None:
+        row = self._conn.execute("SELECT id FROM docs WHERE gid = ?", (gid,)).fetchone()
+        if row:
+            self._conn.execute("DELETE FROM task_fts WHERE rowid = ?", (row[0],))
+            self._conn.execute("DELETE FROM doc_projects WHERE doc_id = ?", (row[0],))
+            self._conn.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+
+    def replace_project(self, project_id: str, tasks: Iterable[Dict[str, Any]],
+                        workspace_id: Optional[str] = None, at: Optional[float] = None) -> int:
+        """
+        Re-index a whole project, dropping tasks that are no longer in it.
+        at is when the listing started; later incremental refreshes fetch changes since then.
+        """
+        at = at if at is not None else time.time()
+        seen = set()
+
+        def tracked():
+            nonlocal workspace_id
+            for task in tasks:
+                seen.add(task["gid"])
+                workspace_id = workspace_id or (task.get("workspace") or {}).get("gid")
+                yield task
+
+        count = self.add_tasks(tracked(), workspace_id)
+        with self._lock, self._conn:
+            stale = [r[0] for r in self._conn.execute(
+                "SELECT d.gid FROM doc_projects dp JOIN docs d ON d.id = dp.doc_id WHERE dp.project_gid = ?",
+                (project_id,)) if r[0] not in seen]
+            for gid in stale:
+                self._remove(gid)
+            self._conn.execute(
+                "INSERT INTO projects (gid, workspace_gid, indexed_at, rebuilt_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(gid) DO UPDATE SET workspace_gid = COALESCE(excluded.workspace_gid, workspace_gid),"
+                " indexed_at = excluded.indexed_at, rebuilt_at = excluded.rebuilt_at",
+                (project_id, workspace_id, at, at))
+        return count
+
+    def replace_personal_tasks(self, workspace_id: str, tasks: Iterable[Dict[str, Any]],
+                               at: Optional[float] = None) -> int:
+        """
+        Re-index the user's tasks in the workspace that are in no project, dropping the ones
+        no longer listed. Tasks in a project are left to that project's listing.
+        """
+        at = at if at is not None else time.time()
+        seen = set()
+
+        def unfiled():
+            for task in tasks:
+                if not task.get("projects"):
+                    seen.add(task["gid"])
+                    yield task
+
+        count = self.add_tasks(unfiled(), workspace_id)
+        with self._lock, self._conn:
+            stale = [r[0] for r in self._conn.execute(
+                "SELECT gid FROM docs d WHERE workspace_gid = ?"
+                " AND NOT EXISTS (SELECT 1 FROM doc_projects dp WHERE dp.doc_id = d.id)",
+                (workspace_id,)) if r[0] not in seen]
+            for gid in stale:
+                self._remove(gid)
+            self._conn.execute(
+                "INSERT INTO workspaces (gid, personal_indexed_at, personal_rebuilt_at) VALUES (?, ?, ?)"
+                " ON CONFLICT(gid) DO UPDATE SET personal_indexed_at = excluded.personal_indexed_at,"
+                " personal_rebuilt_at = excluded.personal_rebuilt_at",
+                (workspace_id, at, at))
+        return count
+
+    def add_personal_tasks(self, workspace_id: str, tasks: Iterable[Dict[str, Any]],
+                           at: Optional[float] = None) -> int:
+        """Index changed tasks from the user's listing; as replace_personal_tasks, without dropping any."""
+        count = self.add_tasks((t for t in tasks if not t.get("projects")), workspace_id)
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE workspaces SET personal_indexed_at = ? WHERE gid = ?",
+                               (at if at is not None else time.time(), workspace_id))
+        return count
+
+    def workspace_state(self, workspace_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT indexed_at, personal_indexed_at, personal_rebuilt_at FROM workspaces WHERE gid = ?",
+                (workspace_id,)).fetchone()
+        if row is None:
+            return None
+        return {"indexed_at": row[0], "personal_indexed_at": row[1], "personal_rebuilt_at": row[2]}
+
+    def mark_workspace_indexed(self, workspace_id: str, at: Optional[float] = None) -> None:
+        """Record that every project of the workspace (and the user's unfiled tasks) is indexed."""
+        at = at if at is not None else time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO workspaces (gid, indexed_at) VALUES (?, ?)"
+                " ON CONFLICT(gid) DO UPDATE SET indexed_at = excluded.indexed_at", (workspace_id, at))
+
+    def mark_indexed(self, project_id: str, at: Optional[float] = None) -> None:
+        at = at if at is not None else time.time()
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE projects SET indexed_at = ? WHERE gid = ?", (at, project_id))
+
+    def project_state(self, project_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT workspace_gid, indexed_at, rebuilt_at FROM projects WHERE gid = ?", (project_id,)).fetchone()
+        if row is None or row[1] is None:
+            return None
+        return {"workspace_gid": row[0], "indexed_at": row[1], "rebuilt_at": row[2]}
+
+    # --- reading --------------------------------------------------------
+
+    def covers(self, workspace_id: str, project_id: Optional[str] = None) -> bool:
+        """
+        True if a search can be answered from the index: the whole workspace has been
+        indexed, or the search is limited to project_id and that project has been.
+        """
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM workspaces WHERE gid = ? AND indexed_at IS NOT NULL",
+                                  (workspace_id,)).fetchone():
+                return True
+            return bool(project_id) and self._conn.execute(
+                "SELECT 1 FROM projects WHERE gid = ? AND indexed_at IS NOT NULL",
+                (project_id,)).fetchone() is not None
+
+    def search(self, query: str, workspace_id: Optional[str] = None, completed: Optional[bool] = None,
+               due_after: Optional[str] = None, due_before: Optional[str] = None,
+               project_id: Optional[str] = None, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """Ranked prefix search. due_after/due_before are inclusive YYYY-MM-DD bounds."""
+        expression = match_expression(query)
+        if not expression:
+            return []
+        sql = ("SELECT d.data, bm25(task_fts, 10.0, 1.0, 3.0) AS rank"
+               " FROM task_fts JOIN docs d ON d.id = task_fts.rowid WHERE task_fts MATCH ?")
+        params: List[Any] = [expression]
+        if workspace_id:
+            sql += " AND d.workspace_gid = ?"
+            params.append(workspace_id)
+        if completed is not None:
+            sql += " AND d.completed = ?"
+            params.append(int(completed))
+        if due_after:
+            sql += " AND d.due_on >= ?"
+            params.append(due_after)
+        if due_before:
+            sql += " AND d.due_on <= ?"
+            params.append(due_before)
+        if project_id:
+            sql += " AND EXISTS (SELECT 1 FROM doc_projects dp WHERE dp.doc_id = d.id AND dp.project_gid = ?)"
+            params.append(project_id)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+
+class SearchIndexer:
+    """
+    Builds and refreshes a SearchIndex from paginated listings.
+
+    Workspaces are expanded to their projects, plus the user's own tasks that are in no
+    project; with neither projects nor workspaces given, the client's default workspace is
+    indexed. A workspace counts as indexed only after a refresh got through all of it.
+    Each listing is fetched in full on first use and every full_rebuild_interval; in
+    between only tasks modified since the last refresh are fetched.
+    """
+
+    def __init__(self, client: Any, index: SearchIndex, projects: Iterable[str] = (),
+                 workspaces: Iterable[str] = (),
+                 full_rebuild_interval: float = DEFAULT_FULL_REBUILD_INTERVAL):
+        self.client = client
+        self.index = index
+        self.projects = list(projects)
+        self.workspaces = list(workspaces)
+        self.full_rebuild_interval = full_rebuild_interval
+
+    def refresh_once(self) -> None:
+        for project_id in self.projects:
+            self._try_refresh(self.refresh_project, project_id)
+        workspaces = self.workspaces
+        if not workspaces and not self.projects:
+            workspaces = [self.client.default_workspace_id()]
+        for workspace_id in workspaces:
+            started = time.time()
+            try:
+                projects = self.client.iter_workspace_projects(workspace_id)
+            except Exception:
+                logger.exception("Listing projects of workspace %s failed", workspace_id)
+                continue
+            results = [self._try_refresh(self.refresh_project, p["gid"], workspace_id) for p in projects]
+            results.append(self._try_refresh(self.refresh_personal, workspace_id))
+            if all(results):
+                self.index.mark_workspace_indexed(workspace_id, at=started)
+
+    def _try_refresh(self, refresh: Callable[..., None], *args: Any) -> bool:
+        try:
+            refresh(*args)
+            return True
+        except Exception:
+            logger.exception("Indexing %s failed", args[0])
+            return False
+
+    def refresh_project(self, project_id: str, workspace_id: Optional[str] = None) -> None:
+        state = self.index.project_state(project_id)
+        started = time.time()
+        opts = {'project': project_id, 'opt_fields': SEARCH_TASK_FIELDS}
+        if not state or not state["rebuilt_at"] or started - state["rebuilt_at"] > self.full_rebuild_interval:
+            self.index.replace_project(project_id, self.client.iter_tasks(opts), workspace_id, at=started)
+            return
+        since = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(state["indexed_at"]))
+        self.index.add_tasks(self.client.iter_tasks(dict(opts, modified_since=since)), workspace_id)
+        self.index.mark_indexed(project_id, at=started)
+
+    def refresh_personal(self, workspace_id: str) -> None:
+        """Index the user's tasks in the workspace that are in no project (no project listing has them)."""
+        state = self.index.workspace_state(workspace_id)
+        started = time.time()
+        opts = {'workspace': workspace_id, 'assignee': 'me', 'opt_fields': SEARCH_TASK_FIELDS}
+        if not state or not state["personal_rebuilt_at"] \
+                or started - state["personal_rebuilt_at"] > self.full_rebuild_interval:
+            self.index.replace_personal_tasks(workspace_id, self.client.iter_tasks(opts), at=started)
+            return
+        since = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(state["personal_indexed_at"]))
+        self.index.add_personal_tasks(workspace_id, self.client.iter_tasks(dict(opts, modified_since=since)),
+                                      at=started)
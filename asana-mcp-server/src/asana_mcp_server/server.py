@@ -1,29 +1,599 @@
-import json
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, List, Optional
+from urllib.parse import parse_qs, quote
 from mcp.server import Server
+from mcp.server.lowlevel.server import request_ctx
 from mcp.types import (
+    SubscribeRequest,
     Resource,
+    ResourceTemplate,
     Tool,
     TextContent,
     ImageContent,
     EmbeddedResource,
+    CallToolResult,
+    ListToolsResult,
 )
-from .client import AsanaClient
+from .client import AsanaClient, DEFAULT_PAGE_SIZE
+from .encoding import FORMATS, encode
+from .metrics import METRICS, RESOURCE, TOOL, configure_from_env, error_label
+from .async_client import AsyncAsanaClient, default_max_workers
+from .client_pool import ClientPool, pool_settings_from_env
+from .deadline import Deadline, DeadlineExceeded, deadline_scope, tool_timeouts_from_env
+from .registry import ResourceRouter, ToolRegistry
+from .mirror import DEFAULT_SYNC_INTERVAL, MirrorSync, TaskMirror
+from .search_index import DEFAULT_REFRESH_INTERVAL, DEFAULT_SEARCH_LIMIT, SearchIndex, SearchIndexer
+from .summary import DEFAULT_DUE_SOON_DAYS
+from .task_tree import DEFAULT_TREE_DEPTH, DEFAULT_TREE_MAX_NODES, MAX_TREE_DEPTH, MAX_TREE_NODES
+from .subscriptions import DEFAULT_MAX_INTERVAL, DEFAULT_MIN_INTERVAL, SubscriptionManager
 import os
 
+logger = logging.getLogger(__name__)
+
 # Asanaクライアントを初期化
 # 遅延初期化を行うか、起動時に環境変数を確認します
 asana_client = None
+async_client = None
+# HTTPモードでは、Authorizationヘッダーで渡されたトークンごとにクライアントを作成します。
+# キャッシュとレート制限はトークン（ユーザー）ごとに分け、接続プールとワーカースレッドは共有します。
+# クライアントはLRUとアイドル時間で追い出し、多数のユーザーでもメモリ使用量を一定に保ちます
+client_pool: Optional[ClientPool] = None
+pool_client: Optional[AsanaClient] = None
+# resources/subscribe で購読されたリソースの変更検知（create_serverで作成）
+subscription_manager: Optional[SubscriptionManager] = None
+worker_pool: Optional[ThreadPoolExecutor] = None
+
+def new_asana_client(access_token: Optional[str] = None, **kwargs) -> AsanaClient:
+    """接続プール（urllib3）を他のクライアントと共有するAsanaClientを作成します。"""
+    global pool_client
+    # 最初に作成したクライアントの接続プールを使います（SDKはそのクライアントの初回呼び出しまで読み込まれません）
+    rest_client = pool_client.api_client.rest_client if pool_client else None
+    client = AsanaClient(access_token=access_token, max_connections=default_max_workers(),
+                         rest_client=rest_client, **kwargs)
+    if pool_client is None:
+        pool_client = client
+    return client
+
+def get_worker_pool() -> ThreadPoolExecutor:
+    """すべてのクライアントで共有するワーカースレッドプールを返します。"""
+    global worker_pool
+    if worker_pool is None:
+        worker_pool = ThreadPoolExecutor(max_workers=default_max_workers(), thread_name_prefix="asana")
+    return worker_pool
+
+def bearer_token(value: Optional[str]) -> Optional[str]:
+    """'Bearer <token>' 形式のAuthorizationヘッダーからトークンを取り出します。"""
+    scheme, _, token = (value or "").partition(" ")
+    token = token.strip()
+    return token if scheme.lower() == "bearer" and token else None
+
+def request_token() -> Optional[str]:
+    """処理中のHTTPリクエストのBearerトークンを返します（stdioモードやヘッダーがない場合はNone）。"""
+    try:
+        ctx = request_ctx.get()
+    except LookupError:
+        return None
+    headers = getattr(getattr(ctx, "request", None), "headers", None)
+    return bearer_token(headers.get("authorization")) if headers else None
 
 def get_client():
     global asana_client
     if not asana_client:
-        asana_client = AsanaClient()
+        # ASANA_MIRROR_PATH が設定されていれば、ローカルのSQLiteミラーから読み取るモードで起動します
+        mirror_path = os.environ.get("ASANA_MIRROR_PATH")
+        mirror = TaskMirror(mirror_path) if mirror_path else None
+        # ASANA_SEARCH_INDEX_PATH が設定されていれば、search_tasks をローカルの全文検索インデックスで処理します
+        index_path = os.environ.get("ASANA_SEARCH_INDEX_PATH")
+        search_index = SearchIndex(index_path) if index_path else None
+        asana_client = new_asana_client(mirror=mirror, search_index=search_index)
     return asana_client
 
-async def serve():
-    server = Server("asana-mcp-server")
+def _env_list(name: str) -> List[str]:
+    return [v.strip() for v in os.environ.get(name, "").split(",") if v.strip()]
+
+async def run_periodically(client: AsyncAsanaClient, func, interval: float) -> None:
+    """funcを定期的に実行するバックグラウンドループ。処理はワーカースレッドで実行されます。"""
+    while True:
+        try:
+            await client.run(func)
+        except Exception:
+            logger.exception("Background job %s failed", getattr(func, "__qualname__", func))
+        await asyncio.sleep(interval)
+
+def start_mirror_sync() -> Optional[asyncio.Task]:
+    """ミラーモードが有効な場合、バックグラウンド同期タスクを開始します。"""
+    if not os.environ.get("ASANA_MIRROR_PATH"):
+        return None
+    projects = _env_list("ASANA_MIRROR_PROJECTS")
+    workspaces = _env_list("ASANA_MIRROR_WORKSPACES")
+    if not projects and not workspaces:
+        # 同期対象がなければミラーは空のままで、読み取りはすべてAsana APIに送られます
+        logger.warning("ASANA_MIRROR_PATH is set but neither ASANA_MIRROR_PROJECTS nor "
+                       "ASANA_MIRROR_WORKSPACES is; nothing is mirrored and reads go to the Asana API")
+        return None
+    client = get_async_client()
+    sync = MirrorSync(client.client, client.client.mirror, projects=projects, workspaces=workspaces)
+    interval = float(os.environ.get("ASANA_MIRROR_INTERVAL", DEFAULT_SYNC_INTERVAL))
+    logger.info("Mirror sync enabled: %s", ", ".join(client.client.mirror.scopes()))
+    return asyncio.create_task(run_periodically(client, sync.sync_once, interval))
+
+def start_search_indexer() -> Optional[asyncio.Task]:
+    """検索インデックスが有効な場合、バックグラウンドでのインデックス更新タスクを開始します。"""
+    if not os.environ.get("ASANA_SEARCH_INDEX_PATH"):
+        return None
+    client = get_async_client()
+    workspaces = _env_list("ASANA_SEARCH_INDEX_WORKSPACES")
+    projects = _env_list("ASANA_SEARCH_INDEX_PROJECTS")
+    # 対象が指定されていなければ、デフォルトのワークスペース全体をインデックスします
+    indexer = SearchIndexer(client.client, client.client.search_index, projects=projects, workspaces=workspaces)
+    interval = float(os.environ.get("ASANA_SEARCH_INDEX_INTERVAL", DEFAULT_REFRESH_INTERVAL))
+    logger.info("Search index enabled: projects=%s workspaces=%s", projects, workspaces)
+    return asyncio.create_task(run_periodically(client, indexer.refresh_once, interval))
+
+def get_async_client():
+    """
+    ブロッキングなAsanaClientをスレッドプール経由で呼び出す非同期クライアントを返します。
+    ハンドラーはこちらを使うことで、イベントループを止めずに複数のツール呼び出しを並行処理できます。
+    HTTPモードでリクエストにBearerトークンが付いている場合は、そのトークン用のクライアントを返します。
+    """
+    global async_client
+    token = request_token()
+    if token and token != os.environ.get("ASANA_ACCESS_TOKEN"):
+        return get_token_client(token)
+    if not async_client:
+        async_client = AsyncAsanaClient(get_client(), executor=get_worker_pool())
+    return async_client
+
+def get_client_pool() -> ClientPool:
+    """トークンごとのクライアントのプールを返します（ASANA_CLIENT_POOL_SIZE・ASANA_CLIENT_IDLE_TTLで調整）。"""
+    global client_pool
+    if client_pool is None:
+        client_pool = ClientPool(
+            lambda token: AsyncAsanaClient(new_asana_client(access_token=token), executor=get_worker_pool()),
+            on_evict=lambda client: client.shutdown(wait=False),
+            **pool_settings_from_env())
+    return client_pool
+
+def get_token_client(token: str) -> AsyncAsanaClient:
+    """トークンごとのクライアントを返します。ミラーと検索インデックスはサーバーのトークン専用です。"""
+    return get_client_pool().get(token)
+
+def start_background_jobs() -> List[asyncio.Task]:
+    """ミラー同期・検索インデックス更新など、有効なバックグラウンドタスクを開始します。"""
+    return [task for task in (start_mirror_sync(), start_search_indexer()) if task]
+
+def stop_background_jobs(tasks: List[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+    if subscription_manager is not None:
+        subscription_manager.close()
+
+def batch_summary(results: List[dict]) -> dict:
+    """バッチ操作の結果を、成功/失敗件数と項目ごとの結果にまとめます。"""
+    succeeded = sum(1 for r in results if r.get("ok"))
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+def page_result(page: dict, base_uri: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> dict:
+    """
+    1ページ分の結果を返します。続きがある場合、next_page（不透明なカーソル）と、
+    リソースの場合は次ページを読むためのURI（next_uri）を含めます。
+    """
+    result = {"data": page["data"], "next_page": page["next_page"]}
+    if base_uri and page["next_page"]:
+        result["next_uri"] = f"{base_uri}?limit={limit}&next_page={quote(page['next_page'], safe='')}"
+    return result
+
+# すべてのツールが受け付ける出力形式の指定
+FORMAT_PROPERTY = {
+    "type": "string",
+    "enum": list(FORMATS),
+    "description": "Output encoding: json (compact, default), pretty, ndjson (one task per line) or table (tab-separated)",
+}
+# 読み取り系ツールが受け付けるフィールドの絞り込み（Asanaのopt_fieldsとしてそのまま渡されます）
+OPT_FIELDS_PROPERTY = {
+    "type": "string",
+    "description": "Comma-separated Asana fields to fetch and return, e.g. \"name,due_on,assignee.name\" (gid is always included)",
+}
+
+def resource_route(uri: str) -> str:
+    """メトリクス用に、リソースURIをIDを除いたテンプレート（asana://tasks/{task_id} など）に変換します。"""
+    match = RESOURCES.match(uri)
+    return match[0] if match else "unknown"
+
+def response_bytes(contents: List[Any]) -> int:
+    """ツールの応答のうち、テキスト部分のバイト数を返します。"""
+    return sum(len(c.text.encode("utf-8")) for c in contents if isinstance(c, TextContent))
+
+def timeout_result(name: str, timeout: Optional[float]) -> CallToolResult:
+    """制限時間を過ぎたツール呼び出しの結果（isErrorとstructuredContentつき）を返します。"""
+    message = str(DeadlineExceeded(timeout))
+    return CallToolResult(
+        content=[TextContent(type="text", text=f"Error: {name}: {message}")],
+        structuredContent={"error": "timeout", "tool": name, "timeout_seconds": timeout, "message": message},
+        isError=True,
+    )
+
+# ツールの定義と処理をまとめて登録します。ツール一覧は一度だけ作成し、入力スキーマは登録時に検証器へコンパイルします。
+# 呼び出しはツール名から辞書で処理関数を引くため、ツールが増えても1回あたりのコストは変わりません
+TOOLS = ToolRegistry(common_properties={"format": FORMAT_PROPERTY})
+
+def tool_definitions() -> List[Tool]:
+    """このサーバーが提供するツールの定義を返します。"""
+    return TOOLS.definitions()
+
+@TOOLS.tool(Tool(
+    name="get_my_tasks",
+    description="Get tasks assigned to the current user. Optionally filter by workspace. Results are paginated; pass the returned next_page to get more.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "workspace_id": {"type": "string", "description": "Workspace ID (optional)"},
+            "limit": {"type": "integer", "description": "Max number of tasks to return (default 50, max 100)"},
+            "next_page": {"type": "string", "description": "Cursor from a previous response to fetch the next page"},
+            "opt_fields": OPT_FIELDS_PROPERTY
+        }
+    }
+))
+async def get_my_tasks_tool(client: AsyncAsanaClient, arguments: dict) -> Any:
+    page = await client.get_my_tasks_page(
+        workspace_id=arguments.get("workspace_id"),
+        limit=arguments.get("limit", DEFAULT_PAGE_SIZE),
+        offset=arguments.get("next_page"),
+        opt_fields=arguments.get("opt_fields")
+    )
+    return page_result(page)
+
+@TOOLS.tool(Tool(
+    name="get_project_tasks",
+    description="Get tasks in a project. Results are paginated; pass the returned next_page to get more.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "project_id": {"type": "string", "description": "Project ID"},
+            "limit": {"type": "integer", "description": "Max number of tasks to return (default 50, max 100)"},
+            "next_page": {"type": "string", "description": "Cursor from a previous response to fetch the next page"},
+            "opt_fields": OPT_FIELDS_PROPERTY
+        },
+        "required": ["project_id"]
+    }
+))
+async def get_project_tasks_tool(client: AsyncAsanaClient, arguments: dict) -> Any:
+    page = await client.get_project_tasks_page(
+        arguments["project_id"],
+        limit=arguments.get("limit", DEFAULT_PAGE_SIZE),
+        offset=arguments.get("next_page"),
+        opt_fields=arguments.get("opt_fields")
+    )
+    return page_result(page)
+
+@TOOLS.tool(Tool(
+    name="summarize_project",
+    description="Summarize a project's tasks without listing them: counts by completion, due date "
+                "(overdue, due today, due soon, later, none), assignee and section. Works on projects of any size.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "project_id": {"type": "string", "description": "Project ID"},
+            "due_soon_days": {"type": "integer", "description": "Days ahead counted as due soon (default 7)"}
+        },
+        "required": ["project_id"]
+    }
+))
+async def summarize_project_tool(client: AsyncAsanaClient, arguments: dict) -> Any:
+    return await client.summarize_project(
+        arguments["project_id"],
+        due_soon_days=arguments.get("due_soon_days", DEFAULT_DUE_SOON_DAYS)
+    )
+
+@TOOLS.tool(Tool(
+    name="search_tasks",
+    description="Search for tasks using keywords.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "description": "Search keyword"},
+            "workspace_id": {"type": "string", "description": "Workspace ID (optional)"},
+            "completed": {"type": "boolean", "description": "Only completed (true) or incomplete (false) tasks"},
+            "due_after": {"type": "string", "description": "Only tasks due on or after this date (YYYY-MM-DD)"},
+            "due_before": {"type": "string", "description": "Only tasks due on or before this date (YYYY-MM-DD)"},
+            "project_id": {"type": "string", "description": "Only tasks in this project"},
+            "limit": {"type": "integer", "description": "Max number of results (default 20)"}
+        },
+        "required": ["query"]
+    }
+))
+async def search_tasks_tool(client: AsyncAsanaClient, arguments: dict) -> Any:
+    return await client.search_tasks(
+        query=arguments["query"],
+        workspace_id=arguments.get("workspace_id"),
+        completed=arguments.get("completed"),
+        due_after=arguments.get("due_after"),
+        due_before=arguments.get("due_before"),
+        project_id=arguments.get("project_id"),
+        limit=arguments.get("limit", DEFAULT_SEARCH_LIMIT)
+    )
+
+@TOOLS.tool(Tool(
+    name="create_task",
+    description="Create a new task.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "name": {"type": "string", "description": "Task name"},
+            "notes": {"type": "string", "description": "Task description/notes"},
+            "due_on": {"type": "string", "description": "Due date (YYYY-MM-DD)"},
+            "project_id": {"type": "string", "description": "Project ID to add task to"},
+            "workspace_id": {"type": "string", "description": "Workspace ID (optional, defaults to first available)"}
+        },
+        "required": ["name"]
+    }
+))
+async def create_task_tool(client: AsyncAsanaClient, arguments: dict) -> Any:
+    return await client.create_task(
+        name=arguments["name"],
+        notes=arguments.get("notes"),
+        due_on=arguments.get("due_on"),
+        project_id=arguments.get("project_id"),
+        workspace_id=arguments.get("workspace_id")
+    )
+
+@TOOLS.tool(Tool(
+    name="update_task",
+    description="Update an existing task.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "task_id": {"type": "string", "description": "ID of the task to update"},
+            "name": {"type": "string", "description": "New task name"},
+            "notes": {"type": "string", "description": "New task notes"},
+            "completed": {"type": "boolean", "description": "Mark as completed (true) or incomplete (false)"},
+            "due_on": {"type": "string", "description": "New due date"}
+        },
+        "required": ["task_id"]
+    }
+))
+async def update_task_tool(client: AsyncAsanaClient, arguments: dict) -> Any:
+    data = {}
+    if "name" in arguments: data["name"] = arguments["name"]
+    if "notes" in arguments: data["notes"] = arguments["notes"]
+    if "completed" in arguments: data["completed"] = arguments["completed"]
+    if "due_on" in arguments: data["due_on"] = arguments["due_on"]
+
+    return await client.update_task(arguments["task_id"], data)
+
+@TOOLS.tool(Tool(
+    name="get_task_details",
+    description="Get full details of a specific task.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "task_id": {"type": "string", "description": "Task ID"},
+            "opt_fields": OPT_FIELDS_PROPERTY
+        },
+        "required": ["task_id"]
+    }
+))
+async def get_task_details_tool(client: AsyncAsanaClient, arguments: dict) -> Any:
+    return await client.get_task(arguments["task_id"], opt_fields=arguments.get("opt_fields"))
+
+@TOOLS.tool(Tool(
+    name="get_task_tree",
+    description="Get a task with its subtasks (and optionally dependencies) several levels deep in one call. "
+                "Each level is fetched concurrently; tasks reached twice are listed once and then marked duplicate.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "task_id": {"type": "string", "description": "Root task ID"},
+            "max_depth": {"type": "integer", "description": f"Levels below the root to fetch (default {DEFAULT_TREE_DEPTH}, max {MAX_TREE_DEPTH})"},
+            "max_nodes": {"type": "integer", "description": f"Stop after this many tasks (default {DEFAULT_TREE_MAX_NODES}, max {MAX_TREE_NODES})"},
+            "include_dependencies": {"type": "boolean", "description": "Also follow the tasks each task depends on (default false)"},
+            "opt_fields": OPT_FIELDS_PROPERTY
+        },
+        "required": ["task_id"]
+    }
+))
+async def get_task_tree_tool(client: AsyncAsanaClient, arguments: dict) -> Any:
+    return await client.get_task_tree(
+        arguments["task_id"],
+        max_depth=arguments.get("max_depth", DEFAULT_TREE_DEPTH),
+        max_nodes=arguments.get("max_nodes", DEFAULT_TREE_MAX_NODES),
+        include_dependencies=arguments.get("include_dependencies", False),
+        opt_fields=arguments.get("opt_fields")
+    )
+
+@TOOLS.tool(Tool(
+    name="add_comment",
+    description="Add a comment to a task.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "task_id": {"type": "string", "description": "Task ID"},
+            "text": {"type": "string", "description": "Comment text"}
+        },
+        "required": ["task_id", "text"]
+    }
+))
+async def add_comment_tool(client: AsyncAsanaClient, arguments: dict) -> Any:
+    return await client.add_comment(arguments["task_id"], arguments["text"])
+
+@TOOLS.tool(Tool(
+    name="get_tasks",
+    description="Get details of many tasks at once (uses Asana's batch API).",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "task_ids": {"type": "array", "items": {"type": "string"}, "description": "Task IDs"},
+            "opt_fields": OPT_FIELDS_PROPERTY
+        },
+        "required": ["task_ids"]
+    }
+))
+async def get_tasks_tool(client: AsyncAsanaClient, arguments: dict) -> Any:
+    results = await client.get_tasks(arguments["task_ids"], opt_fields=arguments.get("opt_fields"))
+    return batch_summary(results)
+
+@TOOLS.tool(Tool(
+    name="bulk_update_tasks",
+    description="Update many tasks at once (uses Asana's batch API). Reports success or failure per task.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "updates": {
+                "type": "array",
+                "description": "One entry per task to update",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "task_id": {"type": "string", "description": "ID of the task to update"},
+                        "name": {"type": "string", "description": "New task name"},
+                        "notes": {"type": "string", "description": "New task notes"},
+                        "completed": {"type": "boolean", "description": "Mark as completed (true) or incomplete (false)"},
+                        "due_on": {"type": "string", "description": "New due date"}
+                    },
+                    "required": ["task_id"]
+                }
+            }
+        },
+        "required": ["updates"]
+    }
+))
+async def bulk_update_tasks_tool(client: AsyncAsanaClient, arguments: dict) -> Any:
+    updates = [
+        {k: v for k, v in u.items() if k in ("task_id", "name", "notes", "completed", "due_on")}
+        for u in arguments["updates"]
+    ]
+    results = await client.bulk_update_tasks(updates)
+    return batch_summary(results)
+
+@TOOLS.tool(Tool(
+    name="bulk_create_tasks",
+    description="Create many tasks at once (uses Asana's batch API). Reports success or failure per task.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "tasks": {
+                "type": "array",
+                "description": "One entry per task to create",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string", "description": "Task name"},
+                        "notes": {"type": "string", "description": "Task description/notes"},
+                        "due_on": {"type": "string", "description": "Due date (YYYY-MM-DD)"},
+                        "project_id": {"type": "string", "description": "Project ID to add task to"},
+                        "workspace_id": {"type": "string", "description": "Workspace ID (optional, defaults to first available)"}
+                    },
+                    "required": ["name"]
+                }
+            }
+        },
+        "required": ["tasks"]
+    }
+))
+async def bulk_create_tasks_tool(client: AsyncAsanaClient, arguments: dict) -> Any:
+    results = await client.bulk_create_tasks(arguments["tasks"])
+    return batch_summary(results)
+
+# リソースURIテンプレートと処理関数。処理関数は (client, query, **URIの変数) を受け取ります
+RESOURCES = ResourceRouter()
+
+def resource_query(uri: str) -> dict:
+    """
+    リソースURIのクエリ文字列を読み取ります。
+    一覧系のURIは ?limit=&next_page= でページングでき、?format= で出力形式を、?opt_fields= で取得するフィールドを指定できます。
+    """
+    path, _, query = uri.partition("?")
+    params = parse_qs(query)
+    return {
+        "path": path,
+        "limit": int(params.get("limit", [DEFAULT_PAGE_SIZE])[0]),
+        "next_page": params.get("next_page", [None])[0],
+        "format": params.get("format", [None])[0],
+        "opt_fields": params.get("opt_fields", [None])[0],
+    }
+
+@RESOURCES.route("asana://tasks/{task_id}", name="Task", description="Details of a task (?opt_fields=, ?format=)")
+async def task_resource(client: AsyncAsanaClient, query: dict, task_id: str) -> str:
+    """タスクの詳細を返します。"""
+    task = await client.get_task(task_id, opt_fields=query["opt_fields"])
+    return encode(task, query["format"])
+
+@RESOURCES.route("asana://projects/{project_id}/tasks", name="Project tasks",
+                 description="Tasks in a project, one page at a time (?limit=, ?next_page=, ?opt_fields=, ?format=)")
+async def project_tasks_resource(client: AsyncAsanaClient, query: dict, project_id: str) -> str:
+    """プロジェクト内のタスク一覧（1ページ分）を返します。"""
+    page = await client.get_project_tasks_page(project_id, limit=query["limit"], offset=query["next_page"],
+                                               opt_fields=query["opt_fields"])
+    return encode(page_result(page, query["path"], query["limit"]), query["format"])
+
+@RESOURCES.route("asana://workspaces/{workspace_id}/tasks", name="My tasks in a workspace",
+                 description="Incomplete tasks assigned to you, one page at a time (?limit=, ?next_page=, ?opt_fields=, ?format=)")
+async def workspace_tasks_resource(client: AsyncAsanaClient, query: dict, workspace_id: str) -> str:
+    """ワークスペース内の自分に割り当てられたタスク一覧（1ページ分）を返します。"""
+    page = await client.get_my_tasks_page(workspace_id=workspace_id, limit=query["limit"], offset=query["next_page"],
+                                          opt_fields=query["opt_fields"])
+    return encode(page_result(page, query["path"], query["limit"]), query["format"])
+
+@RESOURCES.route("asana://cache/stats")
+async def cache_stats_resource(client: AsyncAsanaClient, query: dict) -> str:
+    """タスクキャッシュのヒット/ミス/追い出し回数を返します。"""
+    return encode(client.cache_stats(), query["format"])
+
+@RESOURCES.route("asana://metrics")
+async def metrics_resource(client: AsyncAsanaClient, query: dict) -> str:
+    """ツール・Asanaエンドポイントごとの所要時間・エラー数などを返します（?format=prometheus も可）。"""
+    if query["format"] == "prometheus":
+        return METRICS.prometheus()
+    snapshot = dict(METRICS.snapshot(), scheduler=client.client.scheduler_stats())
+    if subscription_manager is not None:
+        snapshot["subscriptions"] = subscription_manager.stats()
+    if client_pool is not None:
+        snapshot["client_pool"] = client_pool.stats()
+    return encode(snapshot, query["format"])
+
+async def read_resource(uri: str, client: Optional[AsyncAsanaClient] = None) -> str:
+    """URIテンプレートに一致するリソースの処理関数で、リソースを読み込みます。"""
+    match = RESOURCES.match(str(uri))
+    if match is None:
+        raise ValueError(f"Unsupported URI: {uri}")
+    _, handler, variables = match
+    return await handler(client or get_async_client(), resource_query(str(uri)), **variables)
+
+class AsanaServer(Server):
+    """
+    resources/subscribe のハンドラーが登録されていれば、capabilitiesでsubscribeを宣言します。
+    セッションが終了すると、unsubscribeされていない購読もすべて解除します。
+    """
+
+    subscriptions: Optional[SubscriptionManager] = None
+
+    async def run(self, *args, **kwargs):
+        if self.subscriptions is None:
+            return await super().run(*args, **kwargs)
+        # リクエストのハンドラーはrunの中で起動されるタスクで動くため、このスコープを引き継ぎます
+        with self.subscriptions.session_scope():
+            return await super().run(*args, **kwargs)
+
+    def get_capabilities(self, notification_options, experimental_capabilities):
+        capabilities = super().get_capabilities(notification_options, experimental_capabilities)
+        if capabilities.resources is not None and SubscribeRequest in self.request_handlers:
+            capabilities.resources.subscribe = True
+        return capabilities
+
+def create_server() -> Server:
+    """ハンドラーを登録したMCPサーバーを作成します（トランスポートには依存しません）。"""
+    global subscription_manager
+    server = AsanaServer("asana-mcp-server")
+    # 購読されたリソースはEvents APIで変更を検知し、変更があったときだけ通知します。
+    # 同じリソースの購読者が何人いても、ポーリングは1つだけです
+    subscriptions = subscription_manager = SubscriptionManager(
+        read=lambda client, uri: read_resource(uri, client),
+        min_interval=float(os.environ.get("ASANA_SUBSCRIPTION_MIN_INTERVAL", DEFAULT_MIN_INTERVAL)),
+        max_interval=float(os.environ.get("ASANA_SUBSCRIPTION_MAX_INTERVAL", DEFAULT_MAX_INTERVAL)),
+    )
+    server.subscriptions = subscriptions
 
     @server.list_resources()
     async def handle_list_resources() -> List[Resource]:
@@ -35,8 +605,8 @@ async def serve():
         list_resourcesで返す必要はありません。
         出発点としてユーザーのワークスペースを一覧表示しましょう。
         """
-        client = get_client()
-        workspaces = client.get_workspaces()
+        client = get_async_client()
+        workspaces = await client.get_workspaces()
         resources = []
         for w in workspaces:
             resources.append(
@@ -47,177 +617,109 @@ async def serve():
                     mimeType="application/json",
                 )
             )
+        resources.append(
+            Resource(
+                uri="asana://cache/stats",
+                name="Cache statistics",
+                description="Hit/miss/eviction counters of the task cache",
+                mimeType="application/json",
+            )
+        )
+        resources.append(
+            Resource(
+                uri="asana://metrics",
+                name="Metrics",
+                description="Latency, error and size metrics per tool and Asana endpoint (?format=prometheus for Prometheus text)",
+                mimeType="application/json",
+            )
+        )
         return resources
 
+    @server.list_resource_templates()
+    async def handle_list_resource_templates() -> List[ResourceTemplate]:
+        return RESOURCES.resource_templates()
+
     @server.read_resource()
     async def handle_read_resource(uri: str) -> str:
+        with METRICS.measure(RESOURCE, resource_route(str(uri))) as call:
+            text = await read_resource(uri)
+            call["bytes"] = len(text.encode("utf-8"))
+        return text
+
+    @server.subscribe_resource()
+    async def handle_subscribe_resource(uri) -> None:
         """
-        特定のリソースを読み込みます。
-        サポートされているスキーム:
-        - asana://tasks/{task_id} -> タスクの詳細テキストを返します
-        - asana://projects/{project_id}/tasks -> プロジェクト内のタスク一覧を返します
-        - asana://workspaces/{workspace_id}/tasks -> ワークスペース内のタスク一覧（自分に割り当てられたもの？）を返します
+        タスク・プロジェクト・ワークスペースのタスク一覧のURIを購読します。
+        変更を検知すると notifications/resources/updated を送るので、クライアントはポーリングが不要になります。
         """
-        client = get_client()
-        parsed_uri = str(uri)
+        await subscriptions.subscribe(str(uri), server.request_context.session, get_async_client())
 
-        if "asana://tasks/" in parsed_uri:
-            task_id = parsed_uri.split("asana://tasks/")[-1]
-            task = client.get_task(task_id)
-            return json.dumps(task, indent=2)
-
-        elif "asana://projects/" in parsed_uri and parsed_uri.endswith("/tasks"):
-            project_id = parsed_uri.split("asana://projects/")[-1].replace("/tasks", "")
-            tasks = client.get_project_tasks(project_id)
-            return json.dumps(tasks, indent=2)
-
-        elif "asana://workspaces/" in parsed_uri and parsed_uri.endswith("/tasks"):
-            workspace_id = parsed_uri.split("asana://workspaces/")[-1].replace("/tasks", "")
-            tasks = client.get_my_tasks(workspace_id=workspace_id)
-            return json.dumps(tasks, indent=2)
-
-        raise ValueError(f"Unsupported URI: {uri}")
+    @server.unsubscribe_resource()
+    async def handle_unsubscribe_resource(uri) -> None:
+        subscriptions.unsubscribe(str(uri), server.request_context.session)
 
     @server.list_tools()
-    async def handle_list_tools() -> List[Tool]:
-        return [
-            Tool(
-                name="get_my_tasks",
-                description="Get tasks assigned to the current user. Optionally filter by workspace.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "workspace_id": {"type": "string", "description": "Workspace ID (optional)"},
-                        "limit": {"type": "integer", "description": "Max number of tasks to return (default 50)"}
-                    }
-                }
-            ),
-            Tool(
-                name="search_tasks",
-                description="Search for tasks using keywords.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "query": {"type": "string", "description": "Search keyword"},
-                        "workspace_id": {"type": "string", "description": "Workspace ID (optional)"}
-                    },
-                    "required": ["query"]
-                }
-            ),
-            Tool(
-                name="create_task",
-                description="Create a new task.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string", "description": "Task name"},
-                        "notes": {"type": "string", "description": "Task description/notes"},
-                        "due_on": {"type": "string", "description": "Due date (YYYY-MM-DD)"},
-                        "project_id": {"type": "string", "description": "Project ID to add task to"},
-                        "workspace_id": {"type": "string", "description": "Workspace ID (optional, defaults to first available)"}
-                    },
-                    "required": ["name"]
-                }
-            ),
-            Tool(
-                name="update_task",
-                description="Update an existing task.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "task_id": {"type": "string", "description": "ID of the task to update"},
-                        "name": {"type": "string", "description": "New task name"},
-                        "notes": {"type": "string", "description": "New task notes"},
-                        "completed": {"type": "boolean", "description": "Mark as completed (true) or incomplete (false)"},
-                        "due_on": {"type": "string", "description": "New due date"}
-                    },
-                    "required": ["task_id"]
-                }
-            ),
-            Tool(
-                name="get_task_details",
-                description="Get full details of a specific task.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "task_id": {"type": "string", "description": "Task ID"}
-                    },
-                    "required": ["task_id"]
-                }
-            ),
-            Tool(
-                name="add_comment",
-                description="Add a comment to a task.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "task_id": {"type": "string", "description": "Task ID"},
-                        "text": {"type": "string", "description": "Comment text"}
-                    },
-                    "required": ["task_id", "text"]
-                }
-            )
-        ]
-
-    @server.call_tool()
-    async def handle_call_tool(name: str, arguments: dict) -> List[TextContent | ImageContent | EmbeddedResource]:
-        client = get_client()
-
-        try:
-            if name == "get_my_tasks":
-                tasks = client.get_my_tasks(
-                    workspace_id=arguments.get("workspace_id"),
-                    limit=arguments.get("limit", 50)
-                )
-                return [TextContent(type="text", text=json.dumps(tasks, indent=2))]
-
-            elif name == "search_tasks":
-                tasks = client.search_tasks(
-                    query=arguments["query"],
-                    workspace_id=arguments.get("workspace_id")
-                )
-                return [TextContent(type="text", text=json.dumps(tasks, indent=2))]
-
-            elif name == "create_task":
-                task = client.create_task(
-                    name=arguments["name"],
-                    notes=arguments.get("notes"),
-                    due_on=arguments.get("due_on"),
-                    project_id=arguments.get("project_id"),
-                    workspace_id=arguments.get("workspace_id")
-                )
-                return [TextContent(type="text", text=json.dumps(task, indent=2))]
+    async def handle_list_tools() -> ListToolsResult:
+        # 一度作成した一覧をそのまま返します
+        return TOOLS.listing()
 
-            elif name == "update_task":
-                data = {}
-                if "name" in arguments: data["name"] = arguments["name"]
-                if "notes" in arguments: data["notes"] = arguments["notes"]
-                if "completed" in arguments: data["completed"] = arguments["completed"]
-                if "due_on" in arguments: data["due_on"] = arguments["due_on"]
+    async def run_tool(handler, arguments: dict) -> List[TextContent | ImageContent | EmbeddedResource]:
+        value = await handler(get_async_client(), arguments)
+        return [TextContent(type="text", text=encode(value, arguments.get("format")))]
 
-                task = client.update_task(arguments["task_id"], data)
-                return [TextContent(type="text", text=json.dumps(task, indent=2))]
+    # ツールごとの制限時間（ASANA_TOOL_TIMEOUT・ASANA_TOOL_TIMEOUTS）
+    timeouts = tool_timeouts_from_env()
 
-            elif name == "get_task_details":
-                task = client.get_task(arguments["task_id"])
-                return [TextContent(type="text", text=json.dumps(task, indent=2))]
+    # 入力の検証は登録時にコンパイルした検証器で行います（MCP SDKは呼び出しのたびにスキーマ自体を検証し直すため）
+    @server.call_tool(validate_input=False)
+    async def handle_call_tool(name: str, arguments: dict) -> List[TextContent | ImageContent | EmbeddedResource] | CallToolResult:
+        # ツールごとの呼び出し回数・エラー・所要時間・応答サイズを記録します
+        with METRICS.measure(TOOL, name if name in TOOLS else "unknown") as call:
+            # 制限時間を過ぎるか、クライアントがキャンセルした呼び出しは、ワーカースレッド側でも
+            # 次のリクエスト・ページ・リトライを行わずに打ち切り、接続と同時実行枠をすぐに返します
+            deadline = Deadline(timeouts.for_tool(name))
+            handler = TOOLS.handler(name)
+            invalid = TOOLS.validate(name, arguments) if handler else None
+            try:
+                if handler is None:
+                    raise ValueError(f"Unknown tool: {name}")
+                if invalid:
+                    call["error"] = "invalid_input"
+                    result = CallToolResult(content=[TextContent(type="text", text=f"Input validation error: {invalid}")],
+                                            isError=True)
+                else:
+                    with deadline_scope(deadline):
+                        result = await asyncio.wait_for(run_tool(handler, arguments), deadline.timeout)
+            except (asyncio.TimeoutError, DeadlineExceeded):
+                deadline.cancel()
+                call["error"] = "timeout"
+                result = timeout_result(name, deadline.timeout)
+            except asyncio.CancelledError:
+                # MCPのキャンセル通知（notifications/cancelled）など
+                deadline.cancel()
+                raise
+            except Exception as e:
+                call["error"] = error_label(e)
+                result = [TextContent(type="text", text=f"Error: {str(e)}")]
+            call["bytes"] = response_bytes(result.content if isinstance(result, CallToolResult) else result)
+        return result
 
-            elif name == "add_comment":
-                story = client.add_comment(arguments["task_id"], arguments["text"])
-                return [TextContent(type="text", text=json.dumps(story, indent=2))]
+    return server
 
-            else:
-                raise ValueError(f"Unknown tool: {name}")
-
-        except Exception as e:
-            return [TextContent(type="text", text=f"Error: {str(e)}")]
+async def serve():
+    configure_from_env(METRICS)
+    server = create_server()
+    background_jobs = start_background_jobs()
 
     # stdioを使用してサーバーを実行
     from mcp.server.stdio import stdio_server
 
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+    finally:
+        stop_background_jobs(background_jobs)
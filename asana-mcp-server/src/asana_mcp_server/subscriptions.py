@@ -0,0 +1,225 @@
+import asyncio
+import contextlib
+import contextvars
+import hashlib
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds between polls of one watched resource: back to the minimum after a change,
+# stretched by BACKOFF after each quiet poll up to the maximum.
+DEFAULT_MIN_INTERVAL = 5.0
+DEFAULT_MAX_INTERVAL = 60.0
+BACKOFF = 1.5
+
+# Same segment pattern as the ResourceRouter templates, so every readable URI can be watched.
+TASK_URI = re.compile(r"asana://tasks/([^/]+)")
+PROJECT_URI = re.compile(r"asana://projects/([^/]+)/tasks")
+WORKSPACE_URI = re.compile(r"asana://workspaces/([^/]+)/tasks")
+
+# read(client, uri) -> the resource text, used for resources without an event stream.
+Reader = Callable[[Any, str], Awaitable[str]]
+
+# Sessions that subscribed within the current session_scope() (one per connection).
+_scope_sessions: contextvars.ContextVar[Optional[Dict[int, Any]]] = contextvars.ContextVar(
+    "asana_subscription_sessions", default=None)
+
+
+def watch_key(uri: str, client: Any) -> Tuple[Hashable, ...]:
+    """
+    What has to be polled, and with whose client, to notice changes to uri.
+    Tasks and projects are followed through the Events API, shared by the subscribers
+    using the same client (i.e. the same token). "My tasks" has no event stream, so it is
+    re-read and fingerprinted, per client and URI.
+    """
+    path = uri.partition("?")[0]
+    m = TASK_URI.fullmatch(path)
+    if m:
+        return ("task", m.group(1), client)
+    m = PROJECT_URI.fullmatch(path)
+    if m:
+        return ("project", m.group(1), client)
+    if WORKSPACE_URI.fullmatch(path):
+        return ("snapshot", uri, client)
+    raise ValueError(f"Resource does not support subscriptions: {uri}")
+
+
+class _Watch:
+    def __init__(self, key: Tuple[Hashable, ...], interval: float):
+        self.key = key
+        # Polls run as the subscribers' own user, so nobody is told about changes they can't see.
+        self.client = key[-1]
+        # (id(session), uri) -> (session, uri)
+        self.subscribers: Dict[Tuple[int, str], Tuple[Any, str]] = {}
+        self.sync: Optional[str] = None
+        self.fingerprint: Optional[str] = None
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+
+
+class SubscriptionManager:
+    """
+    Change detection for subscribed resources, pushing notifications/resources/updated.
+
+    Each watched resource has one polling task per client (token), however many sessions
+    of that user subscribe to it.
+    Task and project resources read the Events API since their last sync token, so a
+    quiet poll costs one small request and a notification is only sent for real changes;
+    the subscribers' cached copies are invalidated first, so the re-read they trigger is
+    fresh. Polling slows down while nothing changes (min_interval up to max_interval).
+    Run each connection inside session_scope() so its subscriptions end with it, even if
+    the client goes away without unsubscribing.
+    """
+
+    def __init__(self, read: Reader, min_interval: float = DEFAULT_MIN_INTERVAL,
+                 max_interval: float = DEFAULT_MAX_INTERVAL,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        self.read = read
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._sleep = sleep
+        self._watches: Dict[Tuple[Hashable, ...], _Watch] = {}
+        self.polls = 0
+        self.notifications = 0
+
+    async def subscribe(self, uri: str, session: Any, client: Any) -> None:
+        """
+        Start notifying session about uri. The subscriber's own client checks access first
+        (a project the user can't see fails here), then the resource joins or starts a poller.
+        """
+        key = watch_key(uri, client)
+        baseline = await self._baseline(key, uri, client)
+        watch = self._watches.get(key)
+        if watch is None:
+            watch = self._watches[key] = _Watch(key, self.min_interval)
+            watch.sync, watch.fingerprint = baseline
+            watch.task = asyncio.create_task(self._run(watch))
+        watch.subscribers[(id(session), uri)] = (session, uri)
+        sessions = _scope_sessions.get()
+        if sessions is not None:
+            sessions[id(session)] = session
+
+    def unsubscribe(self, uri: str, session: Any) -> None:
+        for watch in list(self._watches.values()):
+            watch.subscribers.pop((id(session), uri), None)
+            if not watch.subscribers:
+                self._stop(watch)
+
+    def drop_session(self, session: Any) -> None:
+        """Remove every subscription of session (e.g. once it has closed)."""
+        for watch in list(self._watches.values()):
+            for key in [k for k in watch.subscribers if k[0] == id(session)]:
+                del watch.subscribers[key]
+            if not watch.subscribers:
+                self._stop(watch)
+
+    @contextlib.contextmanager
+    def session_scope(self) -> Iterator[None]:
+        """Drop the subscriptions made inside this scope (by any session) when it exits."""
+        sessions: Dict[int, Any] = {}
+        token = _scope_sessions.set(sessions)
+        try:
+            yield
+        finally:
+            _scope_sessions.reset(token)
+            for session in sessions.values():
+                self.drop_session(session)
+
+    def close(self) -> None:
+        for watch in list(self._watches.values()):
+            self._stop(watch)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "watched": len(self._watches),
+            "subscribers": sum(len(w.subscribers) for w in self._watches.values()),
+            "polls": self.polls,
+            "notifications": self.notifications,
+        }
+
+    def _stop(self, watch: _Watch) -> None:
+        self._watches.pop(watch.key, None)
+        if watch.task:
+            watch.task.cancel()
+
+    async def _baseline(self, key: Tuple[Hashable, ...], uri: str,
+                        client: Any) -> Tuple[Optional[str], Optional[str]]:
+        if key[0] == "snapshot":
+            return None, _fingerprint(await self.read(client, uri))
+        # Without a sync token Asana answers with a fresh one (and 403/404 if not visible).
+        response = await client.fetch_events(key[1], None)
+        return response["sync"], None
+
+    # --- polling --------------------------------------------------------
+
+    async def _run(self, watch: _Watch) -> None:
+        while True:
+            await self._sleep(watch.interval)
+            try:
+                changed = await self.poll(watch)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Polling %s for subscribers failed", watch.key[:2])
+                watch.interval = self.max_interval
+                continue
+            if changed:
+                watch.interval = self.min_interval
+                await self._notify(watch)
+            else:
+                watch.interval = min(watch.interval * BACKOFF, self.max_interval)
+
+    async def poll(self, watch: _Watch) -> bool:
+        """Check one watched resource once. Returns True when it changed."""
+        self.polls += 1
+        if not watch.subscribers:
+            return False
+        client = watch.client
+        if watch.key[0] == "snapshot":
+            fingerprint = _fingerprint(await self.read(client, watch.key[1]))
+            changed = fingerprint != watch.fingerprint
+            watch.fingerprint = fingerprint
+            return changed
+
+        kind, gid = watch.key[0], watch.key[1]
+        changed_tasks: Dict[str, None] = {}
+        changed = False
+        while True:
+            response = await client.fetch_events(gid, watch.sync)
+            watch.sync = response["sync"]
+            if response.get("expired"):
+                # Too long since the last poll to replay what happened; assume a change.
+                changed = True
+            for event in response["data"]:
+                changed = True
+                resource = event.get("resource") or {}
+                if resource.get("resource_type") == "task":
+                    changed_tasks[resource["gid"]] = None
+            if not response.get("has_more"):
+                break
+        if changed:
+            if kind == "task":
+                client.client.invalidate_task(gid)
+            else:
+                client.client.invalidate_project(gid)
+                for task_id in changed_tasks:
+                    client.client.invalidate_task(task_id)
+        return changed
+
+    async def _notify(self, watch: _Watch) -> None:
+        for key, (session, uri) in list(watch.subscribers.items()):
+            try:
+                await session.send_resource_updated(uri)
+                self.notifications += 1
+            except Exception:
+                # The session is gone; it can't unsubscribe any more.
+                logger.debug("Dropping subscriber of %s", uri, exc_info=True)
+                watch.subscribers.pop(key, None)
+        if not watch.subscribers:
+            self._stop(watch)
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -0,0 +1,102 @@
+import datetime
+from typing import Any, Dict, Iterable, Optional
+
+# Just what the aggregates need; memberships give the task's section in the project.
+SUMMARY_TASK_FIELDS = "completed,due_on,assignee.name,memberships.project.gid,memberships.section.name"
+DEFAULT_DUE_SOON_DAYS = 7
+UNASSIGNED = "(unassigned)"
+NO_SECTION = "(no section)"
+
+# Due-date buckets of incomplete tasks, in report order.
+DUE_BUCKETS = ("overdue", "due_today", "due_soon", "due_later", "no_due_date")
+
+
+class ProjectSummary:
+    """
+    One-pass aggregates over a project's tasks.
+
+    Holds only counters (per assignee and section), so a project of any size can be
+    summarized while its tasks stream past page by page.
+    """
+
+    def __init__(self, project_id: Optional[str] = None, today: Optional[datetime.date] = None,
+                 due_soon_days: int = DEFAULT_DUE_SOON_DAYS):
+        self.project_id = project_id
+        self.today = today or datetime.date.today()
+        self.due_soon_days = due_soon_days
+        # ISO dates compare correctly as strings, so due_on is never parsed.
+        self._today = self.today.isoformat()
+        self._soon = (self.today + datetime.timedelta(days=due_soon_days)).isoformat()
+        self.total = 0
+        self.completed = 0
+        self.due = dict.fromkeys(DUE_BUCKETS, 0)
+        self.by_assignee: Dict[str, Dict[str, int]] = {}
+        self.by_section: Dict[str, Dict[str, int]] = {}
+
+    def add(self, task: Dict[str, Any]) -> None:
+        self.total += 1
+        completed = bool(task.get("completed"))
+        bucket = None
+        if completed:
+            self.completed += 1
+        else:
+            bucket = self._due_bucket(task.get("due_on"))
+            self.due[bucket] += 1
+        assignee = task.get("assignee") or {}
+        _count(self.by_assignee, assignee.get("name") or assignee.get("gid") or UNASSIGNED, completed, bucket)
+        _count(self.by_section, self._section(task), completed, bucket)
+
+    def add_all(self, tasks: Iterable[Dict[str, Any]]) -> "ProjectSummary":
+        for task in tasks:
+            self.add(task)
+        return self
+
+    def _due_bucket(self, due_on: Optional[str]) -> str:
+        if not due_on:
+            return "no_due_date"
+        if due_on < self._today:
+            return "overdue"
+        if due_on == self._today:
+            return "due_today"
+        if due_on <= self._soon:
+            return "due_soon"
+        return "due_later"
+
+    def _section(self, task: Dict[str, Any]) -> str:
+        for membership in task.get("memberships") or []:
+            project = membership.get("project") or {}
+            section = membership.get("section") or {}
+            if self.project_id is None or project.get("gid") == self.project_id:
+                return section.get("name") or NO_SECTION
+        return NO_SECTION
+
+    def result(self) -> Dict[str, Any]:
+        """The aggregates; groups are ordered by their number of incomplete tasks."""
+        return {
+            "project_id": self.project_id,
+            "as_of": self._today,
+            "due_soon_days": self.due_soon_days,
+            "total": self.total,
+            "completed": self.completed,
+            "incomplete": self.total - self.completed,
+            "incomplete_by_due": self.due,
+            "by_assignee": _ordered(self.by_assignee),
+            "by_section": _ordered(self.by_section),
+        }
+
+
+def _count(groups: Dict[str, Dict[str, int]], key: str, completed: bool, bucket: Optional[str]) -> None:
+    group = groups.get(key)
+    if group is None:
+        group = groups[key] = {"total": 0, "incomplete": 0, "overdue": 0, "due_soon": 0}
+    group["total"] += 1
+    if not completed:
+        group["incomplete"] += 1
+        if bucket == "overdue":
+            group["overdue"] += 1
+        elif bucket in ("due_today", "due_soon"):
+            group["due_soon"] += 1
+
+
+def _ordered(groups: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    return dict(sorted(groups.items(), key=lambda item: (-item[1]["incomplete"], item[0])))
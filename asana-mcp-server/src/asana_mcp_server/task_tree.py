@@ -0,0 +1,124 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .deadline import CallAborted
+
+TREE_TASK_FIELDS = "gid,name,completed,due_on,assignee.name"
+DEFAULT_TREE_DEPTH = 3
+MAX_TREE_DEPTH = 10
+DEFAULT_TREE_MAX_NODES = 200
+MAX_TREE_NODES = 2000
+DEFAULT_TREE_CONCURRENCY = 8
+
+# (task_id, opt_fields) -> the task, or the compact records of its subtasks/dependencies.
+FetchTask = Callable[[str, str], Awaitable[Dict[str, Any]]]
+FetchTasks = Callable[[str, str], Awaitable[List[Dict[str, Any]]]]
+
+
+def tree_fields(fields: str) -> str:
+    """
+    fields plus what the walk itself needs: gid to dedupe, and num_subtasks so leaves
+    are recognized without asking for their (empty) subtask lists.
+    """
+    names = [f for f in fields.split(",") if f]
+    return ",".join(dict.fromkeys(["gid"] + names + ["num_subtasks"]))
+
+
+class TaskTree:
+    """
+    Breadth-first walk of a task's subtasks (and optionally dependencies).
+
+    Each level is fetched concurrently, at most max_concurrency lookups at a time, so
+    the walk costs one round trip per level rather than one per task. A task reached
+    twice (a dependency that is also a subtask, or a cycle) is expanded once; later
+    occurrences are {"gid", "name", "duplicate": true}. The walk stops at max_depth
+    levels below the root or after max_nodes tasks, whichever comes first.
+    """
+
+    def __init__(self, get_task: FetchTask, get_subtasks: FetchTasks,
+                 get_dependencies: Optional[FetchTasks] = None, max_depth: int = DEFAULT_TREE_DEPTH,
+                 max_nodes: int = DEFAULT_TREE_MAX_NODES, max_concurrency: int = DEFAULT_TREE_CONCURRENCY):
+        self.get_task = get_task
+        self.get_subtasks = get_subtasks
+        self.get_dependencies = get_dependencies
+        self.max_depth = max(0, min(max_depth, MAX_TREE_DEPTH))
+        self.max_nodes = max(1, min(max_nodes, MAX_TREE_NODES))
+        self._slots = asyncio.Semaphore(max(1, max_concurrency))
+        self._seen: Dict[str, None] = {}
+        self.requests = 0
+        self.truncated = False
+
+    async def build(self, task_id: str, fields: str = TREE_TASK_FIELDS) -> Dict[str, Any]:
+        fields = tree_fields(fields)
+        if self.max_depth == 0:
+            root = dict(await self._fetch(self.get_task, task_id, fields))
+            self._seen[root["gid"]] = None
+            return self._result(root, 0)
+        # The root's children don't depend on the root itself, so both go out at once.
+        root, children = await asyncio.gather(self._fetch(self.get_task, task_id, fields),
+                                              self._children(task_id, None, fields))
+        root = dict(root)
+        self._seen[root["gid"]] = None
+        expanded: List[Tuple[Dict[str, Any], Any]] = [(root, children)]
+        depth = 0
+        while expanded:
+            depth += 1
+            level: List[Dict[str, Any]] = []
+            for node, children in expanded:
+                self._attach(node, children, level)
+            if depth >= self.max_depth or not level:
+                break
+            results = await asyncio.gather(*(self._children(n["gid"], n.get("num_subtasks"), fields) for n in level))
+            expanded = list(zip(level, results))
+        return self._result(root, depth)
+
+    def _result(self, root: Dict[str, Any], depth: int) -> Dict[str, Any]:
+        return {"root": root, "nodes": len(self._seen), "depth": depth,
+                "requests": self.requests, "truncated": self.truncated}
+
+    async def _fetch(self, fetch: Callable[[str, str], Awaitable[Any]], task_id: str, fields: str) -> Any:
+        async with self._slots:
+            self.requests += 1
+            return await fetch(task_id, fields)
+
+    async def _children(self, task_id: str, num_subtasks: Optional[int], fields: str) -> Any:
+        """(subtasks, dependencies) of one task; a failed lookup is reported on the node instead."""
+        try:
+            return await asyncio.gather(
+                self._fetch(self.get_subtasks, task_id, fields) if num_subtasks != 0 else _value([]),
+                self._fetch(self.get_dependencies, task_id, fields) if self.get_dependencies else _value(None),
+            )
+        except CallAborted:
+            raise
+        except Exception as e:
+            return e
+
+    def _attach(self, node: Dict[str, Any], children: Any, level: List[Dict[str, Any]]) -> None:
+        if isinstance(children, Exception):
+            node["error"] = str(children)
+            return
+        subtasks, dependencies = children
+        node["subtasks"] = self._adopt(node, "subtasks", subtasks, level)
+        if dependencies is not None:
+            node["dependencies"] = self._adopt(node, "dependencies", dependencies, level)
+
+    def _adopt(self, node: Dict[str, Any], relation: str, records: List[Dict[str, Any]],
+               level: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        adopted = []
+        for record in records:
+            gid = record.get("gid")
+            if gid in self._seen:
+                adopted.append({"gid": gid, "name": record.get("name"), "duplicate": True})
+            elif len(self._seen) >= self.max_nodes:
+                self.truncated = True
+                node[f"{relation}_omitted"] = node.get(f"{relation}_omitted", 0) + 1
+            else:
+                self._seen[gid] = None
+                child = dict(record)
+                adopted.append(child)
+                level.append(child)
+        return adopted
+
+
+async def _value(value: Any) -> Any:
+    return value
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from asana_mcp_server.async_client import AsyncAsanaClient, default_max_workers
+
+
+class TestAsyncAsanaClient(unittest.IsolatedAsyncioTestCase):
+    async def test_calls_overlap_on_worker_pool(self):
+        sync_client = MagicMock()
+
+        def slow_get_task(task_id, opt_fields=None):
+            time.sleep(0.2)
+            return {"gid": task_id, "thread": threading.current_thread().name}
+
+        sync_client.get_task.side_effect = slow_get_task
+        client = AsyncAsanaClient(sync_client, max_workers=4)
+
+        start = time.perf_counter()
+        tasks = await asyncio.gather(*(client.get_task(str(i)) for i in range(4)))
+        elapsed = time.perf_counter() - start
+        client.shutdown()
+
+        self.assertEqual([t["gid"] for t in tasks], ["0", "1", "2", "3"])
+        self.assertLess(elapsed, 0.6)
+        self.assertTrue(all(t["thread"].startswith("asana") for t in tasks))
+
+    async def test_event_loop_stays_responsive(self):
+        sync_client = MagicMock()
+        sync_client.get_project_tasks.side_effect = lambda project_id, opt_fields=None: time.sleep(0.2) or []
+        client = AsyncAsanaClient(sync_client, max_workers=1)
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker_task = asyncio.create_task(ticker())
+        await client.get_project_tasks("p1")
+        ticker_task.cancel()
+        client.shutdown()
+
+        self.assertGreater(ticks, 5)
+
+    async def test_passes_arguments_through(self):
+        sync_client = MagicMock()
+        client = AsyncAsanaClient(sync_client, max_workers=1)
+        await client.create_task("Task", project_id="p1", notes="n")
+        client.shutdown()
+        sync_client.create_task.assert_called_with("Task", project_id="p1", workspace_id=None, due_on=None, notes="n")
+
+
+class TestBatchOperations(unittest.IsolatedAsyncioTestCase):
+    def make_client(self, batch):
+        from asana_mcp_server.cache import TTLCache
+        sync_client = MagicMock()
+        sync_client.cache = TTLCache()
+        sync_client.batch.side_effect = batch
+        return sync_client, AsyncAsanaClient(sync_client, max_workers=4)
+
+    async def test_chunks_of_ten_run_concurrently(self):
+        def batch(actions):
+            time.sleep(0.2)
+            return [{"ok": True, "data": {"gid": a["relative_path"].split("/")[-1]}} for a in actions]
+
+        sync_client, client = self.make_client(batch)
+        start = time.perf_counter()
+        results = await client.get_tasks([str(i) for i in range(35)])
+        elapsed = time.perf_counter() - start
+        client.shutdown()
+
+        self.assertEqual(sync_client.batch.call_count, 4)
+        self.assertTrue(all(len(c[0][0]) <= 10 for c in sync_client.batch.call_args_list))
+        self.assertEqual([r["task_id"] for r in results], [str(i) for i in range(35)])
+        self.assertEqual(results[34]["data"], {"gid": "34"})
+        self.assertLess(elapsed, 0.6)
+
+    async def test_failed_chunk_reports_each_item(self):
+        def batch(actions):
+            if actions[0]["relative_path"] == "/tasks/0":
+                raise RuntimeError("boom")
+            return [{"ok": True, "data": {}} for _ in actions]
+
+        _, client = self.make_client(batch)
+        results = await client.bulk_update_tasks([{"task_id": str(i), "completed": True} for i in range(12)])
+        client.shutdown()
+
+        self.assertEqual([r["ok"] for r in results], [False] * 10 + [True] * 2)
+        self.assertEqual(results[0]["error"], "boom")
+
+    async def test_get_tasks_skips_cached(self):
+        from asana_mcp_server.client import TASK_FIELDS
+        sync_client, client = self.make_client(lambda actions: [{"ok": True, "data": {}} for _ in actions])
+        sync_client.cache.set(("task", "cached", TASK_FIELDS), {"gid": "cached"})
+        results = await client.get_tasks(["cached", "fresh"])
+        client.shutdown()
+
+        actions = sync_client.batch.call_args[0][0]
+        self.assertEqual([a["relative_path"] for a in actions], ["/tasks/fresh"])
+        self.assertEqual(results[0]["data"], {"gid": "cached"})
+
+
+class TestMaxWorkers(unittest.TestCase):
+    def test_env_override(self):
+        with patch.dict(os.environ, {"ASANA_MAX_WORKERS": "7"}):
+            self.assertEqual(default_max_workers(), 7)
+            self.assertEqual(AsyncAsanaClient(MagicMock()).max_workers, 7)
+
+    def test_rejects_non_positive(self):
+        with patch.dict(os.environ, {"ASANA_MAX_WORKERS": "0"}):
+            with self.assertRaises(ValueError):
+                default_max_workers()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import io
+import os
+import sys
+import time
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+import asana_mcp_server.server as server_module
+from asana_mcp_server.client import AsanaClient
+from asana_mcp_server.scheduler import RequestScheduler
+from fake_asana import FakeAsana
+import run as bench_run
+
+
+class TestFakeAsana(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeAsana(projects=2, tasks_per_project=120, rate_limit_every=3)
+        url = self.fake.start()
+        self.addCleanup(self.fake.stop)
+        self.client = AsanaClient(access_token="bench", host=url,
+                                  scheduler=RequestScheduler(rate=0, max_retries=5, backoff_base=0))
+
+    def test_client_retries_a_listing_rate_limited_mid_way(self):
+        self.client.get_task(next(iter(self.fake.tasks)))
+        project_id = next(iter(self.fake.projects))
+        tasks = self.client.get_project_tasks(project_id)
+        # The second page is answered with 429; only that page is retried.
+        self.assertEqual(len(tasks), 120)
+        self.assertEqual(self.fake.requests["GET /tasks"], 3)
+
+    def test_opt_fields_are_projected(self):
+        task_id = next(iter(self.fake.tasks))
+        task = self.client.get_task(task_id, opt_fields="name")
+        self.assertEqual(set(task), {"gid", "name"})
+
+    def test_responses_are_not_held_back(self):
+        # A response stalled by Nagle's algorithm waits ~40 ms for the client's delayed ACK.
+        self.fake.rate_limit_every = 0
+        task_ids = list(self.fake.tasks)[:11]
+        self.client.get_task(task_ids[0])
+        start = time.perf_counter()
+        for task_id in task_ids[1:]:
+            self.client.get_task(task_id)
+        self.assertLess(time.perf_counter() - start, 0.3)
+
+
+class TestHarness(unittest.TestCase):
+    def setUp(self):
+        saved = (server_module.asana_client, server_module.async_client)
+        self.addCleanup(lambda: setattr(server_module, "asana_client", saved[0]))
+        self.addCleanup(lambda: setattr(server_module, "async_client", saved[1]))
+
+    def test_runs_every_scenario_and_compares_against_a_baseline(self):
+        args = bench_run.parse_args(["--projects", "1", "--tasks-per-project", "150", "--latency", "0",
+                                     "--jitter", "0", "--concurrency", "1,2", "--calls", "4", "--no-memory"])
+        with redirect_stdout(io.StringIO()):
+            results = bench_run.asyncio.run(bench_run.run(args))
+        for name in bench_run.SCENARIOS:
+            self.assertIn(f"{name}@2", results)
+            self.assertGreater(results[f"{name}@1"]["bytes_per_response"], 0)
+        self.assertEqual(bench_run.compare(results, results, 0.2), [])
+        slower = {"get_tasks@1": dict(results["get_tasks@1"], p99_ms=results["get_tasks@1"]["p99_ms"] / 2)}
+        self.assertEqual(len(bench_run.compare(results, slower, 0.2)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
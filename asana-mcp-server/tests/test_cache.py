@@ -0,0 +1,91 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from asana_mcp_server.cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_hit_and_miss_counters(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["size"], 1)
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        with patch('asana_mcp_server.cache.time.monotonic', return_value=100.0):
+            cache.set("a", 1)
+        with patch('asana_mcp_server.cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_get_or_load_only_loads_on_miss(self):
+        cache = TTLCache()
+        calls = []
+        loader = lambda: calls.append(1) or "value"
+        self.assertEqual(cache.get_or_load("k", loader), "value")
+        self.assertEqual(cache.get_or_load("k", loader), "value")
+        self.assertEqual(len(calls), 1)
+
+    def test_load_invalidated_while_running_is_not_stored(self):
+        cache = TTLCache()
+        cache.get_or_load("k", lambda: cache.invalidate(lambda key: key == "k") or "stale")
+        cache.get_or_load("j", lambda: cache.update(lambda key: key == "j", lambda v: v) or "stale")
+        self.assertIsNone(cache.get("k"))
+        self.assertIsNone(cache.get("j"))
+        self.assertEqual(cache.get_or_load("k", lambda: "fresh"), "fresh")
+        self.assertEqual(cache.get("k"), "fresh")
+
+    def test_overlapping_loads_only_store_the_one_started_after_invalidation(self):
+        cache = TTLCache()
+        started, release = threading.Event(), threading.Event()
+
+        def slow_load():
+            started.set()
+            release.wait(5)
+            return "old"
+
+        thread = threading.Thread(target=cache.get_or_load, args=("k", slow_load))
+        thread.start()
+        started.wait(5)
+        cache.invalidate(lambda key: key == "k")
+        self.assertEqual(cache.get_or_load("k", lambda: "new"), "new")
+        release.set()
+        thread.join(5)
+        self.assertEqual(cache.get("k"), "new")
+
+    def test_update_patches_or_drops(self):
+        cache = TTLCache()
+        cache.set(("task", "1"), {"completed": False})
+        cache.set(("task", "2"), {"completed": False})
+        cache.update(lambda k: k[1] == "1", lambda v: dict(v, completed=True))
+        cache.update(lambda k: k[1] == "2", lambda v: None)
+
+        self.assertEqual(cache.get(("task", "1")), {"completed": True})
+        self.assertIsNone(cache.get(("task", "2")))
+
+    def test_zero_maxsize_disables(self):
+        cache = TTLCache(maxsize=0)
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
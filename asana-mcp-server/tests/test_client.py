@@ -1,7 +1,8 @@
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 import os
-from asana_mcp_server.client import AsanaClient
+from asana_mcp_server.client import TASK_FIELDS, AsanaClient
 
 class TestAsanaClient(unittest.TestCase):
     def setUp(self):
@@ -12,6 +13,7 @@ class TestAsanaClient(unittest.TestCase):
         self.mock_tasks_api = patch('asana.TasksApi').start()
         self.mock_projects_api = patch('asana.ProjectsApi').start()
         self.mock_workspaces_api = patch('asana.WorkspacesApi').start()
+        self.mock_typeahead_api = patch('asana.TypeaheadApi').start()
 
     def tearDown(self):
         patch.stopall()
@@ -23,6 +25,16 @@ class TestAsanaClient(unittest.TestCase):
         with self.assertRaises(ValueError):
             AsanaClient()
 
+    def test_sdk_objects_are_built_on_first_use(self):
+        client = AsanaClient()
+        self.mock_asana_api_client.assert_not_called()
+        self.mock_tasks_api.assert_not_called()
+        client.users_api.get_user.return_value = {"gid": "user1"}
+        client.get_me()
+        self.mock_asana_api_client.assert_called_once()
+        self.mock_users_api.assert_called_once_with(client.api_client)
+        self.mock_tasks_api.assert_not_called()
+
     def test_get_me(self):
         client = AsanaClient()
         client.users_api.get_user.return_value = {"gid": "user1"}
@@ -32,7 +44,7 @@ class TestAsanaClient(unittest.TestCase):
 
     def test_get_my_tasks_with_workspace(self):
         client = AsanaClient()
-        client.tasks_api.get_tasks.return_value = [{"gid": "task1"}]
+        client.tasks_api.get_tasks.return_value = {"data": [{"gid": "task1"}]}
         tasks = client.get_my_tasks(workspace_id="ws1")
 
         call_kwargs = client.tasks_api.get_tasks.call_args[0][0]
@@ -43,7 +55,7 @@ class TestAsanaClient(unittest.TestCase):
         client = AsanaClient()
         # Mock get_me to return a workspace
         client.users_api.get_user.return_value = {'workspaces': [{'gid': 'ws_default'}]}
-        client.tasks_api.get_tasks.return_value = [{"gid": "task1"}]
+        client.tasks_api.get_tasks.return_value = {"data": [{"gid": "task1"}]}
 
         tasks = client.get_my_tasks()
 
@@ -51,6 +63,45 @@ class TestAsanaClient(unittest.TestCase):
         call_kwargs = client.tasks_api.get_tasks.call_args[0][0]
         self.assertEqual(call_kwargs['workspace'], "ws_default")
 
+    def test_get_my_tasks_stops_at_limit(self):
+        client = AsanaClient()
+        client.tasks_api.get_tasks.return_value = {"data": []}
+        client.get_my_tasks(workspace_id="ws1", limit=20)
+        self.assertEqual(client.tasks_api.get_tasks.call_args[0][0]['limit'], 20)
+
+    def test_get_my_tasks_requests_no_page_past_the_limit(self):
+        client = AsanaClient()
+        client.tasks_api.get_tasks.return_value = {"data": [{"gid": "t1"}, {"gid": "t2"}],
+                                                    "next_page": {"offset": "tok"}}
+        self.assertEqual(len(client.get_my_tasks(workspace_id="ws1", limit=2)), 2)
+        client.tasks_api.get_tasks.assert_called_once()
+
+    def test_get_project_tasks_page(self):
+        client = AsanaClient()
+        client.tasks_api.get_tasks.return_value = {
+            "data": [{"gid": "t1"}],
+            "next_page": {"offset": "tok", "path": "/tasks?offset=tok"},
+        }
+        page = client.get_project_tasks_page("p1", limit=500, offset="prev")
+
+        opts = client.tasks_api.get_tasks.call_args[0][0]
+        self.assertEqual(opts['limit'], 100)
+        self.assertEqual(opts['offset'], "prev")
+        self.assertEqual(client.tasks_api.get_tasks.call_args[1], {"full_payload": True})
+        self.assertEqual(page, {"data": [{"gid": "t1"}], "next_page": "tok"})
+
+    def test_iter_project_tasks_fetches_lazily(self):
+        client = AsanaClient()
+        client.tasks_api.get_tasks.side_effect = [
+            {"data": [{"gid": "t1"}, {"gid": "t2"}], "next_page": {"offset": "tok"}},
+            {"data": [{"gid": "t3"}], "next_page": None},
+        ]
+        tasks = client.iter_project_tasks("p1", page_size=2)
+        self.assertEqual(next(tasks), {"gid": "t1"})
+        self.assertEqual(client.tasks_api.get_tasks.call_count, 1)
+        self.assertEqual([t["gid"] for t in tasks], ["t2", "t3"])
+        self.assertEqual(client.tasks_api.get_tasks.call_count, 2)
+
     def test_create_task(self):
         client = AsanaClient()
         client.create_task("Test Task", workspace_id="ws1")
@@ -61,5 +112,128 @@ class TestAsanaClient(unittest.TestCase):
         self.assertEqual(body['data']['name'], "Test Task")
         self.assertEqual(body['data']['workspace'], "ws1")
 
+    def test_default_workspace_is_resolved_once(self):
+        client = AsanaClient()
+        client.users_api.get_user.return_value = {'workspaces': [{'gid': 'ws_default'}]}
+        client.tasks_api.get_tasks.return_value = {"data": []}
+
+        client.get_my_tasks()
+        client.search_tasks("query")
+        client.create_task("Test Task")
+
+        client.users_api.get_user.assert_called_once()
+        self.assertEqual(client.tasks_api.create_task.call_args[0][0]['data']['workspace'], "ws_default")
+
+    def test_identity_cache_expires_and_invalidates(self):
+        client = AsanaClient(identity_ttl=60)
+        client.workspaces_api.get_workspaces.return_value = {"data": [{"gid": "ws1", "name": "WS"}]}
+
+        with patch('asana_mcp_server.client.time.monotonic', return_value=1000.0):
+            client.get_workspaces()
+            client.get_workspaces()
+        self.assertEqual(client.workspaces_api.get_workspaces.call_count, 1)
+
+        with patch('asana_mcp_server.client.time.monotonic', return_value=1061.0):
+            client.get_workspaces()
+        self.assertEqual(client.workspaces_api.get_workspaces.call_count, 2)
+
+        client.invalidate_identity_cache()
+        client.get_workspaces()
+        self.assertEqual(client.workspaces_api.get_workspaces.call_count, 3)
+
+    def test_get_task_is_cached(self):
+        client = AsanaClient()
+        client.tasks_api.get_task.return_value = {"gid": "t1", "name": "Task", "completed": False}
+        client.get_task("t1")
+        client.get_task("t1")
+        client.tasks_api.get_task.assert_called_once()
+        self.assertEqual(client.cache_stats()["hits"], 1)
+
+    def test_opt_fields_are_requested_and_cached_separately(self):
+        client = AsanaClient()
+        client.tasks_api.get_task.return_value = {"gid": "t1", "name": "Task"}
+        client.get_task("t1", opt_fields="name")
+        client.get_task("t1", opt_fields=["name"])
+        client.get_task("t1")
+
+        calls = client.tasks_api.get_task.call_args_list
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0].kwargs["opts"], {'opt_fields': "gid,name"})
+        self.assertEqual(calls[1].kwargs["opts"], {'opt_fields': TASK_FIELDS})
+
+    def test_update_task_patches_cached_entries(self):
+        client = AsanaClient()
+        client.tasks_api.get_task.return_value = {"gid": "t1", "name": "Task", "completed": False}
+        client.tasks_api.get_tasks.return_value = {"data": [{"gid": "t1", "name": "Task", "completed": False}]}
+        client.get_task("t1")
+        client.get_project_tasks("p1")
+
+        client.mark_task_complete("t1")
+
+        self.assertTrue(client.get_task("t1")["completed"])
+        self.assertTrue(client.get_project_tasks("p1")[0]["completed"])
+        client.tasks_api.get_task.assert_called_once()
+
+    def test_read_running_during_our_write_is_not_cached(self):
+        client = AsanaClient()
+        in_sdk, release = threading.Event(), threading.Event()
+
+        def slow_get_task(task_id, opts):
+            in_sdk.set()
+            release.wait(5)
+            return {"gid": task_id, "name": "old"}
+
+        client.tasks_api.get_task.side_effect = slow_get_task
+        reader = threading.Thread(target=client.get_task, args=("t1",))
+        reader.start()
+        in_sdk.wait(5)
+        client.update_task("t1", {"name": "new"})
+        release.set()
+        reader.join(5)
+
+        client.tasks_api.get_task.side_effect = None
+        client.tasks_api.get_task.return_value = {"gid": "t1", "name": "new"}
+        self.assertEqual(client.get_task("t1")["name"], "new")
+
+    def test_update_task_drops_entries_it_cannot_patch(self):
+        client = AsanaClient()
+        client.tasks_api.get_task.return_value = {"gid": "t1", "assignee": {"name": "Alice"}}
+        client.get_task("t1")
+        client.update_task("t1", {"assignee": "u2"})
+        client.get_task("t1")
+        self.assertEqual(client.tasks_api.get_task.call_count, 2)
+
+    def test_create_task_invalidates_project_list(self):
+        client = AsanaClient()
+        client.tasks_api.get_tasks.return_value = {"data": []}
+        client.get_project_tasks("p1")
+        client.create_task("New", project_id="p1")
+        client.get_project_tasks("p1")
+        self.assertEqual(client.tasks_api.get_tasks.call_count, 2)
+
+    def test_batch_normalizes_outcomes_and_fills_cache(self):
+        from asana_mcp_server.client import get_task_action
+        client = AsanaClient()
+        client.batch_api = MagicMock()
+        client.batch_api.create_batch_request.return_value = {"data": [
+            {"status_code": 200, "body": {"data": {"gid": "t1"}}},
+            {"status_code": 404, "body": {"errors": [{"message": "task: Unknown object"}]}},
+        ]}
+
+        outcomes = client.batch([get_task_action("t1"), get_task_action("t2")])
+
+        self.assertEqual(outcomes[0], {"ok": True, "data": {"gid": "t1"}})
+        self.assertEqual(outcomes[1], {"ok": False, "status": 404, "error": "task: Unknown object"})
+        body = client.batch_api.create_batch_request.call_args[0][0]
+        self.assertEqual(body["data"]["actions"][0]["relative_path"], "/tasks/t1")
+        self.assertEqual(client.get_task("t1"), {"gid": "t1"})
+        client.tasks_api.get_task.assert_not_called()
+
+    def test_batch_rejects_oversized_chunks(self):
+        from asana_mcp_server.client import get_task_action
+        client = AsanaClient()
+        with self.assertRaises(ValueError):
+            client.batch([get_task_action(str(i)) for i in range(11)])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,98 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+import asana_mcp_server.server as server_module
+from asana_mcp_server.client_pool import ClientPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestClientPool(unittest.TestCase):
+    def test_builds_one_client_per_key(self):
+        built = []
+        pool = ClientPool(lambda key: built.append(key) or f"client-{key}", maxsize=4)
+        self.assertEqual(pool.get("alice"), "client-alice")
+        self.assertEqual(pool.get("alice"), "client-alice")
+        self.assertEqual(pool.get("bob"), "client-bob")
+        self.assertEqual(built, ["alice", "bob"])
+        self.assertEqual(pool.stats()["hits"], 1)
+        self.assertEqual(pool.stats()["misses"], 2)
+
+    def test_lru_eviction(self):
+        evicted = []
+        pool = ClientPool(lambda key: key, maxsize=2, on_evict=evicted.append)
+        pool.get("a")
+        pool.get("b")
+        pool.get("a")  # "b" is now least recently used
+        pool.get("c")
+
+        self.assertEqual(evicted, ["b"])
+        self.assertIn("a", pool)
+        self.assertNotIn("b", pool)
+        self.assertEqual(pool.stats()["evictions"], 1)
+
+    def test_idle_clients_are_evicted(self):
+        clock = FakeClock()
+        evicted = []
+        pool = ClientPool(lambda key: key, idle_ttl=60, on_evict=evicted.append, clock=clock)
+        pool.get("a")
+        clock.now = 30
+        pool.get("b")
+        clock.now = 70
+        pool.get("b")  # "a" has been idle for 70s
+
+        self.assertEqual(evicted, ["a"])
+        self.assertEqual(len(pool), 1)
+        clock.now = 200
+        self.assertEqual(pool.evict_idle(), 1)
+        self.assertEqual(pool.stats()["expirations"], 2)
+
+    def test_clear_evicts_everything(self):
+        evicted = []
+        pool = ClientPool(lambda key: key, on_evict=evicted.append)
+        pool.get("a")
+        pool.get("b")
+        pool.clear()
+        self.assertEqual(sorted(evicted), ["a", "b"])
+        self.assertEqual(len(pool), 0)
+
+
+class TestServerClientPool(unittest.TestCase):
+    def setUp(self):
+        os.environ["ASANA_ACCESS_TOKEN"] = "server_token"
+        os.environ["ASANA_CLIENT_POOL_SIZE"] = "2"
+        patch('asana.ApiClient', side_effect=lambda *a, **k: MagicMock()).start()
+        for name, value in (("asana_client", None), ("async_client", None), ("client_pool", None),
+                            ("pool_client", None), ("worker_pool", None)):
+            patch.object(server_module, name, value).start()
+
+    def tearDown(self):
+        patch.stopall()
+        del os.environ["ASANA_ACCESS_TOKEN"]
+        del os.environ["ASANA_CLIENT_POOL_SIZE"]
+
+    def client_for(self, token):
+        with patch.object(server_module, "request_token", return_value=token):
+            return server_module.get_async_client()
+
+    def test_user_clients_are_pooled_and_evicted(self):
+        default = self.client_for(None)
+        alice = self.client_for("alice")
+        self.client_for("bob")
+        self.client_for("carol")  # alice is evicted
+
+        self.assertIsNot(self.client_for("alice"), alice)
+        self.assertIs(self.client_for("server_token"), default)
+        self.assertEqual(server_module.client_pool.stats()["evictions"], 2)
+        self.assertEqual(len(server_module.client_pool), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from asana_mcp_server.deadline import (
+    CallCancelled,
+    Deadline,
+    DeadlineExceeded,
+    current_deadline,
+    deadline_scope,
+    request_timeout,
+    tool_timeouts_from_env,
+)
+from asana_mcp_server.scheduler import RequestScheduler
+
+
+class FakeApiException(Exception):
+    def __init__(self, status, retry_after=None):
+        self.status = status
+        self.headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+
+
+class TestDeadline(unittest.TestCase):
+    def test_expires_after_timeout(self):
+        now = [0.0]
+        deadline = Deadline(2, clock=lambda: now[0])
+        deadline.check()
+        now[0] = 2.0
+        with self.assertRaises(DeadlineExceeded):
+            deadline.check()
+
+    def test_sleep_past_the_deadline_fails_at_once(self):
+        deadline = Deadline(1)
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            deadline.sleep(30)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_cancel_wakes_a_sleeping_thread(self):
+        deadline = Deadline()
+        threading.Timer(0.05, deadline.cancel).start()
+        start = time.monotonic()
+        with self.assertRaises(CallCancelled):
+            deadline.sleep(30)
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_request_timeout_follows_the_current_deadline(self):
+        self.assertIsNone(request_timeout())
+        with deadline_scope(Deadline(10)):
+            connect, read = request_timeout()
+            self.assertTrue(0 < read <= 10)
+        with deadline_scope(Deadline(None)):
+            self.assertIsNone(request_timeout())
+
+    def test_timeouts_from_env(self):
+        with patch.dict(os.environ, {"ASANA_TOOL_TIMEOUT": "30", "ASANA_TOOL_TIMEOUTS": "get_task_tree=5, search_tasks=0"}):
+            timeouts = tool_timeouts_from_env()
+        self.assertEqual(timeouts.for_tool("get_task_details"), 30)
+        self.assertEqual(timeouts.for_tool("get_task_tree"), 5)
+        self.assertIsNone(timeouts.for_tool("search_tasks"))
+        self.assertEqual(timeouts.for_tool("summarize_project"), 300)
+
+
+class TestSchedulerDeadlines(unittest.TestCase):
+    def test_cancelled_call_sends_nothing(self):
+        scheduler = RequestScheduler(rate=0)
+        func = MagicMock(return_value="ok")
+        deadline = Deadline()
+        deadline.cancel()
+        with deadline_scope(deadline), self.assertRaises(CallCancelled):
+            scheduler.run(None, func)
+        func.assert_not_called()
+
+    def test_retry_that_would_outlast_the_deadline_is_not_waited_for(self):
+        scheduler = RequestScheduler(rate=0)
+        func = MagicMock(side_effect=[FakeApiException(429, retry_after=30), "ok"])
+        start = time.monotonic()
+        with deadline_scope(Deadline(1)), self.assertRaises(DeadlineExceeded):
+            scheduler.run(None, func)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(func.call_count, 1)
+
+    def test_waiting_for_a_slot_gives_up_with_the_deadline(self):
+        scheduler = RequestScheduler(rate=0, max_in_flight=1)
+        release = threading.Event()
+        busy = threading.Thread(target=scheduler.run, args=(None, release.wait))
+        busy.start()
+        try:
+            with deadline_scope(Deadline(0.1)), self.assertRaises(DeadlineExceeded):
+                scheduler.run(None, MagicMock())
+        finally:
+            release.set()
+            busy.join()
+
+    def test_followers_rerun_when_the_leader_is_aborted(self):
+        scheduler = RequestScheduler(rate=0)
+        follower_waiting = threading.Event()
+        results = []
+
+        def leader_call():
+            follower_waiting.wait(5)
+            time.sleep(0.05)
+            raise DeadlineExceeded(1)
+
+        def follower():
+            follower_waiting.set()
+            results.append(scheduler.run("key", lambda: "fresh"))
+
+        def leader():
+            with deadline_scope(Deadline(10)):
+                try:
+                    scheduler.run("key", leader_call)
+                except DeadlineExceeded:
+                    results.append("leader aborted")
+
+        threads = [threading.Thread(target=leader)]
+        threads[0].start()
+        time.sleep(0.02)
+        threads.append(threading.Thread(target=follower))
+        threads[1].start()
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(sorted(results), ["fresh", "leader aborted"])
+        self.assertEqual(scheduler.stats()["coalesced"], 1)
+
+
+class TestClientDeadlines(unittest.TestCase):
+    def test_http_requests_get_the_remaining_time_as_timeout(self):
+        from asana_mcp_server.client import AsanaClient
+
+        with patch('asana.ApiClient') as api_client_class:
+            request = api_client_class.return_value.request
+            client = AsanaClient(access_token="token")
+            with deadline_scope(Deadline(10)):
+                client.api_client.request("GET", "https://example/tasks")
+            client.api_client.request("GET", "https://example/tasks")
+
+        timeouts = [c.kwargs["_request_timeout"] for c in request.call_args_list]
+        self.assertTrue(0 < timeouts[0][1] <= 10)
+        self.assertIsNone(timeouts[1])
+
+    def test_async_client_carries_the_deadline_to_worker_threads(self):
+        from asana_mcp_server.async_client import AsyncAsanaClient
+
+        client = AsyncAsanaClient(MagicMock(), max_workers=1)
+        self.addCleanup(client.shutdown)
+
+        async def call():
+            with deadline_scope(Deadline(5)) as deadline:
+                return deadline, await client.run(current_deadline)
+
+        deadline, seen = asyncio.run(call())
+        self.assertIs(seen, deadline)
+
+
+class TestServerDeadlines(unittest.IsolatedAsyncioTestCase):
+    async def call(self, mock_client, name, arguments, env):
+        from mcp import types
+        import asana_mcp_server.server as server_module
+
+        with patch.dict(os.environ, env), \
+                patch.object(server_module, 'get_async_client', return_value=mock_client):
+            server = server_module.create_server()
+            handler = server.request_handlers[types.CallToolRequest]
+            request = types.CallToolRequest(
+                method="tools/call", params=types.CallToolRequestParams(name=name, arguments=arguments))
+            return await handler(request)
+
+    async def test_slow_tool_returns_a_structured_timeout(self):
+        seen = {}
+
+        async def slow_get_task(task_id, opt_fields=None):
+            seen["deadline"] = current_deadline()
+            await asyncio.sleep(5)
+
+        mock_client = MagicMock()
+        mock_client.get_task = AsyncMock(side_effect=slow_get_task)
+        result = await self.call(mock_client, "get_task_details", {"task_id": "t1"},
+                                 {"ASANA_TOOL_TIMEOUTS": "get_task_details=0.05"})
+
+        self.assertTrue(result.root.isError)
+        self.assertEqual(result.root.structuredContent["error"], "timeout")
+        self.assertEqual(result.root.structuredContent["timeout_seconds"], 0.05)
+        # Worker threads still running for the call see it as over.
+        self.assertTrue(seen["deadline"].cancelled)
+
+    async def test_calls_within_the_deadline_are_unchanged(self):
+        mock_client = MagicMock()
+        mock_client.get_task = AsyncMock(return_value={"gid": "t1"})
+        result = await self.call(mock_client, "get_task_details", {"task_id": "t1"}, {})
+
+        self.assertFalse(result.root.isError)
+        self.assertEqual(json.loads(result.root.content[0].text), {"gid": "t1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+from asana_mcp_server import encoding
+from asana_mcp_server.encoding import encode
+
+
+TASKS = [
+    {"gid": "1", "name": "Write\tdocs", "completed": False, "assignee": {"gid": "u1", "name": "Aiko"},
+     "projects": [{"gid": "p1", "name": "Roadmap"}, {"gid": "p2", "name": "Docs"}]},
+    {"gid": "2", "name": "締め切り", "completed": True, "assignee": None, "projects": []},
+]
+
+
+class TestEncode(unittest.TestCase):
+    def test_json_is_compact_and_keeps_unicode(self):
+        text = encode(TASKS, "json")
+        self.assertEqual(json.loads(text), TASKS)
+        self.assertNotIn("\n", text)
+        self.assertIn("締め切り", text)
+        self.assertLess(len(text), len(encode(TASKS, "pretty")))
+
+    def test_json_without_orjson(self):
+        with patch.object(encoding, "orjson", None):
+            self.assertEqual(json.loads(encode(TASKS, "json")), TASKS)
+
+    def test_ndjson_writes_one_record_per_line(self):
+        lines = encode({"data": TASKS, "next_page": "abc"}, "ndjson").split("\n")
+        self.assertEqual([json.loads(line) for line in lines], TASKS + [{"next_page": "abc"}])
+
+    def test_table_flattens_related_objects(self):
+        text = encode({"data": TASKS, "next_page": None}, "table")
+        self.assertEqual(text.split("\n"), [
+            "gid\tname\tcompleted\tassignee\tprojects",
+            "1\tWrite\\tdocs\tfalse\tAiko\tRoadmap, Docs",
+            "2\t締め切り\ttrue\t\t",
+            "next_page: ",
+        ])
+
+    def test_non_lists_fall_back_to_json(self):
+        self.assertEqual(json.loads(encode({"gid": "1"}, "table")), {"gid": "1"})
+
+    def test_default_format_comes_from_environment(self):
+        with patch.dict(os.environ, {"ASANA_OUTPUT_FORMAT": "pretty"}):
+            self.assertIn("\n  ", encode({"gid": "1"}))
+        with patch.dict(os.environ, {"ASANA_OUTPUT_FORMAT": "yaml"}):
+            with self.assertRaises(ValueError):
+                encode({"gid": "1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import unittest
+import warnings
+from unittest.mock import AsyncMock, MagicMock, patch
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    from starlette.testclient import TestClient
+
+import asana_mcp_server.server as server_module
+from asana_mcp_server.http_app import create_http_app
+
+HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+INITIALIZE = {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+    "protocolVersion": "2025-03-26", "capabilities": {}, "clientInfo": {"name": "test", "version": "0"}}}
+
+
+class TestHttpApp(unittest.TestCase):
+    def setUp(self):
+        os.environ.pop("ASANA_ACCESS_TOKEN", None)
+
+    def open_session(self, http, token):
+        headers = dict(HEADERS, Authorization=f"Bearer {token}")
+        response = http.post("/mcp", json=INITIALIZE, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        headers["mcp-session-id"] = response.headers["mcp-session-id"]
+        http.post("/mcp", json={"jsonrpc": "2.0", "method": "notifications/initialized"}, headers=headers)
+        return headers
+
+    def test_rejects_requests_without_a_token(self):
+        with TestClient(create_http_app(json_response=True)) as http:
+            response = http.post("/mcp", json=INITIALIZE, headers=HEADERS)
+        self.assertEqual(response.status_code, 401)
+
+    def test_server_token_is_only_used_when_allowed(self):
+        os.environ["ASANA_ACCESS_TOKEN"] = "server_token"
+        self.addCleanup(os.environ.pop, "ASANA_ACCESS_TOKEN")
+        with TestClient(create_http_app(json_response=True)) as http:
+            self.assertEqual(http.post("/mcp", json=INITIALIZE, headers=HEADERS).status_code, 401)
+        with TestClient(create_http_app(json_response=True, allow_server_token=True)) as http:
+            self.assertEqual(http.post("/mcp", json=INITIALIZE, headers=HEADERS).status_code, 200)
+
+    def test_metrics_need_their_own_token(self):
+        with TestClient(create_http_app(json_response=True)) as http:
+            self.assertEqual(http.get("/metrics").status_code, 404)
+        with TestClient(create_http_app(json_response=True, metrics_token="scrape")) as http:
+            self.assertEqual(http.get("/metrics").status_code, 401)
+            self.assertEqual(http.get("/metrics", headers={"Authorization": "Bearer alice"}).status_code, 401)
+            response = http.get("/metrics", headers={"Authorization": "Bearer scrape"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+
+    def test_sessions_use_their_own_token(self):
+        seen = []
+
+        def fake_get_async_client():
+            token = server_module.request_token()
+            seen.append(token)
+            client = MagicMock()
+            client.get_task = AsyncMock(return_value={"gid": "t1", "token": token})
+            return client
+
+        with patch.object(server_module, "get_async_client", side_effect=fake_get_async_client), \
+                TestClient(create_http_app(json_response=True)) as http:
+            alice = self.open_session(http, "alice")
+            bob = self.open_session(http, "bob")
+            for headers in (alice, bob, alice):
+                call = {"jsonrpc": "2.0", "id": 2, "method": "tools/call",
+                        "params": {"name": "get_task_details", "arguments": {"task_id": "t1"}}}
+                response = http.post("/mcp", json=call, headers=headers)
+                self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(seen, ["alice", "bob", "alice"])
+
+
+class TestTokenClients(unittest.TestCase):
+    def setUp(self):
+        os.environ["ASANA_ACCESS_TOKEN"] = "server_token"
+        patch('asana.ApiClient', side_effect=lambda *a, **k: MagicMock()).start()
+        for name in ('UsersApi', 'TasksApi', 'ProjectsApi', 'WorkspacesApi', 'StoriesApi', 'BatchAPIApi',
+                     'EventsApi', 'TypeaheadApi'):
+            patch(f'asana.{name}').start()
+        for name, value in (("asana_client", None), ("async_client", None), ("client_pool", None),
+                            ("pool_client", None), ("worker_pool", None)):
+            patch.object(server_module, name, value).start()
+
+    def tearDown(self):
+        patch.stopall()
+        del os.environ["ASANA_ACCESS_TOKEN"]
+
+    def test_clients_share_pools_but_not_caches(self):
+        with patch.object(server_module, "request_token", return_value=None):
+            default = server_module.get_async_client()
+        with patch.object(server_module, "request_token", return_value="alice"):
+            alice = server_module.get_async_client()
+            self.assertIs(server_module.get_async_client(), alice)
+        with patch.object(server_module, "request_token", return_value="server_token"):
+            self.assertIs(server_module.get_async_client(), default)
+
+        self.assertEqual(alice.client.access_token, "alice")
+        self.assertIs(alice.client.api_client.rest_client, default.client.api_client.rest_client)
+        self.assertIs(alice.executor, default.executor)
+        self.assertIsNot(alice.client.cache, default.client.cache)
+        self.assertIsNot(alice.client.scheduler, default.client.scheduler)
+
+
+if __name__ == "__main__":
+    unittest.main()
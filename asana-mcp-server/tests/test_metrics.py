@@ -0,0 +1,119 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from asana_mcp_server.metrics import ENDPOINT, TOOL, Histogram, Metrics, profile_slow_calls
+from asana_mcp_server.scheduler import RequestScheduler
+
+
+class FakeApiException(Exception):
+    def __init__(self, status):
+        self.status = status
+        self.headers = {"Retry-After": "0"}
+
+
+class TestHistogram(unittest.TestCase):
+    def test_quantiles_interpolate_within_buckets(self):
+        hist = Histogram((1, 2, 4))
+        for value in (0.5, 1.5, 1.5, 3):
+            hist.observe(value)
+        self.assertEqual(hist.quantile(0.5), 1.5)
+        self.assertEqual(hist.cumulative(), [("1", 1), ("2", 3), ("4", 4), ("+Inf", 4)])
+        self.assertIsNone(Histogram((1,)).quantile(0.5))
+
+
+class TestMetrics(unittest.TestCase):
+    def test_measure_records_calls_errors_and_bytes(self):
+        metrics = Metrics()
+        with metrics.measure(TOOL, "get_task_details") as call:
+            call["bytes"] = 100
+        with self.assertRaises(FakeApiException):
+            with metrics.measure(ENDPOINT, "tasks_api.get_task"):
+                raise FakeApiException(404)
+
+        snapshot = metrics.snapshot()
+        tool = snapshot["tools"]["get_task_details"]
+        self.assertEqual(tool["calls"], 1)
+        self.assertEqual(tool["response_bytes"]["sum"], 100)
+        self.assertEqual(snapshot["endpoints"]["tasks_api.get_task"]["errors"], {"404": 1})
+
+    def test_prometheus_exposition(self):
+        metrics = Metrics()
+        metrics.observe(TOOL, "search_tasks", 0.2, nbytes=10)
+        metrics.observe(ENDPOINT, "tasks_api.get_tasks", 0.1, error="429")
+        metrics.record_retry("tasks_api.get_tasks", rate_limited=True)
+        text = metrics.prometheus()
+
+        self.assertIn('asana_mcp_calls_total{kind="tool",name="search_tasks"} 1', text)
+        self.assertIn('asana_mcp_duration_seconds_bucket{kind="tool",name="search_tasks",le="0.25"} 1', text)
+        self.assertIn('asana_mcp_response_bytes_count{kind="tool",name="search_tasks"} 1', text)
+        self.assertIn('asana_api_errors_total{endpoint="tasks_api.get_tasks",error="429"} 1', text)
+        self.assertIn('asana_api_rate_limited_total{endpoint="tasks_api.get_tasks"} 1', text)
+        self.assertIn("# TYPE asana_api_duration_seconds histogram", text)
+
+    def test_slow_call_hooks_receive_profiles(self):
+        metrics = Metrics()
+        slow = []
+        profile_slow_calls(metrics, threshold=0.0)
+        metrics.add_slow_call_hook(slow.append, threshold=0.0)
+        with metrics.measure(TOOL, "get_tasks"):
+            sum(range(1000))
+        self.assertEqual(slow[0]["name"], "get_tasks")
+        self.assertIsNotNone(slow[0]["profile"])
+
+
+class TestSchedulerMetrics(unittest.TestCase):
+    def test_attempts_and_retries_are_recorded_per_endpoint(self):
+        metrics = Metrics()
+        scheduler = RequestScheduler(rate=0, metrics=metrics, sleep=lambda s: None)
+        func = MagicMock(side_effect=[FakeApiException(429), "ok"])
+        scheduler.run(None, func, endpoint="tasks_api.get_tasks")
+
+        endpoint = metrics.snapshot()["endpoints"]["tasks_api.get_tasks"]
+        self.assertEqual(endpoint["calls"], 2)
+        self.assertEqual(endpoint["errors"], {"429": 1})
+        self.assertEqual((endpoint["retries"], endpoint["rate_limited"]), (1, 1))
+
+    def test_each_page_of_a_listing_is_one_observation(self):
+        from asana_mcp_server.client import AsanaClient
+
+        metrics = Metrics()
+        with patch('asana.ApiClient'), patch('asana.TasksApi') as tasks_api:
+            tasks_api.return_value.get_subtasks_for_task.side_effect = [
+                {"data": [{"gid": "s1"}], "next_page": {"offset": "tok"}},
+                {"data": [{"gid": "s2"}], "next_page": None},
+            ]
+            client = AsanaClient(access_token="token", scheduler=RequestScheduler(rate=0, metrics=metrics))
+            self.assertEqual(client.get_subtasks("t1"), [{"gid": "s1"}, {"gid": "s2"}])
+
+        self.assertEqual(metrics.snapshot()["endpoints"]["tasks_api.get_subtasks_for_task"]["calls"], 2)
+
+
+class TestServerMetrics(unittest.IsolatedAsyncioTestCase):
+    async def test_tool_calls_and_metrics_resource(self):
+        from mcp import types
+        import asana_mcp_server.server as server_module
+
+        metrics = Metrics()
+        mock_client = MagicMock()
+        mock_client.get_task = AsyncMock(side_effect=ValueError("boom"))
+        mock_client.client.scheduler_stats.return_value = {"requests": 0}
+        with patch.object(server_module, 'get_async_client', return_value=mock_client), \
+                patch.object(server_module, 'METRICS', metrics):
+            server = server_module.create_server()
+            call = server.request_handlers[types.CallToolRequest]
+            read = server.request_handlers[types.ReadResourceRequest]
+            result = await call(types.CallToolRequest(
+                method="tools/call",
+                params=types.CallToolRequestParams(name="get_task_details", arguments={"task_id": "t1"})))
+            self.assertEqual(result.root.content[0].text, "Error: boom")
+
+            result = await read(types.ReadResourceRequest(
+                method="resources/read", params=types.ReadResourceRequestParams(uri="asana://metrics?format=prometheus")))
+
+        text = result.root.contents[0].text
+        self.assertIn('asana_mcp_errors_total{kind="tool",name="get_task_details",error="ValueError"} 1', text)
+        self.assertEqual(metrics.snapshot()["resources"]["asana://metrics"]["calls"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from asana_mcp_server.mirror import MirrorSync, TaskMirror, my_tasks_scope, project_scope
+
+
+def task(gid, project="p1", completed=False, **fields):
+    record = {"gid": gid, "name": f"Task {gid}", "completed": completed,
+              "projects": [{"gid": project, "name": "Project"}],
+              "assignee": None, "workspace": {"gid": "ws1", "name": "WS"}}
+    record.update(fields)
+    return record
+
+
+class FakeClient:
+    """Just enough of AsanaClient for MirrorSync."""
+
+    def __init__(self, listing, events=None, live=None):
+        self.listing = listing
+        self.events = list(events or [])
+        self.live = live or {}
+        self.event_calls = []
+
+    def fetch_events(self, resource, sync):
+        self.event_calls.append(sync)
+        if sync is None or not self.events:
+            return {"expired": True, "sync": "tok0", "data": [], "has_more": False}
+        return self.events.pop(0)
+
+    def iter_tasks(self, opts, page_size=100):
+        return iter(self.listing)
+
+    def batch(self, actions):
+        outcomes = []
+        for action in actions:
+            gid = action["relative_path"].split("/")[-1]
+            if gid in self.live:
+                outcomes.append({"ok": True, "data": self.live[gid]})
+            else:
+                outcomes.append({"ok": False, "status": 404, "error": "Not found"})
+        return outcomes
+
+    def mirror_scopes(self, record):
+        scopes = [project_scope(p["gid"]) for p in record.get("projects") or []]
+        if (record.get("assignee") or {}).get("gid") == "me":
+            scopes.append(my_tasks_scope(record["workspace"]["gid"]))
+        return scopes
+
+
+class TestTaskMirror(unittest.TestCase):
+    def setUp(self):
+        self.mirror = TaskMirror()
+        self.mirror.register_scope(project_scope("p1"))
+
+    def test_only_fresh_scopes_are_served(self):
+        self.mirror.upsert_task(task("t1"), [project_scope("p1")])
+        self.assertIsNone(self.mirror.get_task("t1", max_staleness=60))
+
+        self.mirror.mark_synced(project_scope("p1"), "tok")
+        self.assertEqual(self.mirror.get_task("t1", max_staleness=60)["name"], "Task t1")
+
+    def test_unmirrored_tasks_are_not_stored(self):
+        self.mirror.upsert_task(task("t1", project="other"), [project_scope("other")])
+        self.assertEqual(self.mirror.count(), 0)
+
+    def test_scope_pages_keep_listing_order(self):
+        self.mirror.upsert_tasks([(task(str(i)), [project_scope("p1")]) for i in range(5)])
+        self.mirror.upsert_task(task("0", name="renamed"), [project_scope("p1")])
+
+        page, next_offset = self.mirror.scope_tasks(project_scope("p1"), limit=2)
+        self.assertEqual([t["gid"] for t in page], ["0", "1"])
+        self.assertEqual(page[0]["name"], "renamed")
+        self.assertEqual(next_offset, 2)
+        page, next_offset = self.mirror.scope_tasks(project_scope("p1"), limit=2, offset=4)
+        self.assertEqual([t["gid"] for t in page], ["4"])
+        self.assertIsNone(next_offset)
+
+    def test_patch_task(self):
+        self.mirror.upsert_task(task("t1", assignee={"gid": "u1", "name": "A"}), [project_scope("p1")])
+        self.mirror.mark_synced(project_scope("p1"))
+
+        self.assertTrue(self.mirror.patch_task("t1", {"completed": True}))
+        page, _ = self.mirror.scope_tasks(project_scope("p1"), incomplete_only=True)
+        self.assertEqual(page, [])
+
+        self.assertFalse(self.mirror.patch_task("t1", {"assignee": "u2"}))
+        self.assertIsNone(self.mirror.get_task("t1", max_staleness=60))
+
+
+class TestMirrorSync(unittest.TestCase):
+    def test_seed_then_apply_events(self):
+        mirror = TaskMirror()
+        client = FakeClient(listing=[task("t1"), task("t2")])
+        sync = MirrorSync(client, mirror, projects=["p1"])
+
+        sync.sync_once()
+        self.assertEqual(mirror.scope_state(project_scope("p1"))["sync_token"], "tok0")
+        self.assertEqual(mirror.count(), 2)
+
+        client.events = [
+            {"data": [
+                {"action": "changed", "resource": {"gid": "t1", "resource_type": "task"}},
+                {"action": "added", "resource": {"gid": "s1", "resource_type": "story"},
+                 "parent": {"gid": "t1", "resource_type": "task"}},
+                {"action": "deleted", "resource": {"gid": "t2", "resource_type": "task"}},
+            ], "sync": "tok1", "has_more": True},
+            {"data": [{"action": "added", "resource": {"gid": "t3", "resource_type": "task"}}],
+             "sync": "tok2", "has_more": False},
+        ]
+        client.live = {"t1": task("t1", completed=True), "t3": task("t3")}
+        sync.sync_once()
+
+        self.assertEqual(client.event_calls[-2:], ["tok0", "tok1"])
+        self.assertEqual(mirror.scope_state(project_scope("p1"))["sync_token"], "tok2")
+        tasks, _ = mirror.scope_tasks(project_scope("p1"))
+        self.assertEqual([(t["gid"], t["completed"]) for t in tasks], [("t1", True), ("t3", False)])
+
+    def test_expired_token_reseeds(self):
+        mirror = TaskMirror()
+        client = FakeClient(listing=[task("t1")])
+        sync = MirrorSync(client, mirror, projects=["p1"])
+        sync.sync_once()
+
+        client.listing = [task("t9")]
+        client.events = [{"expired": True, "sync": "fresh", "data": [], "has_more": False}]
+        sync.sync_once()
+
+        tasks, _ = mirror.scope_tasks(project_scope("p1"))
+        self.assertEqual([t["gid"] for t in tasks], ["t9"])
+
+    def test_my_tasks_scope(self):
+        mirror = TaskMirror()
+        client = FakeClient(listing=[task("t1", assignee={"gid": "me", "name": "Me"})])
+        MirrorSync(client, mirror, workspaces=["ws1"]).sync_once()
+        tasks, _ = mirror.scope_tasks(my_tasks_scope("ws1"))
+        self.assertEqual([t["gid"] for t in tasks], ["t1"])
+
+    def test_my_tasks_watermark_is_taken_before_listing(self):
+        mirror = TaskMirror()
+        sync = MirrorSync(FakeClient(listing=[]), mirror, workspaces=["ws1"])
+        now = [1000.0]
+        listed = []
+
+        def slow_listing(opts, page_size=100):
+            listed.append(opts)
+            now[0] += 500  # tasks changed while this runs must be picked up next time
+            return iter([])
+
+        sync.client.iter_tasks = slow_listing
+        with patch('asana_mcp_server.mirror.time.time', side_effect=lambda: now[0]):
+            sync.sync_my_tasks("ws1")
+            sync.sync_my_tasks("ws1")
+
+        self.assertEqual(listed[1]["modified_since"], "1970-01-01T00:16:40Z")
+        self.assertEqual(mirror.scope_state(my_tasks_scope("ws1"))["synced_at"], 1500.0)
+
+
+class TestClientWithMirror(unittest.TestCase):
+    def setUp(self):
+        os.environ["ASANA_ACCESS_TOKEN"] = "test_token"
+        for name in ('Configuration', 'ApiClient', 'UsersApi', 'TasksApi', 'ProjectsApi',
+                     'WorkspacesApi', 'StoriesApi', 'BatchAPIApi', 'EventsApi'):
+            patch(f'asana.{name}').start()
+        from asana_mcp_server.client import AsanaClient
+        self.mirror = TaskMirror()
+        self.mirror.register_scope(project_scope("p1"))
+        self.client = AsanaClient(mirror=self.mirror, mirror_max_staleness=60)
+        self.client.users_api.get_user.return_value = {"gid": "me", "workspaces": [{"gid": "ws1"}]}
+
+    def tearDown(self):
+        patch.stopall()
+        del os.environ["ASANA_ACCESS_TOKEN"]
+
+    def test_reads_come_from_fresh_mirror(self):
+        self.mirror.upsert_tasks([(task(str(i), notes="n"), [project_scope("p1")]) for i in range(3)])
+        self.mirror.mark_synced(project_scope("p1"))
+
+        self.assertEqual(self.client.get_task("1")["notes"], "n")
+        page = self.client.get_project_tasks_page("p1", limit=2)
+        self.assertEqual([t["gid"] for t in page["data"]], ["0", "1"])
+        self.assertNotIn("notes", page["data"][0])
+        self.assertEqual(page["next_page"], "m:2")
+        page = self.client.get_project_tasks_page("p1", limit=2, offset=page["next_page"])
+        self.assertEqual([t["gid"] for t in page["data"]], ["2"])
+
+        self.client.tasks_api.get_task.assert_not_called()
+        self.client.tasks_api.get_tasks.assert_not_called()
+
+    def test_stale_mirror_falls_back_to_live(self):
+        self.mirror.upsert_task(task("1"), [project_scope("p1")])
+        self.client.tasks_api.get_task.return_value = {"gid": "1", "name": "live"}
+        self.assertEqual(self.client.get_task("1")["name"], "live")
+
+    def test_writes_are_applied_to_the_mirror(self):
+        self.mirror.mark_synced(project_scope("p1"))
+        self.client.tasks_api.create_task.return_value = task("new")
+        created = self.client.create_task("New", project_id="p1")
+
+        self.assertEqual(set(created), {"gid", "name"})
+        self.assertEqual(self.client.get_project_tasks_page("p1")["data"][0]["gid"], "new")
+
+        self.client.tasks_api.update_task.return_value = task("new", completed=True)
+        self.client.mark_task_complete("new")
+        self.assertTrue(self.client.get_task("new")["completed"])
+        self.client.tasks_api.get_task.assert_not_called()
+
+    def test_batch_created_tasks_are_mirrored(self):
+        from asana_mcp_server.client import MIRROR_TASK_FIELDS, create_task_action
+
+        self.mirror.mark_synced(project_scope("p1"))
+        self.client.batch_api.create_batch_request.return_value = {"data": [
+            {"status_code": 201, "body": {"data": task("new")}}]}
+        outcomes = self.client.batch([create_task_action({"name": "New", "projects": ["p1"]})])
+
+        sent = self.client.batch_api.create_batch_request.call_args[0][0]["data"]["actions"][0]
+        self.assertEqual(sent["options"]["fields"], MIRROR_TASK_FIELDS.split(","))
+        self.assertEqual(set(outcomes[0]["data"]), {"gid", "name"})
+        self.assertEqual(self.client.get_project_tasks_page("p1")["data"][0]["gid"], "new")
+        self.client.tasks_api.get_tasks.assert_not_called()
+
+
+class TestMirrorConfiguration(unittest.TestCase):
+    def test_mirror_without_targets_warns_and_does_not_sync(self):
+        import asana_mcp_server.server as server_module
+
+        env = {"ASANA_MIRROR_PATH": ":memory:", "ASANA_MIRROR_PROJECTS": "", "ASANA_MIRROR_WORKSPACES": ""}
+        with patch.dict(os.environ, env), patch.object(server_module, "get_async_client") as get_client, \
+                self.assertLogs("asana_mcp_server.server", "WARNING") as logs:
+            self.assertIsNone(server_module.start_mirror_sync())
+        get_client.assert_not_called()
+        self.assertIn("nothing is mirrored", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import jsonschema
+from mcp.types import Tool
+
+from asana_mcp_server.registry import ResourceRouter, ToolRegistry
+
+
+def make_tool(name, properties=None, required=None):
+    schema = {"type": "object", "properties": dict(properties or {})}
+    if required:
+        schema["required"] = required
+    return Tool(name=name, description=name, inputSchema=schema)
+
+
+async def handler(client, arguments):
+    return arguments
+
+
+class TestToolRegistry(unittest.TestCase):
+    def test_listing_is_built_once(self):
+        registry = ToolRegistry(common_properties={"format": {"type": "string"}})
+        registry.add(make_tool("a"), handler)
+
+        listing = registry.listing()
+        self.assertIs(registry.listing(), listing)
+        self.assertIn("format", listing.tools[0].inputSchema["properties"])
+
+        registry.add(make_tool("b"), handler)
+        self.assertEqual([t.name for t in registry.definitions()], ["a", "b"])
+
+    def test_dispatch_by_name(self):
+        registry = ToolRegistry()
+        registry.tool(make_tool("a"))(handler)
+        self.assertIs(registry.handler("a"), handler)
+        self.assertIsNone(registry.handler("missing"))
+        self.assertIn("a", registry)
+        with self.assertRaises(ValueError):
+            registry.add(make_tool("a"), handler)
+
+    def test_validation_reports_what_jsonschema_would(self):
+        tool = make_tool("a", {"task_id": {"type": "string"}, "limit": {"type": "integer"}}, ["task_id"])
+        registry = ToolRegistry()
+        registry.add(tool, handler)
+
+        self.assertIsNone(registry.validate("a", {"task_id": "t1", "limit": 5}))
+        for arguments in ({}, {"task_id": 1}, {"task_id": "t1", "limit": "5"}):
+            with self.assertRaises(jsonschema.ValidationError) as ctx:
+                jsonschema.validate(arguments, tool.inputSchema)
+            self.assertEqual(registry.validate("a", arguments), ctx.exception.message)
+
+    def test_invalid_schemas_are_rejected_at_registration(self):
+        with self.assertRaises(jsonschema.SchemaError):
+            ToolRegistry().add(make_tool("a", {"limit": {"type": "number-ish"}}), handler)
+
+
+class TestResourceRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = ResourceRouter()
+        self.task = AsyncMock()
+        self.project = AsyncMock()
+        self.stats = AsyncMock()
+        self.router.add("asana://tasks/{task_id}", self.task, name="Task")
+        self.router.add("asana://projects/{project_id}/tasks", self.project, name="Project tasks")
+        self.router.add("asana://cache/stats", self.stats)
+
+    def test_matches_templates_and_extracts_variables(self):
+        self.assertEqual(self.router.match("asana://tasks/123"),
+                         ("asana://tasks/{task_id}", self.task, {"task_id": "123"}))
+        self.assertEqual(self.router.match("asana://projects/9/tasks?limit=10"),
+                         ("asana://projects/{project_id}/tasks", self.project, {"project_id": "9"}))
+        self.assertEqual(self.router.match("asana://cache/stats"), ("asana://cache/stats", self.stats, {}))
+
+    def test_only_whole_segments_match(self):
+        for uri in ("asana://tasks/1/2", "asana://tasks/", "asana://projects/9", "asana://projects/9/tasks/x",
+                    "asana://other/asana://tasks/1"):
+            self.assertIsNone(self.router.match(uri), uri)
+
+    def test_named_templates_are_listed(self):
+        templates = self.router.resource_templates()
+        self.assertEqual([t.uriTemplate for t in templates],
+                         ["asana://tasks/{task_id}", "asana://projects/{project_id}/tasks"])
+        self.assertIs(self.router.resource_templates(), templates)
+
+    def test_templates_must_start_with_a_literal_segment(self):
+        with self.assertRaises(ValueError):
+            self.router.add("asana://{kind}/x", AsyncMock())
+
+
+class TestServerRegistry(unittest.IsolatedAsyncioTestCase):
+    async def call_tool(self, name, arguments):
+        from mcp import types
+        import asana_mcp_server.server as server_module
+
+        mock_client = MagicMock()
+        mock_client.get_task = AsyncMock(return_value={"gid": "t1"})
+        with patch.object(server_module, 'get_async_client', return_value=mock_client):
+            server = server_module.create_server()
+            request = types.CallToolRequest(
+                method="tools/call", params=types.CallToolRequestParams(name=name, arguments=arguments))
+            return (await server.request_handlers[types.CallToolRequest](request)).root, mock_client
+
+    async def test_invalid_arguments_are_rejected_before_dispatch(self):
+        result, client = await self.call_tool("get_task_details", {"task_id": 5})
+        self.assertTrue(result.isError)
+        self.assertEqual(result.content[0].text, "Input validation error: 5 is not of type 'string'")
+        client.get_task.assert_not_called()
+
+    async def test_unknown_tools_are_reported(self):
+        result, _ = await self.call_tool("no_such_tool", {})
+        self.assertEqual(result.content[0].text, "Error: Unknown tool: no_such_tool")
+
+    async def test_resource_templates_are_listed(self):
+        from mcp import types
+        import asana_mcp_server.server as server_module
+
+        server = server_module.create_server()
+        result = await server.request_handlers[types.ListResourceTemplatesRequest](
+            types.ListResourceTemplatesRequest(method="resources/templates/list"))
+        self.assertIn("asana://tasks/{task_id}", [t.uriTemplate for t in result.root.resourceTemplates])
+        self.assertEqual(server_module.resource_route("asana://projects/1/tasks?limit=5"),
+                         "asana://projects/{project_id}/tasks")
+        self.assertEqual(server_module.resource_route("asana://projects/1"), "unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from asana_mcp_server.scheduler import RateLimitedError, RequestScheduler, TokenBucket
+
+
+class FakeApiException(Exception):
+    def __init__(self, status, retry_after=None):
+        self.status = status
+        self.headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_waits_once_burst_is_spent(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=2, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        bucket.acquire()
+        self.assertEqual(clock.sleeps, [])
+        bucket.acquire()
+        self.assertAlmostEqual(sum(clock.sleeps), 0.5)
+
+
+class TestRequestScheduler(unittest.TestCase):
+    def make_scheduler(self, **kwargs):
+        clock = FakeClock()
+        return clock, RequestScheduler(rate=0, clock=clock, sleep=clock.sleep, **kwargs)
+
+    def test_honors_retry_after_on_429(self):
+        clock, scheduler = self.make_scheduler()
+        func = MagicMock(side_effect=[FakeApiException(429, retry_after=7), "ok"])
+
+        self.assertEqual(scheduler.run(None, func, "a", opts={}), "ok")
+        self.assertEqual(clock.sleeps, [7.0])
+        func.assert_called_with("a", opts={})
+        self.assertEqual(scheduler.stats()["rate_limited"], 1)
+        self.assertEqual(scheduler.stats()["retries"], 1)
+
+    def test_gives_up_with_rate_limited_error(self):
+        _, scheduler = self.make_scheduler(max_retries=2)
+        func = MagicMock(side_effect=FakeApiException(429, retry_after=3))
+        with self.assertRaises(RateLimitedError) as ctx:
+            scheduler.run(None, func)
+        self.assertEqual(ctx.exception.retry_after, 3.0)
+        self.assertEqual(func.call_count, 3)
+
+    def test_retries_5xx_only_for_idempotent_calls(self):
+        _, scheduler = self.make_scheduler()
+        func = MagicMock(side_effect=[FakeApiException(503), "ok"])
+        self.assertEqual(scheduler.run(None, func), "ok")
+
+        write = MagicMock(side_effect=FakeApiException(503))
+        with self.assertRaises(FakeApiException):
+            scheduler.run(None, write, idempotent=False)
+        write.assert_called_once()
+
+    def test_does_not_retry_client_errors(self):
+        _, scheduler = self.make_scheduler()
+        func = MagicMock(side_effect=FakeApiException(404))
+        with self.assertRaises(FakeApiException):
+            scheduler.run(None, func)
+        func.assert_called_once()
+
+    def test_coalesces_identical_concurrent_reads(self):
+        scheduler = RequestScheduler(rate=0)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"gid": "t1"}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(scheduler.run(("task", "t1"), fetch)))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"gid": "t1"}] * 5)
+        self.assertEqual(scheduler.stats()["coalesced"], 4)
+
+    def test_bounds_requests_in_flight(self):
+        scheduler = RequestScheduler(rate=0, max_in_flight=2)
+        peak = 0
+        lock = threading.Lock()
+
+        def fetch():
+            nonlocal peak
+            with lock:
+                peak = max(peak, scheduler.in_flight)
+            time.sleep(0.05)
+
+        threads = [threading.Thread(target=scheduler.run, args=(None, fetch)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(peak, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
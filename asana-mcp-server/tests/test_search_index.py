@@ -0,0 +1,196 @@
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from asana_mcp_server.search_index import SearchIndex, SearchIndexer, match_expression
+
+
+def task(gid, name, notes="", project=("p1", "Roadmap"), completed=False, due_on=None):
+    return {"gid": gid, "name": name, "notes": notes, "completed": completed, "due_on": due_on,
+            "projects": [{"gid": project[0], "name": project[1]}], "workspace": {"gid": "ws1"}}
+
+
+class FakeClient:
+    """Just enough of AsanaClient for SearchIndexer."""
+
+    def __init__(self, listings, projects=()):
+        self.listings = listings
+        self.projects = list(projects)
+        self.calls = []
+
+    def iter_tasks(self, opts, page_size=100):
+        self.calls.append(opts)
+        # Projects by gid; the user's own tasks under ("me", workspace).
+        key = opts.get("project") or ("me", opts["workspace"])
+        if isinstance(self.listings.get(key), Exception):
+            raise self.listings[key]
+        return iter(self.listings.get(key, []))
+
+    def iter_workspace_projects(self, workspace_id):
+        return [{"gid": p} for p in self.projects]
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.replace_project("p1", [
+            task("1", "Write launch notes", notes="blog post for the release"),
+            task("2", "Release checklist", due_on="2024-05-01"),
+            task("3", "Fix login bug", notes="happens after the release", completed=True, due_on="2024-06-01"),
+        ])
+
+    def test_match_expression_quotes_terms(self):
+        self.assertEqual(match_expression('rel "bug'), '"rel"* """bug"*')
+        self.assertEqual(match_expression("  "), "")
+
+    def test_prefix_search_ranks_name_matches_first(self):
+        results = self.index.search("rel")
+        self.assertEqual(results[0]["gid"], "2")
+        self.assertEqual({t["gid"] for t in results[1:]}, {"1", "3"})
+        self.assertEqual(set(results[0]), {"gid", "name", "completed", "due_on", "projects"})
+
+    def test_matches_project_names(self):
+        self.assertEqual(len(self.index.search("roadmap")), 3)
+
+    def test_filters(self):
+        self.assertEqual([t["gid"] for t in self.index.search("release", completed=False)], ["2", "1"])
+        self.assertEqual([t["gid"] for t in self.index.search("release", due_after="2024-05-15")], ["3"])
+        self.assertEqual([t["gid"] for t in self.index.search("release", due_before="2024-05-15")], ["2"])
+        self.assertEqual(self.index.search("release", project_id="p2"), [])
+        self.assertEqual(self.index.search("release", workspace_id="ws2"), [])
+        self.assertEqual(len(self.index.search("release", limit=1)), 1)
+
+    def test_patch_task(self):
+        self.index.patch_task("2", {"name": "Shipping checklist", "completed": True})
+        self.assertEqual([t["gid"] for t in self.index.search("shipping", completed=True)], ["2"])
+        self.assertNotIn("2", [t["gid"] for t in self.index.search("checklist", completed=False)])
+
+    def test_replace_project_drops_removed_tasks(self):
+        self.index.replace_project("p1", [task("1", "Write launch notes")])
+        self.assertEqual(self.index.count(), 1)
+        self.assertEqual(self.index.search("release"), [])
+
+    def test_new_tasks_inherit_project_name_and_workspace(self):
+        self.index.add_tasks([{"gid": "4", "name": "Plan offsite", "projects": [{"gid": "p1"}]}])
+        self.assertEqual([t["gid"] for t in self.index.search("roadmap offsite", workspace_id="ws1")], ["4"])
+
+    def test_covers(self):
+        # One indexed project only answers searches limited to it.
+        self.assertFalse(self.index.covers("ws1"))
+        self.assertTrue(self.index.covers("ws1", "p1"))
+        self.assertFalse(self.index.covers("ws1", "p2"))
+        self.index.mark_workspace_indexed("ws1")
+        self.assertTrue(self.index.covers("ws1"))
+        self.assertFalse(self.index.covers("ws2"))
+
+    def test_replace_personal_tasks_keeps_only_unfiled_tasks(self):
+        unfiled = dict(task("8", "Renew passport"), projects=[])
+        self.index.replace_personal_tasks("ws1", [unfiled, task("9", "Release party")])
+        self.assertEqual([t["gid"] for t in self.index.search("passport")], ["8"])
+        self.assertEqual(self.index.search("party"), [])
+
+        self.index.replace_personal_tasks("ws1", [])
+        self.assertEqual(self.index.search("passport"), [])
+        self.assertEqual(self.index.count(), 3)
+
+
+class TestSearchIndexer(unittest.TestCase):
+    def test_rebuilds_then_refreshes_incrementally(self):
+        index = SearchIndex()
+        client = FakeClient({"p1": [task("1", "Alpha")], "p2": [task("2", "Beta", project=("p2", "Ops"))]},
+                            projects=["p2"])
+        indexer = SearchIndexer(client, index, projects=["p1"], workspaces=["ws1"])
+
+        indexer.refresh_once()
+        self.assertEqual(index.count(), 2)
+        self.assertTrue(all("modified_since" not in c for c in client.calls))
+
+        client.listings["p1"] = [task("1", "Alpha renamed")]
+        client.calls.clear()
+        indexer.refresh_once()
+        self.assertTrue(all("modified_since" in c for c in client.calls))
+        self.assertEqual([t["name"] for t in index.search("renamed")], ["Alpha renamed"])
+
+    def test_workspace_is_covered_only_after_every_listing_succeeds(self):
+        index = SearchIndex()
+        client = FakeClient({"p1": [task("1", "Alpha")], "p2": RuntimeError("Forbidden"),
+                             ("me", "ws1"): [dict(task("3", "Dentist"), projects=[])]}, projects=["p1", "p2"])
+        indexer = SearchIndexer(client, index, workspaces=["ws1"])
+
+        indexer.refresh_once()
+        self.assertFalse(index.covers("ws1"))
+        self.assertTrue(index.covers("ws1", "p1"))
+
+        client.listings["p2"] = [task("2", "Beta", project=("p2", "Ops"))]
+        indexer.refresh_once()
+        self.assertTrue(index.covers("ws1"))
+        self.assertEqual([t["gid"] for t in index.search("dentist", workspace_id="ws1")], ["3"])
+
+    def test_project_only_config_never_covers_the_workspace(self):
+        index = SearchIndex()
+        SearchIndexer(FakeClient({"p1": [task("1", "Alpha")]}), index, projects=["p1"]).refresh_once()
+        self.assertFalse(index.covers("ws1"))
+        self.assertTrue(index.covers("ws1", "p1"))
+
+    def test_full_rebuild_after_interval(self):
+        index = SearchIndex()
+        client = FakeClient({"p1": [task("1", "Alpha"), task("2", "Beta")]})
+        indexer = SearchIndexer(client, index, projects=["p1"], full_rebuild_interval=0)
+        indexer.refresh_once()
+
+        client.listings["p1"] = [task("1", "Alpha")]
+        time.sleep(0.01)
+        indexer.refresh_once()
+        self.assertEqual(index.count(), 1)
+
+
+class TestClientSearch(unittest.TestCase):
+    def setUp(self):
+        os.environ["ASANA_ACCESS_TOKEN"] = "test_token"
+        for name in ('Configuration', 'ApiClient', 'UsersApi', 'TasksApi', 'ProjectsApi',
+                     'WorkspacesApi', 'StoriesApi', 'BatchAPIApi', 'EventsApi', 'TypeaheadApi'):
+            patch(f'asana.{name}').start()
+        from asana_mcp_server.client import AsanaClient
+        self.index = SearchIndex()
+        self.client = AsanaClient(search_index=self.index)
+        self.client.users_api.get_user.return_value = {"gid": "me", "workspaces": [{"gid": "ws1"}]}
+
+    def tearDown(self):
+        patch.stopall()
+        del os.environ["ASANA_ACCESS_TOKEN"]
+
+    def test_falls_back_to_typeahead_until_indexed(self):
+        self.client.typeahead_api.typeahead_for_workspace.return_value = [
+            {"gid": "1", "name": "Release", "completed": True, "projects": []},
+            {"gid": "2", "name": "Release notes", "completed": False, "projects": []},
+        ]
+        self.assertEqual([t["gid"] for t in self.client.search_tasks("rel", completed=False)], ["2"])
+
+        # Indexing one project answers searches limited to it, but not the whole workspace.
+        self.index.replace_project("p1", [task("3", "Release plan")])
+        self.assertEqual([t["gid"] for t in self.client.search_tasks("rel", project_id="p1")], ["3"])
+        self.client.search_tasks("rel", project_id="p2")
+        self.client.search_tasks("rel")
+        self.assertEqual(self.client.typeahead_api.typeahead_for_workspace.call_count, 3)
+
+        self.index.mark_workspace_indexed("ws1")
+        self.assertEqual([t["gid"] for t in self.client.search_tasks("rel")], ["3"])
+        self.assertEqual(self.client.typeahead_api.typeahead_for_workspace.call_count, 3)
+
+    def test_writes_update_the_index(self):
+        self.index.replace_project("p1", [task("1", "Release plan")])
+        self.index.mark_workspace_indexed("ws1")
+
+        self.client.tasks_api.create_task.return_value = {"gid": "2", "name": "Offsite"}
+        self.client.create_task("Offsite agenda", project_id="p1")
+        self.assertEqual([t["gid"] for t in self.client.search_tasks("agenda")], ["2"])
+
+        self.client.tasks_api.update_task.return_value = {"gid": "1", "name": "Launch plan"}
+        self.client.update_task("1", {"name": "Launch plan"})
+        self.assertEqual(self.client.search_tasks("release"), [])
+        self.assertEqual([t["gid"] for t in self.client.search_tasks("launch")], ["1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
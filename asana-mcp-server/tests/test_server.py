@@ -33,6 +33,82 @@ class TestAsanaServer(unittest.IsolatedAsyncioTestCase):
             # and trust the MCP mapping if the schema matches.
             pass
 
+    async def test_call_tool_dispatches_through_async_client(self):
+        from mcp import types
+        import asana_mcp_server.server as server_module
+
+        mock_client = MagicMock()
+        mock_client.get_task = AsyncMock(return_value={"gid": "t1", "name": "Task 1"})
+        with patch.object(server_module, 'get_async_client', return_value=mock_client):
+            server = server_module.create_server()
+            handler = server.request_handlers[types.CallToolRequest]
+            request = types.CallToolRequest(
+                method="tools/call",
+                params=types.CallToolRequestParams(name="get_task_details", arguments={"task_id": "t1"}),
+            )
+            result = await handler(request)
+
+        mock_client.get_task.assert_awaited_with("t1", opt_fields=None)
+        self.assertEqual(json.loads(result.root.content[0].text)["gid"], "t1")
+
+    async def test_read_project_resource_is_paginated(self):
+        import asana_mcp_server.server as server_module
+
+        mock_client = MagicMock()
+        mock_client.get_project_tasks_page = AsyncMock(return_value={"data": [{"gid": "t1"}], "next_page": "a/b"})
+        with patch.object(server_module, 'get_async_client', return_value=mock_client):
+            server = server_module.create_server()
+            from mcp import types
+            handler = server.request_handlers[types.ReadResourceRequest]
+            request = types.ReadResourceRequest(
+                method="resources/read",
+                params=types.ReadResourceRequestParams(uri="asana://projects/p1/tasks?limit=10&next_page=xyz"),
+            )
+            result = await handler(request)
+
+        mock_client.get_project_tasks_page.assert_awaited_with("p1", limit=10, offset="xyz", opt_fields=None)
+        body = json.loads(result.root.contents[0].text)
+        self.assertEqual(body["next_page"], "a/b")
+        self.assertEqual(body["next_uri"], "asana://projects/p1/tasks?limit=10&next_page=a%2Fb")
+
+    async def test_call_tool_honors_format_and_opt_fields(self):
+        from mcp import types
+        import asana_mcp_server.server as server_module
+
+        mock_client = MagicMock()
+        mock_client.get_project_tasks_page = AsyncMock(
+            return_value={"data": [{"gid": "t1", "name": "Task 1"}], "next_page": None})
+        with patch.object(server_module, 'get_async_client', return_value=mock_client):
+            server = server_module.create_server()
+            handler = server.request_handlers[types.CallToolRequest]
+            request = types.CallToolRequest(
+                method="tools/call",
+                params=types.CallToolRequestParams(
+                    name="get_project_tasks",
+                    arguments={"project_id": "p1", "opt_fields": "name", "format": "table"}),
+            )
+            result = await handler(request)
+
+        self.assertEqual(mock_client.get_project_tasks_page.await_args.kwargs["opt_fields"], "name")
+        self.assertEqual(result.root.content[0].text, "gid\tname\nt1\tTask 1\nnext_page: ")
+
     # Actually, let's just make sure the file is parseable and valid python first
     def test_import_server(self):
         import asana_mcp_server.server
+
+    def test_tools_list_does_not_import_the_sdk(self):
+        import subprocess
+        import sys
+        script = (
+            "import asyncio, sys\n"
+            "from mcp import types\n"
+            "import asana_mcp_server.server as server_module\n"
+            "server = server_module.create_server()\n"
+            "handler = server.request_handlers[types.ListToolsRequest]\n"
+            "result = asyncio.run(handler(types.ListToolsRequest(method='tools/list')))\n"
+            "print(len(result.root.tools), 'asana' in sys.modules)\n"
+        )
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+        count, imported = output.split()
+        self.assertGreater(int(count), 0)
+        self.assertEqual(imported, "False")
@@ -0,0 +1,183 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from asana_mcp_server.subscriptions import SubscriptionManager, watch_key
+
+
+def fake_client(events=None):
+    """An AsyncAsanaClient stand-in whose fetch_events replays the given responses."""
+    client = MagicMock()
+    responses = list(events or [])
+
+    async def fetch_events(resource, sync):
+        if sync is None:
+            return {"expired": True, "sync": "s0", "data": [], "has_more": False}
+        return responses.pop(0) if responses else {"sync": sync, "data": [], "has_more": False}
+
+    client.fetch_events = AsyncMock(side_effect=fetch_events)
+    return client
+
+
+def fake_session():
+    session = MagicMock()
+    session.send_resource_updated = AsyncMock()
+    return session
+
+
+class TestSubscriptionManager(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.manager = SubscriptionManager(read=AsyncMock(return_value="[]"), min_interval=3600)
+
+    async def asyncTearDown(self):
+        self.manager.close()
+
+    def watch(self, key):
+        return self.manager._watches[key]
+
+    async def test_one_poller_per_resource(self):
+        client = fake_client()
+        alice, bob = fake_session(), fake_session()
+        await self.manager.subscribe("asana://projects/p1/tasks", alice, client)
+        await self.manager.subscribe("asana://projects/p1/tasks?limit=10", bob, client)
+
+        self.assertEqual(self.manager.stats()["watched"], 1)
+        self.assertEqual(self.manager.stats()["subscribers"], 2)
+        self.assertEqual(self.watch(("project", "p1", client)).sync, "s0")
+
+    async def test_each_token_polls_with_its_own_client(self):
+        alice_client, bob_client = fake_client(), fake_client()
+        alice, bob = fake_session(), fake_session()
+        await self.manager.subscribe("asana://projects/p1/tasks", alice, alice_client)
+        await self.manager.subscribe("asana://projects/p1/tasks", bob, bob_client)
+        self.assertEqual(self.manager.stats()["watched"], 2)
+
+        self.assertFalse(await self.manager.poll(self.watch(("project", "p1", bob_client))))
+        self.assertEqual([c.args for c in bob_client.fetch_events.await_args_list], [("p1", None), ("p1", "s0")])
+        self.assertEqual([c.args for c in alice_client.fetch_events.await_args_list], [("p1", None)])
+
+    async def test_any_readable_gid_can_be_watched(self):
+        client = fake_client()
+        await self.manager.subscribe("asana://tasks/1204-abc.x", fake_session(), client)
+        self.assertIn(("task", "1204-abc.x", client), self.manager._watches)
+
+    async def test_quiet_poll_sends_nothing(self):
+        client = fake_client()
+        session = fake_session()
+        await self.manager.subscribe("asana://tasks/t1", session, client)
+
+        self.assertFalse(await self.manager.poll(self.watch(("task", "t1", client))))
+        client.client.invalidate_task.assert_not_called()
+
+    async def test_change_invalidates_caches_and_notifies_every_subscriber(self):
+        event = {"action": "changed", "resource": {"gid": "t9", "resource_type": "task"}}
+        client = fake_client([{"sync": "s1", "data": [event], "has_more": False}])
+        alice, bob = fake_session(), fake_session()
+        await self.manager.subscribe("asana://projects/p1/tasks", alice, client)
+        await self.manager.subscribe("asana://projects/p1/tasks", bob, client)
+        watch = self.watch(("project", "p1", client))
+
+        self.assertTrue(await self.manager.poll(watch))
+        await self.manager._notify(watch)
+
+        self.assertEqual(watch.sync, "s1")
+        client.client.invalidate_project.assert_called_once_with("p1")
+        client.client.invalidate_task.assert_called_once_with("t9")
+        alice.send_resource_updated.assert_awaited_once_with("asana://projects/p1/tasks")
+        bob.send_resource_updated.assert_awaited_once_with("asana://projects/p1/tasks")
+
+    async def test_snapshot_resources_compare_fingerprints(self):
+        client = fake_client()
+        self.manager.read = AsyncMock(side_effect=["a", "a", "b"])
+        await self.manager.subscribe("asana://workspaces/w1/tasks", fake_session(), client)
+        watch = self.watch(("snapshot", "asana://workspaces/w1/tasks", client))
+
+        self.assertFalse(await self.manager.poll(watch))
+        self.assertTrue(await self.manager.poll(watch))
+
+    async def test_unsubscribing_the_last_session_stops_polling(self):
+        client = fake_client()
+        session = fake_session()
+        await self.manager.subscribe("asana://tasks/t1", session, client)
+        task = self.watch(("task", "t1", client)).task
+
+        self.manager.unsubscribe("asana://tasks/t1", session)
+        await asyncio.sleep(0)
+        self.assertTrue(task.cancelled())
+        self.assertEqual(self.manager.stats()["watched"], 0)
+
+    async def test_closed_sessions_are_dropped(self):
+        client = fake_client()
+        session = fake_session()
+        session.send_resource_updated.side_effect = RuntimeError("closed")
+        await self.manager.subscribe("asana://tasks/t1", session, client)
+
+        await self.manager._notify(self.watch(("task", "t1", client)))
+        self.assertEqual(self.manager.stats()["watched"], 0)
+
+    async def test_interval_backs_off_while_quiet(self):
+        intervals = []
+        polled = asyncio.Event()
+
+        async def sleep(seconds):
+            intervals.append(seconds)
+            if len(intervals) > 3:
+                polled.set()
+                await asyncio.Event().wait()
+
+        manager = SubscriptionManager(read=AsyncMock(), min_interval=2, max_interval=4, sleep=sleep)
+        await manager.subscribe("asana://tasks/t1", fake_session(), fake_client())
+        await polled.wait()
+        manager.close()
+
+        self.assertEqual(intervals, [2, 3.0, 4, 4])
+
+    async def test_session_scope_drops_subscriptions_left_behind(self):
+        client = fake_client()
+        session, other = fake_session(), fake_session()
+        await self.manager.subscribe("asana://tasks/t2", other, client)
+        with self.manager.session_scope():
+            await self.manager.subscribe("asana://tasks/t1", session, client)
+            await self.manager.subscribe("asana://tasks/t2", session, client)
+        self.assertEqual((self.manager.stats()["watched"], self.manager.stats()["subscribers"]), (1, 1))
+        self.assertEqual(list(self.watch(("task", "t2", client)).subscribers), [(id(other), "asana://tasks/t2")])
+
+    def test_unsupported_uris_are_rejected(self):
+        with self.assertRaises(ValueError):
+            watch_key("asana://metrics", MagicMock())
+
+
+class TestServerSubscriptions(unittest.TestCase):
+    def test_subscribe_capability_is_advertised(self):
+        from asana_mcp_server.server import create_server
+
+        server = create_server()
+        self.assertTrue(server.create_initialization_options().capabilities.resources.subscribe)
+
+
+class TestServerSessionEnd(unittest.IsolatedAsyncioTestCase):
+    async def test_disconnecting_without_unsubscribing_stops_polling(self):
+        import anyio
+        from mcp import ClientSession
+        from mcp.shared.memory import create_client_server_memory_streams
+        import asana_mcp_server.server as server_module
+
+        with patch.object(server_module, "get_async_client", return_value=fake_client()):
+            server = server_module.create_server()
+            manager = server.subscriptions
+            with anyio.fail_after(5):
+                async with create_client_server_memory_streams() as (client_streams, server_streams):
+                    async with anyio.create_task_group() as tg:
+                        tg.start_soon(server.run, *server_streams, server.create_initialization_options())
+                        async with ClientSession(*client_streams) as session:
+                            await session.initialize()
+                            await session.subscribe_resource("asana://tasks/t1")
+                            self.assertEqual(manager.stats()["subscribers"], 1)
+                        # The client goes away without resources/unsubscribe.
+                        await client_streams[1].aclose()
+
+        self.assertEqual(manager.stats()["watched"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock, patch
+
+from asana_mcp_server.summary import SUMMARY_TASK_FIELDS, ProjectSummary
+
+TODAY = datetime.date(2024, 5, 10)
+
+
+def task(completed=False, due_on=None, assignee=None, section=None, project="p1"):
+    record = {"completed": completed, "due_on": due_on,
+              "assignee": {"gid": assignee.lower(), "name": assignee} if assignee else None}
+    if section:
+        record["memberships"] = [{"project": {"gid": "other"}, "section": {"name": "Elsewhere"}},
+                                 {"project": {"gid": project}, "section": {"name": section}}]
+    return record
+
+
+class TestProjectSummary(unittest.TestCase):
+    def test_counts_by_completion_and_due_date(self):
+        summary = ProjectSummary("p1", today=TODAY, due_soon_days=7).add_all([
+            task(completed=True, due_on="2024-01-01"),
+            task(due_on="2024-05-09"),
+            task(due_on="2024-05-10"),
+            task(due_on="2024-05-17"),
+            task(due_on="2024-05-18"),
+            task(),
+        ]).result()
+
+        self.assertEqual(summary["total"], 6)
+        self.assertEqual(summary["completed"], 1)
+        self.assertEqual(summary["incomplete"], 5)
+        self.assertEqual(summary["incomplete_by_due"], {"overdue": 1, "due_today": 1, "due_soon": 1,
+                                                        "due_later": 1, "no_due_date": 1})
+        self.assertEqual(summary["as_of"], "2024-05-10")
+
+    def test_groups_by_assignee_and_project_section(self):
+        summary = ProjectSummary("p1", today=TODAY).add_all([
+            task(assignee="Alice", section="Doing", due_on="2024-05-01"),
+            task(assignee="Alice", section="Done", completed=True),
+            task(assignee="Bob", section="Doing", due_on="2024-05-12"),
+            task(section="Doing"),
+            task(),
+        ]).result()
+
+        self.assertEqual(summary["by_assignee"]["Alice"], {"total": 2, "incomplete": 1, "overdue": 1, "due_soon": 0})
+        self.assertEqual(summary["by_assignee"]["Bob"], {"total": 1, "incomplete": 1, "overdue": 0, "due_soon": 1})
+        self.assertEqual(summary["by_assignee"]["(unassigned)"]["total"], 2)
+        self.assertEqual(list(summary["by_section"]), ["Doing", "(no section)", "Done"])
+        self.assertEqual(summary["by_section"]["Doing"]["incomplete"], 3)
+
+    def test_consumes_tasks_lazily(self):
+        consumed = []
+
+        def tasks():
+            for i in range(3):
+                consumed.append(i)
+                yield task()
+
+        summary = ProjectSummary("p1", today=TODAY)
+        summary.add_all(tasks())
+        self.assertEqual(consumed, [0, 1, 2])
+        self.assertEqual(summary.total, 3)
+
+
+class TestClientSummarizeProject(unittest.TestCase):
+    def test_streams_pages_with_minimal_fields(self):
+        from asana_mcp_server.client import AsanaClient
+
+        with patch('asana.ApiClient'), patch('asana.TasksApi') as tasks_api:
+            client = AsanaClient(access_token="token")
+            tasks_api.return_value.get_tasks.side_effect = [
+                {"data": [task(completed=True), task()], "next_page": {"offset": "o1"}},
+                {"data": [task()], "next_page": None},
+            ]
+            summary = client.summarize_project("p1")
+
+        self.assertEqual(summary["total"], 3)
+        self.assertEqual(summary["completed"], 1)
+        calls = tasks_api.return_value.get_tasks.call_args_list
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0].args[0]["opt_fields"], SUMMARY_TASK_FIELDS)
+        self.assertEqual(calls[1].args[0]["offset"], "o1")
+
+
+if __name__ == "__main__":
+    unittest.main()
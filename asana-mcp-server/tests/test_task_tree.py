@@ -0,0 +1,127 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from asana_mcp_server.task_tree import TaskTree, tree_fields
+
+# gid -> subtask gids; "r" is the root.
+SUBTASKS = {"r": ["a", "b"], "a": ["a1", "a2"], "b": ["b1"], "a1": ["a1x"]}
+DEPENDENCIES = {"a": ["b1"], "b1": ["r"]}
+
+
+class FakeTasks:
+    """Async fetchers over SUBTASKS/DEPENDENCIES that record calls and peak concurrency."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+        self.in_flight = 0
+        self.peak = 0
+
+    def record(self, gid):
+        return {"gid": gid, "name": gid.upper(), "num_subtasks": len(SUBTASKS.get(gid, []))}
+
+    async def _call(self, kind, gid, related):
+        self.calls.append((kind, gid))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        if gid in self.fail:
+            raise RuntimeError(f"{gid}: Forbidden")
+        return self.record(gid) if related is None else [self.record(g) for g in related.get(gid, [])]
+
+    async def get_task(self, gid, fields):
+        return await self._call("task", gid, None)
+
+    async def get_subtasks(self, gid, fields):
+        return await self._call("subtasks", gid, SUBTASKS)
+
+    async def get_dependencies(self, gid, fields):
+        return await self._call("dependencies", gid, DEPENDENCIES)
+
+
+def gids(nodes):
+    return [n["gid"] for n in nodes]
+
+
+class TestTaskTree(unittest.IsolatedAsyncioTestCase):
+    async def test_walks_subtasks_level_by_level(self):
+        fake = FakeTasks()
+        tree = await TaskTree(fake.get_task, fake.get_subtasks, max_depth=3).build("r")
+
+        root = tree["root"]
+        self.assertEqual(gids(root["subtasks"]), ["a", "b"])
+        self.assertEqual(gids(root["subtasks"][0]["subtasks"]), ["a1", "a2"])
+        self.assertEqual(gids(root["subtasks"][0]["subtasks"][0]["subtasks"]), ["a1x"])
+        self.assertEqual(tree["nodes"], 7)
+        self.assertFalse(tree["truncated"])
+        # Leaves (num_subtasks == 0) are never asked for their subtasks.
+        self.assertNotIn(("subtasks", "a2"), fake.calls)
+        self.assertEqual(tree["requests"], len(fake.calls))
+
+    async def test_depth_limit_keeps_the_subtask_count(self):
+        fake = FakeTasks()
+        tree = await TaskTree(fake.get_task, fake.get_subtasks, max_depth=1).build("r")
+
+        a = tree["root"]["subtasks"][0]
+        self.assertNotIn("subtasks", a)
+        self.assertEqual(a["num_subtasks"], 2)
+        self.assertEqual(tree["depth"], 1)
+
+    async def test_node_cap_truncates(self):
+        fake = FakeTasks()
+        tree = await TaskTree(fake.get_task, fake.get_subtasks, max_nodes=4).build("r")
+
+        self.assertEqual(tree["nodes"], 4)
+        self.assertTrue(tree["truncated"])
+        self.assertEqual(tree["root"]["subtasks"][1]["subtasks_omitted"], 1)
+
+    async def test_dependencies_are_deduplicated(self):
+        fake = FakeTasks()
+        tree = await TaskTree(fake.get_task, fake.get_subtasks, fake.get_dependencies, max_depth=5).build("r")
+
+        a, b = tree["root"]["subtasks"]
+        self.assertEqual(gids(a["dependencies"]), ["b1"])
+        self.assertNotIn("duplicate", a["dependencies"][0])
+        self.assertEqual(b["subtasks"], [{"gid": "b1", "name": "B1", "duplicate": True}])
+        self.assertEqual(a["dependencies"][0]["dependencies"], [{"gid": "r", "name": "R", "duplicate": True}])
+        self.assertEqual(len([c for c in fake.calls if c[0] == "dependencies" and c[1] == "b1"]), 1)
+
+    async def test_concurrency_is_bounded(self):
+        fake = FakeTasks()
+        await TaskTree(fake.get_task, fake.get_subtasks, fake.get_dependencies, max_concurrency=2).build("r")
+        self.assertLessEqual(fake.peak, 2)
+
+    async def test_a_failed_branch_is_reported_on_its_node(self):
+        fake = FakeTasks(fail={"a"})
+        tree = await TaskTree(fake.get_task, fake.get_subtasks).build("r")
+
+        a, b = tree["root"]["subtasks"]
+        self.assertEqual(a["error"], "a: Forbidden")
+        self.assertEqual(gids(b["subtasks"]), ["b1"])
+
+    def test_walk_fields_are_always_requested(self):
+        self.assertEqual(tree_fields("name,due_on"), "gid,name,due_on,num_subtasks")
+
+
+class TestClientTaskRelations(unittest.TestCase):
+    def test_subtasks_are_cached_until_the_task_is_invalidated(self):
+        from asana_mcp_server.client import AsanaClient
+
+        with patch('asana.ApiClient'), patch('asana.TasksApi') as tasks_api:
+            tasks_api.return_value.get_subtasks_for_task.return_value = {"data": [{"gid": "s1"}]}
+            client = AsanaClient(access_token="token")
+            self.assertEqual(client.get_subtasks("t1", opt_fields="name"), [{"gid": "s1"}])
+            client.get_subtasks("t1", opt_fields="name")
+            tasks_api.return_value.get_subtasks_for_task.return_value = {"data": []}
+            client.invalidate_task("t1")
+            self.assertEqual(client.get_subtasks("t1", opt_fields="name"), [])
+
+        calls = tasks_api.return_value.get_subtasks_for_task.call_args_list
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0].args, ("t1", {"opt_fields": "gid,name", "limit": 100}))
+
+
+if __name__ == "__main__":
+    unittest.main()